@@ -26,6 +26,9 @@ env = environ.Env(
     DB_PORT=(str, '5432'),
     EMAIL_HOST_USER=(str, ''),
     EMAIL_HOST_PASSWORD=(str, ''),
+    REDIS_URL=(str, ''),
+    DIVISION_LOG_ARCHIVE_DIR=(str, ''),
+    QUERY_BUDGET_ENABLED=(bool, None),
 )
 
 # Read .env file
@@ -72,6 +75,7 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'django_bootstrap5',
     'djstripe',
+    'recurrence',
 ]
 
 AUTH_USER_MODEL = 'users.User'
@@ -79,6 +83,7 @@ AUTH_USER_MODEL = 'users.User'
 DJSTRIPE_FOREIGN_KEY_TO_FIELD = "id"
 
 MIDDLEWARE = [
+    'users.middleware.QueryBudgetMiddleware',  # Development/test only; see QUERY_BUDGET_ENABLED
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -87,8 +92,17 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'users.middleware.DivisionLogBufferMiddleware',
 ]
 
+# Per-request query count, repeated-query and SQL time warnings (users.middleware.QueryBudgetMiddleware)
+QUERY_BUDGET_ENABLED = DEBUG if env('QUERY_BUDGET_ENABLED') is None else env('QUERY_BUDGET_ENABLED')
+QUERY_BUDGET = {
+    'queries': 50,
+    'duplicates': 10,
+    'sql_ms': 500,
+}
+
 ROOT_URLCONF = 'teamschedule.urls'
 
 TEMPLATES = [
@@ -164,6 +178,21 @@ AUTHENTICATION_BACKENDS = [
 
 LOGOUT_REDIRECT_URL = '/'
 
+# Redis pub/sub for live job progress across the web and runjobs processes (in-process when unset)
+REDIS_URL = env('REDIS_URL')
+
+# Shared cache (navigation, iCal feeds) when Redis is available, so invalidation reaches every process
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Where compact_division_logs writes archived division log rows (gzipped JSONL); use persistent storage
+DIVISION_LOG_ARCHIVE_DIR = env('DIVISION_LOG_ARCHIVE_DIR') or os.path.join(BASE_DIR, 'log_archive')
+
 # Email Configuration
 # Choose email backend based on environment
 # For development/testing - uncomment the next line to print emails to console
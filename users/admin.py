@@ -1,7 +1,8 @@
 from django.contrib import admin
 from .models import (
-    User, Association, Club, Team, TeamDate, TeamInvite, 
-    Schedule, ScheduleProposal, DivisionSchedulingState, SchedulingNotification
+    User, Association, Club, Team, Division, TeamDate, TeamInvite, TeamAvailabilityRule,
+    Schedule, ScheduleProposal, DivisionSchedulingState, SchedulingNotification,
+    CalendarFeedToken, BackgroundJob, OutboundEmail
 )
 
 @admin.register(User)
@@ -30,12 +31,45 @@ class TeamAdmin(admin.ModelAdmin):
     list_filter = ['age_group', 'tier', 'season', 'ready_for_scheduling', 'club__association']
     filter_horizontal = ['members', 'admins']
 
+@admin.register(Division)
+class DivisionAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'association', 'age_group', 'tier', 'season', 'created_at']
+    search_fields = ['association__name']
+    list_filter = ['age_group', 'tier', 'season', 'association']
+
 @admin.register(TeamDate)
 class TeamDateAdmin(admin.ModelAdmin):
     list_display = ['team', 'date', 'is_home', 'allow_doubleheader']
     search_fields = ['team__name']
     list_filter = ['is_home', 'allow_doubleheader', 'date', 'team__age_group', 'team__tier']
 
+@admin.register(TeamAvailabilityRule)
+class TeamAvailabilityRuleAdmin(admin.ModelAdmin):
+    list_display = ['team', 'start_date', 'end_date', 'is_home', 'allow_doubleheader', 'updated_at']
+    search_fields = ['team__name']
+    list_filter = ['is_home', 'allow_doubleheader', 'team__age_group', 'team__tier']
+
+@admin.register(CalendarFeedToken)
+class CalendarFeedTokenAdmin(admin.ModelAdmin):
+    # Deleting a token revokes that subscription URL
+    list_display = ['__str__', 'association', 'age_group', 'tier', 'season', 'created_at']
+    search_fields = ['team__name', 'association__name']
+    list_filter = ['age_group', 'tier', 'season']
+    readonly_fields = ['token', 'created_at']
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'priority', 'attempts', 'locked_by', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'locked_by', 'locked_at']
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'subject', 'status', 'attempts', 'next_attempt_at', 'team', 'created_at', 'sent_at']
+    list_filter = ['status', 'notification_type']
+    search_fields = ['subject', 'team__name']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+
 @admin.register(DivisionSchedulingState)
 class DivisionSchedulingStateAdmin(admin.ModelAdmin):
     list_display = [
@@ -74,11 +108,11 @@ class DivisionSchedulingStateAdmin(admin.ModelAdmin):
 class SchedulingNotificationAdmin(admin.ModelAdmin):
     list_display = [
         'team', 'division_state', 'notification_type', 
-        'sent_at', 'acknowledged'
+        'sent_at', 'acknowledged', 'email_pending'
     ]
     search_fields = ['team__name', 'division_state__association__name']
     list_filter = [
-        'notification_type', 'acknowledged', 'sent_at',
+        'notification_type', 'acknowledged', 'email_pending', 'sent_at',
         'division_state__age_group', 'division_state__tier'
     ]
     readonly_fields = ['sent_at']
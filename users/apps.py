@@ -7,7 +7,10 @@ class UsersConfig(AppConfig):
     name = 'users'
     
     def ready(self):
-        """Start the background scheduler when Django is ready"""
+        """Start the background scheduler and a local job worker when Django is ready"""
+        # Register signal handlers (availability bitmask maintenance)
+        from . import signals  # noqa: F401
+
         # Only start scheduler in the main process (not during auto-reload)
         # This prevents multiple scheduler instances during development
         if os.environ.get('RUN_MAIN', None) != 'true':
@@ -27,3 +30,11 @@ class UsersConfig(AppConfig):
                 print(f"❌ Error starting background scheduler: {e}")
                 import traceback
                 traceback.print_exc()
+            
+            # The development server also runs a job worker so queued jobs complete without runjobs
+            try:
+                from users.services.job_queue import start_local_worker
+                start_local_worker()
+                print("✅ Local job worker started")
+            except Exception as e:
+                print(f"❌ Error starting local job worker: {e}")
@@ -1,8 +1,9 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from users.models import DivisionSchedulingState
-from users.services.schedule_orchestration import SchedulingOrchestrationService
+from users.services.background_scheduler import LEASE_SECONDS, queue_deadline_scheduling
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -20,25 +21,28 @@ class Command(BaseCommand):
             availability_deadline__lte=current_time
         )
         
+        worker_id = f'check_scheduling_deadlines:{os.getpid()}'
+        
         scheduled_count = 0
         for division_state in divisions_to_schedule:
+            # Skip divisions a runscheduler worker is already processing
+            if not DivisionSchedulingState.acquire_lease(division_state.id, worker_id, LEASE_SECONDS):
+                self.stdout.write(f'Skipping {division_state}: leased by another scheduler worker')
+                continue
             try:
                 self.stdout.write(f'Processing {division_state}...')
-                  # Create orchestration service
-                service = SchedulingOrchestrationService(
-                    division_state.age_group, 
-                    division_state.tier, 
-                    division_state.season,
-                    division_state.association
-                )
-                
-                # Attempt to trigger scheduling
-                success, message = service.check_and_trigger_scheduling(manual_trigger=False)
+                division_state.refresh_from_db()
+                if division_state.status != 'waiting':
+                    # Another worker queued it between our query and taking the lease
+                    continue
+                should_trigger, message = division_state.should_trigger_scheduling()
                 
-                if success:
+                if should_trigger:
+                    # Generation itself runs on a runjobs worker
+                    job = queue_deadline_scheduling(division_state)
                     scheduled_count += 1
                     self.stdout.write(
-                        self.style.SUCCESS(f'✓ {division_state}: {message}')
+                        self.style.SUCCESS(f'✓ {division_state}: queued {job}')
                     )
                 else:
                     self.stdout.write(
@@ -50,10 +54,12 @@ class Command(BaseCommand):
                     self.style.ERROR(f'✗ Error processing {division_state}: {e}')
                 )
                 logger.error(f'Error in deadline scheduling for {division_state}: {e}')
+            finally:
+                DivisionSchedulingState.release_lease(division_state.id, worker_id)
         
         if scheduled_count == 0:
             self.stdout.write('No divisions required scheduling at this time.')
         else:
             self.stdout.write(
-                self.style.SUCCESS(f'Successfully processed {scheduled_count} divisions')
+                self.style.SUCCESS(f'Queued scheduling for {scheduled_count} divisions')
             )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from users.services import division_log_storage
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll division log rows past their retention into daily summaries, archive them to gzipped JSONL '
+        'and maintain the monthly log partitions. Run daily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--archive-dir',
+            help='Directory for archive files (defaults to DIVISION_LOG_ARCHIVE_DIR)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=division_log_storage.BATCH_SIZE,
+            help=f'Rows archived per transaction (default {division_log_storage.BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows are past their retention',
+        )
+
+    def handle(self, *args, **options):
+        result = division_log_storage.compact(
+            archive_dir=options.get('archive_dir'),
+            batch_size=max(1, options['batch_size']),
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f"{result['expired']} division log rows are past their retention")
+            return
+
+        if result['archived']:
+            self.stdout.write(self.style.SUCCESS(f"📦 Archived {result['archived']} rows to {result['archive']}"))
+        else:
+            self.stdout.write('No division log rows past their retention')
+        for name in result['partitions_dropped']:
+            self.stdout.write(f'🗑️ Dropped empty partition {name}')
+        for name in result['partitions_created']:
+            self.stdout.write(f'🗂️ Created partition {name}')
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from users.services import job_queue
+import logging
+import signal
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# How often the main thread requeues jobs abandoned by crashed workers and prunes old ones
+STALE_CHECK_SECONDS = 5 * 60
+
+class Command(BaseCommand):
+    help = (
+        'Run background job workers (schedule generation, notification emails, exports). '
+        'Any number of these processes can run at once; jobs are claimed with SKIP LOCKED.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help='Number of worker threads in this process (default 2)',
+        )
+        parser.add_argument(
+            '--worker-id',
+            help='Name recorded on claimed jobs (defaults to host:pid)',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for new jobs',
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def shutdown(signum, frame):
+            self.stdout.write(f'Received signal {signum}, finishing current jobs...')
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        job_queue.requeue_stale_jobs()
+
+        concurrency = max(1, options['concurrency'])
+        worker_id = options.get('worker_id') or job_queue.default_worker_id()
+        self.stdout.write(self.style.SUCCESS(f'Starting {concurrency} job worker(s) as {worker_id}'))
+        threads = job_queue.start_workers(concurrency, stop_event, worker_id=worker_id, burst=options['burst'])
+
+        # Join with a timeout so signal handlers keep running in the main thread
+        last_requeue = time.monotonic()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+            if time.monotonic() - last_requeue > STALE_CHECK_SECONDS:
+                job_queue.requeue_stale_jobs()
+                job_queue.prune_finished_jobs()
+                last_requeue = time.monotonic()
+
+        self.stdout.write(self.style.SUCCESS(f'Job workers {worker_id} stopped'))
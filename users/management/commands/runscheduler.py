@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from users.services.background_scheduler import BackgroundScheduler
+import logging
+import signal
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = (
+        'Run the deadline scheduler as a dedicated process. Several instances can run at once; '
+        'they coordinate through per-division leases so each deadline is processed exactly once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--worker-id',
+            help='Name used for division leases (defaults to host:pid)',
+        )
+
+    def handle(self, *args, **options):
+        scheduler = BackgroundScheduler(worker_id=options.get('worker_id'))
+
+        def shutdown(signum, frame):
+            self.stdout.write(f'Received signal {signum}, stopping scheduler {scheduler.worker_id}...')
+            scheduler.request_stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(self.style.SUCCESS(f'Starting scheduler worker {scheduler.worker_id}'))
+        scheduler.run_forever()
+        self.stdout.write(self.style.SUCCESS(f'Scheduler worker {scheduler.worker_id} stopped'))
@@ -0,0 +1,70 @@
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from users.services import division_log_buffer, query_budget
+
+logger = logging.getLogger(__name__)
+
+
+class DivisionLogBufferMiddleware:
+    """Collect the DivisionLog entries a request makes and write them in one bulk_create at the end"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with division_log_buffer.buffered():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Sync views run via sync_to_async with a copy of this context, so they share the buffer
+        entries, token = division_log_buffer.start()
+        try:
+            return await self.get_response(request)
+        finally:
+            division_log_buffer.stop(token)
+            if entries:
+                await sync_to_async(division_log_buffer.flush)(entries)
+
+
+class QueryBudgetMiddleware:
+    """
+    Development/test aid: count each request's queries, repeated queries and SQL time, add them as
+    X-Query-* response headers and log a warning when they exceed settings.QUERY_BUDGET.
+    Enabled by settings.QUERY_BUDGET_ENABLED (defaults to DEBUG). Sync only; under ASGI Django runs
+    it in the sync thread, so async views' queries on other threads aren't counted.
+    """
+
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with query_budget.recording() as stats:
+            response = self.get_response(request)
+
+        response['X-Query-Count'] = str(stats.count)
+        response['X-Query-Duplicates'] = str(stats.duplicates)
+        response['X-Query-Time-Ms'] = f"{stats.sql_ms:.1f}"
+
+        exceeded = stats.over_budget()
+        if exceeded:
+            repeated = '; '.join(f"{times}x {sql[:120]}" for sql, times in stats.most_repeated())
+            logger.warning(
+                f"🐢 {request.method} {request.path} over query budget ({', '.join(exceeded)}): "
+                f"{stats.count} queries, {stats.duplicates} repeated, {stats.sql_ms:.0f} ms SQL"
+                + (f" | most repeated: {repeated}" if repeated else "")
+            )
+        return response
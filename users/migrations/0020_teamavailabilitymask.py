@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-19 05:15
+
+import django.db.models.deletion
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0019_remove_unique_team_name_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamAvailabilityMask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season_start', models.DateField()),
+                ('home_bits', users.models.BitStringField(max_length=366)),
+                ('away_bits', users.models.BitStringField(max_length=366)),
+                ('doubleheader_bits', users.models.BitStringField(max_length=366)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='availability_mask', to='users.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['season_start'], name='users_teama_season__3bd2b4_idx')],
+            },
+        ),
+        # Masks are backfilled by 0039_availability_mask_window, with windows sized to each team's dates
+    ]
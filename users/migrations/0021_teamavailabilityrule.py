@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-19 05:17
+
+import django.db.models.deletion
+import recurrence.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0020_teamavailabilitymask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamAvailabilityRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recurrence', recurrence.fields.RecurrenceField(help_text='Weekly rule plus exception dates')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('is_home', models.BooleanField(default=True)),
+                ('allow_doubleheader', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_rules', to='users.team')),
+            ],
+            options={
+                'ordering': ['start_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-19 05:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0021_teamavailabilityrule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedschedule',
+            name='events_snapshot',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='generatedschedule',
+            name='summary_snapshot',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.1 on 2026-10-19 05:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def number_existing_schedules(apps, schema_editor):
+    """Number existing schedules per division; each was a full copy, so it retires its predecessor's matches"""
+    GeneratedSchedule = apps.get_model('users', 'GeneratedSchedule')
+    ScheduleMatch = apps.get_model('users', 'ScheduleMatch')
+
+    divisions = {}
+    for schedule in GeneratedSchedule.objects.order_by('generated_at', 'id'):
+        key = (schedule.age_group, schedule.tier, schedule.season, schedule.association_id)
+        divisions.setdefault(key, []).append(schedule)
+
+    for schedules in divisions.values():
+        previous = None
+        for version, schedule in enumerate(schedules, 1):
+            schedule.version = version
+            schedule.parent = previous
+            schedule.is_active = version == len(schedules)
+            schedule.save(update_fields=['version', 'parent', 'is_active'])
+            if previous is not None:
+                ScheduleMatch.objects.filter(generated_schedule=previous).update(retired_in=schedule)
+            previous = schedule
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0022_generatedschedule_snapshot'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='generatedschedule',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='generatedschedule',
+            name='matches_added',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='generatedschedule',
+            name='matches_moved',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='generatedschedule',
+            name='matches_removed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='generatedschedule',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='users.generatedschedule'),
+        ),
+        migrations.AddField(
+            model_name='generatedschedule',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='schedulematch',
+            name='retired_in',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='retired_matches', to='users.generatedschedule'),
+        ),
+        migrations.AddIndex(
+            model_name='schedulematch',
+            index=models.Index(condition=models.Q(('retired_in__isnull', True)), fields=['generated_schedule'], name='schedulematch_live_idx'),
+        ),
+        migrations.RunPython(number_existing_schedules, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='generatedschedule',
+            constraint=models.UniqueConstraint(fields=('age_group', 'tier', 'season', 'association', 'version'), name='unique_schedule_version'),
+        ),
+        migrations.AddConstraint(
+            model_name='generatedschedule',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('age_group', 'tier', 'season', 'association'), name='one_active_schedule_per_division'),
+        ),
+    ]
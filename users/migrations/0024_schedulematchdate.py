@@ -0,0 +1,68 @@
+# Generated by Django 5.1 on 2026-10-19 05:30
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_match_dates(apps, schema_editor):
+    """Mirror the JSON dates of existing scheduled matches into ScheduleMatchDate rows"""
+    ScheduleMatch = apps.get_model('users', 'ScheduleMatch')
+    ScheduleMatchDate = apps.get_model('users', 'ScheduleMatchDate')
+
+    rows = []
+    matches = ScheduleMatch.objects.filter(status='scheduled').select_related('generated_schedule')
+    for match in matches.iterator(chunk_size=1000):
+        schedule = match.generated_schedule
+        for value in match.dates or ():
+            day = datetime.date.fromisoformat(value)
+            for team_id, opponent_id, is_home in (
+                (match.home_team_id, match.away_team_id, True),
+                (match.away_team_id, match.home_team_id, False),
+            ):
+                rows.append(ScheduleMatchDate(
+                    match_id=match.id,
+                    team_id=team_id,
+                    opponent_id=opponent_id,
+                    date=day,
+                    is_home=is_home,
+                    association_id=schedule.association_id,
+                    age_group=schedule.age_group,
+                    tier=schedule.tier,
+                    season=schedule.season,
+                ))
+        if len(rows) >= 1000:
+            ScheduleMatchDate.objects.bulk_create(rows)
+            rows = []
+    ScheduleMatchDate.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0023_schedule_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleMatchDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('is_home', models.BooleanField()),
+                ('age_group', models.CharField(choices=[('6U', '6U'), ('7U', '7U'), ('8U', '8U'), ('10U', '10U'), ('12U', '12U'), ('14U', '14U'), ('16U', '16U'), ('18U', '18U'), ('Adult', 'Adult')], max_length=5)),
+                ('tier', models.CharField(choices=[('A', 'A'), ('AA', 'AA'), ('AAA', 'AAA'), ('B', 'B'), ('BB', 'BB'), ('C', 'C')], max_length=3)),
+                ('season', models.CharField(max_length=9)),
+                ('association', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_dates', to='users.association')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_dates', to='users.schedulematch')),
+                ('opponent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.team')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_dates', to='users.team')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['team', 'date'], name='matchdate_team_date_idx'), models.Index(fields=['association', 'age_group', 'tier', 'season', 'date'], name='matchdate_division_date_idx'), models.Index(fields=['association', 'date'], name='matchdate_association_date_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_match_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-19 05:32
+
+import django.db.models.deletion
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0024_schedulematchdate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=users.models.generate_feed_token, editable=False, max_length=64, unique=True)),
+                ('age_group', models.CharField(choices=[('6U', '6U'), ('7U', '7U'), ('8U', '8U'), ('10U', '10U'), ('12U', '12U'), ('14U', '14U'), ('16U', '16U'), ('18U', '18U'), ('Adult', 'Adult')], max_length=5)),
+                ('tier', models.CharField(choices=[('A', 'A'), ('AA', 'AA'), ('AAA', 'AAA'), ('B', 'B'), ('BB', 'BB'), ('C', 'C')], max_length=3)),
+                ('season', models.CharField(max_length=9)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('association', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feed_tokens', to='users.association')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feed_tokens', to='users.team')),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-19 05:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0025_calendarfeedtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('division', 'Division'), ('team', 'Team'), ('association', 'Association')], max_length=15)),
+                ('scope_key', models.CharField(help_text='Team id, association id or division key', max_length=100)),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('pdf', 'PDF')], max_length=3)),
+                ('version_key', models.CharField(help_text='Identifies the schedule version(s) the export was built from', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('building', 'Building'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('content', models.BinaryField(blank=True, null=True)),
+                ('filename', models.CharField(max_length=200)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='schedule_exports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'scope_key', 'format', 'version_key'), name='unique_schedule_export')],
+            },
+        ),
+    ]
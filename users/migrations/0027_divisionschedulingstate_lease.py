@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-19 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0026_scheduleexport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='divisionschedulingstate',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='divisionschedulingstate',
+            name='lease_owner',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
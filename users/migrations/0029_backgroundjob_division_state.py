@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-19 05:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0028_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='division_state',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='users.divisionschedulingstate'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1 on 2026-10-19 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0030_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationRecipientState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('last_sent_at', models.DateTimeField(db_index=True)),
+                ('last_digest_hash', models.CharField(max_length=64)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='schedulingnotification',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='sha256 of team, type and message', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='schedulingnotification',
+            name='email_pending',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='backgroundjob',
+            name='kind',
+            field=models.CharField(choices=[('generate_schedule', 'Generate Schedule'), ('deadline_schedule', 'Deadline Scheduling'), ('flush_outbox', 'Send Outbox Emails'), ('send_digests', 'Send Notification Digests'), ('build_export', 'Build Export')], max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='schedulingnotification',
+            index=models.Index(condition=models.Q(('email_pending', True)), fields=['team', 'content_hash'], name='schednotif_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-19 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0031_notification_digest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='divisionlog',
+            index=models.Index(fields=['team', 'log_type', '-timestamp'], name='divisionlog_team_type_idx'),
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.1 on 2026-10-19 06:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TABLE = 'users_divisionlog'
+
+# Monthly partitions created past the current month; compact_division_logs keeps extending them
+MONTHS_AHEAD = 3
+
+
+def _rebuild_division_log(cursor, partitioned):
+    """
+    Recreate users_divisionlog as a monthly range-partitioned table (or back as a plain one),
+    copying rows, indexes and foreign keys. Partitioned tables need the partition key in the
+    primary key, so it becomes (id, timestamp).
+    """
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s",
+        [TABLE, f'{TABLE}_pkey'],
+    )
+    # Indexes on a partitioned table are listed as ON ONLY; recreate them recursively
+    indexes = [row[0].replace(' ON ONLY ', ' ON ') for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [TABLE],
+    )
+    foreign_keys = cursor.fetchall()
+
+    cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {TABLE}_old')
+    cursor.execute(
+        f'CREATE TABLE {TABLE} (LIKE {TABLE}_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        + (' PARTITION BY RANGE ("timestamp")' if partitioned else '')
+    )
+    if partitioned:
+        cursor.execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+        cursor.execute(
+            f"""
+            SELECT month::date FROM generate_series(
+                date_trunc('month', COALESCE((SELECT min("timestamp") FROM {TABLE}_old), now()) AT TIME ZONE 'UTC'),
+                date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months',
+                interval '1 month'
+            ) AS month
+            """
+        )
+        for (month,) in cursor.fetchall():
+            next_month = month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month:%Y_%m} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00+00') TO ('{next_month:%Y-%m-%d} 00:00+00')"
+            )
+
+    cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {TABLE}_old')
+    cursor.execute(f'DROP TABLE {TABLE}_old CASCADE')
+    primary_key = '(id, "timestamp")' if partitioned else '(id)'
+    cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY {primary_key}')
+    cursor.execute(f'ALTER TABLE {TABLE} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(max(id), 0) + 1, false) FROM {TABLE}"
+    )
+    for definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}')
+
+
+def partition_division_log(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        _rebuild_division_log(cursor, partitioned=True)
+
+
+def unpartition_division_log(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        _rebuild_division_log(cursor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0032_divisionlog_team_type_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DivisionLogDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('age_group', models.CharField(max_length=10)),
+                ('tier', models.CharField(max_length=5)),
+                ('season', models.CharField(max_length=20)),
+                ('date', models.DateField()),
+                ('log_type', models.CharField(choices=[('team_readiness', 'Team Readiness Check'), ('schedule_generation', 'Schedule Generation'), ('user_login', 'User Login'), ('team_added', 'Team Added'), ('team_deleted', 'Team Deleted'), ('team_modified', 'Team Modified'), ('availability_updated', 'Team Availability Updated'), ('deadline_set', 'Deadline Set'), ('system_info', 'System Information'), ('email_notification', 'Email Notification Sent')], max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date', 'log_type'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='divisionlog',
+            name='users_divis_age_gro_a9f906_idx',
+        ),
+        migrations.AddIndex(
+            model_name='divisionlog',
+            index=models.Index(fields=['association', 'age_group', 'tier', 'season', '-timestamp'], name='divisionlog_division_idx'),
+        ),
+        migrations.AddField(
+            model_name='divisionlogdailysummary',
+            name='association',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_summaries', to='users.association'),
+        ),
+        migrations.AddConstraint(
+            model_name='divisionlogdailysummary',
+            constraint=models.UniqueConstraint(fields=('association', 'age_group', 'tier', 'season', 'date', 'log_type'), name='unique_divisionlog_daily_summary'),
+        ),
+        migrations.RunPython(partition_division_log, unpartition_division_log),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-19 06:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0033_divisionlog_partitioning'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='divisionlog',
+            name='divisionlog_division_idx',
+        ),
+        migrations.AddIndex(
+            model_name='divisionlog',
+            index=models.Index(fields=['association', 'age_group', 'tier', 'season', '-timestamp', '-id'], name='divisionlog_division_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='divisionlog',
+            index=models.Index(fields=['association', 'age_group', 'tier', 'season', 'log_type', '-timestamp', '-id'], name='divisionlog_division_type_idx'),
+        ),
+    ]
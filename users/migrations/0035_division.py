@@ -0,0 +1,129 @@
+# Generated by Django 5.1 on 2026-10-19 06:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+DIVISION_FIELDS = ('association_id', 'age_group', 'tier', 'season')
+
+
+def backfill_divisions(apps, schema_editor):
+    """Create a Division for every division key in use and point teams, states, schedules and logs at it"""
+    Division = apps.get_model('users', 'Division')
+    Team = apps.get_model('users', 'Team')
+
+    team_keys = {}
+    for team_id, *key in Team.objects.values_list('id', 'club__association_id', 'age_group', 'tier', 'season'):
+        team_keys.setdefault(tuple(key), []).append(team_id)
+
+    keys = set(team_keys)
+    for model_name in ('DivisionSchedulingState', 'GeneratedSchedule', 'DivisionLog'):
+        keys.update(apps.get_model('users', model_name).objects.values_list(*DIVISION_FIELDS).distinct())
+    Division.objects.bulk_create(
+        [Division(**dict(zip(DIVISION_FIELDS, key))) for key in keys],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+    division_ids = {
+        tuple(row[1:]): row[0] for row in Division.objects.values_list('id', *DIVISION_FIELDS)
+    }
+    for key, team_ids in team_keys.items():
+        Team.objects.filter(id__in=team_ids).update(division_id=division_ids[key])
+
+    division = Division.objects.filter(
+        association_id=models.OuterRef('association_id'),
+        age_group=models.OuterRef('age_group'),
+        tier=models.OuterRef('tier'),
+        season=models.OuterRef('season'),
+    ).values('id')[:1]
+    for model_name in ('DivisionSchedulingState', 'GeneratedSchedule', 'DivisionLog'):
+        apps.get_model('users', model_name).objects.filter(division__isnull=True).update(
+            division_id=models.Subquery(division)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0034_divisionlog_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Division',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('age_group', models.CharField(choices=[('6U', '6U'), ('7U', '7U'), ('8U', '8U'), ('10U', '10U'), ('12U', '12U'), ('14U', '14U'), ('16U', '16U'), ('18U', '18U'), ('Adult', 'Adult')], max_length=10)),
+                ('tier', models.CharField(choices=[('A', 'A'), ('AA', 'AA'), ('AAA', 'AAA'), ('B', 'B'), ('BB', 'BB'), ('C', 'C')], max_length=5)),
+                ('season', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='generatedschedule',
+            name='unique_schedule_version',
+        ),
+        migrations.RemoveConstraint(
+            model_name='generatedschedule',
+            name='one_active_schedule_per_division',
+        ),
+        migrations.RemoveIndex(
+            model_name='divisionlog',
+            name='divisionlog_division_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='divisionlog',
+            name='divisionlog_division_type_idx',
+        ),
+        migrations.AlterUniqueTogether(
+            name='divisionschedulingstate',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='division',
+            name='association',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='divisions', to='users.association'),
+        ),
+        migrations.AddField(
+            model_name='divisionlog',
+            name='division',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='logs', to='users.division'),
+        ),
+        migrations.AddField(
+            model_name='divisionschedulingstate',
+            name='division',
+            field=models.OneToOneField(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='scheduling_state', to='users.division'),
+        ),
+        migrations.AddField(
+            model_name='generatedschedule',
+            name='division',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='users.division'),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='division',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='teams', to='users.division'),
+        ),
+        migrations.AddIndex(
+            model_name='divisionlog',
+            index=models.Index(fields=['division', '-timestamp', '-id'], name='divisionlog_division_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='divisionlog',
+            index=models.Index(fields=['division', 'log_type', '-timestamp', '-id'], name='divisionlog_division_type_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='generatedschedule',
+            constraint=models.UniqueConstraint(fields=('division', 'version'), name='unique_schedule_version'),
+        ),
+        migrations.AddConstraint(
+            model_name='generatedschedule',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('division',), name='one_active_schedule_per_division'),
+        ),
+        migrations.AddConstraint(
+            model_name='division',
+            constraint=models.UniqueConstraint(fields=('association', 'age_group', 'tier', 'season'), name='unique_division'),
+        ),
+        migrations.RunPython(backfill_divisions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-19 06:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0035_division'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='divisionschedulingstate',
+            name='division',
+            field=models.OneToOneField(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='scheduling_state', to='users.division'),
+        ),
+        migrations.AlterField(
+            model_name='generatedschedule',
+            name='division',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='users.division'),
+        ),
+        migrations.AlterField(
+            model_name='team',
+            name='division',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.RESTRICT, related_name='teams', to='users.division'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-19 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0036_division_required'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduleexport',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When the current build started', null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-19 06:36
+
+from django.db import migrations, models
+
+
+def remove_duplicate_feeds(apps, schema_editor):
+    """Keep the oldest token for each team or division; duplicates came from concurrent page loads"""
+    CalendarFeedToken = apps.get_model('users', 'CalendarFeedToken')
+    seen = set()
+    duplicates = []
+    for feed in CalendarFeedToken.objects.order_by('id'):
+        key = (feed.team_id,) if feed.team_id else (feed.age_group, feed.tier, feed.season, feed.association_id)
+        if key in seen:
+            duplicates.append(feed.id)
+        seen.add(key)
+    CalendarFeedToken.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0037_schedule_export_claimed_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_feeds, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='calendarfeedtoken',
+            constraint=models.UniqueConstraint(condition=models.Q(('team__isnull', False)), fields=('team',), name='unique_team_calendar_feed'),
+        ),
+        migrations.AddConstraint(
+            model_name='calendarfeedtoken',
+            constraint=models.UniqueConstraint(condition=models.Q(('team__isnull', True)), fields=('age_group', 'tier', 'season', 'association'), name='unique_division_calendar_feed'),
+        ),
+    ]
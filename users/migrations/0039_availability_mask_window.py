@@ -0,0 +1,61 @@
+# Generated by Django 5.1 on 2026-10-19 06:59
+
+import users.models
+from django.db import migrations
+
+
+def rebuild_availability_masks(apps, schema_editor):
+    """Rebuild every mask with a window covering all of the team's dates (the old one assumed July 1 + 366 days)"""
+    from users.services.availability_bitmask import encode_team_dates
+    from users.services.recurring_availability import merge_availability
+
+    TeamDate = apps.get_model('users', 'TeamDate')
+    TeamAvailabilityRule = apps.get_model('users', 'TeamAvailabilityRule')
+    TeamAvailabilityMask = apps.get_model('users', 'TeamAvailabilityMask')
+
+    rules_by_team, dates_by_team = {}, {}
+    for rule in TeamAvailabilityRule.objects.all():
+        rules_by_team.setdefault(rule.team_id, []).append(rule)
+    for team_date in TeamDate.objects.all():
+        dates_by_team.setdefault(team_date.team_id, []).append(team_date)
+
+    masks = []
+    for team_id in rules_by_team.keys() | dates_by_team.keys():
+        entries = merge_availability(rules_by_team.get(team_id, []), dates_by_team.get(team_id, []))
+        start, home_bits, away_bits, doubleheader_bits = encode_team_dates(entries)
+        if start is not None:
+            masks.append(TeamAvailabilityMask(
+                team_id=team_id,
+                season_start=start,
+                home_bits=home_bits,
+                away_bits=away_bits,
+                doubleheader_bits=doubleheader_bits,
+            ))
+    TeamAvailabilityMask.objects.all().delete()
+    TeamAvailabilityMask.objects.bulk_create(masks, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0038_unique_calendar_feed_tokens'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='teamavailabilitymask',
+            name='away_bits',
+            field=users.models.BitStringField(),
+        ),
+        migrations.AlterField(
+            model_name='teamavailabilitymask',
+            name='doubleheader_bits',
+            field=users.models.BitStringField(),
+        ),
+        migrations.AlterField(
+            model_name='teamavailabilitymask',
+            name='home_bits',
+            field=users.models.BitStringField(),
+        ),
+        migrations.RunPython(rebuild_availability_masks, migrations.RunPython.noop),
+    ]
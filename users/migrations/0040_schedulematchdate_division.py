@@ -0,0 +1,45 @@
+# Generated by Django 5.1 on 2026-10-19 07:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_match_date_divisions(apps, schema_editor):
+    """Copy each game day's division from the schedule version its match belongs to"""
+    ScheduleMatchDate = apps.get_model('users', 'ScheduleMatchDate')
+    ScheduleMatchDate.objects.filter(division__isnull=True).update(
+        division_id=models.Subquery(
+            apps.get_model('users', 'ScheduleMatch').objects.filter(
+                id=models.OuterRef('match_id'),
+            ).values('generated_schedule__division_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0039_availability_mask_window'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='schedulematchdate',
+            name='matchdate_division_date_idx',
+        ),
+        migrations.AddField(
+            model_name='schedulematchdate',
+            name='division',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='match_dates', to='users.division'),
+        ),
+        migrations.RunPython(backfill_match_date_divisions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='schedulematchdate',
+            name='division',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='match_dates', to='users.division'),
+        ),
+        migrations.AddIndex(
+            model_name='schedulematchdate',
+            index=models.Index(fields=['division', 'date'], name='matchdate_division_date_idx'),
+        ),
+    ]
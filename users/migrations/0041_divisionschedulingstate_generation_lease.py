@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-19 07:15
+
+from django.db import migrations, models
+
+
+def move_generation_leases(apps, schema_editor):
+    """Generation jobs held the shared lease with a job:<id>:<worker> owner; move those to the new columns"""
+    DivisionSchedulingState = apps.get_model('users', 'DivisionSchedulingState')
+    DivisionSchedulingState.objects.filter(lease_owner__startswith='job:').update(
+        generation_lease_owner=models.F('lease_owner'),
+        generation_lease_expires_at=models.F('lease_expires_at'),
+        lease_owner='',
+        lease_expires_at=None,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0040_schedulematchdate_division'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='divisionschedulingstate',
+            name='generation_lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='divisionschedulingstate',
+            name='generation_lease_owner',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.RunPython(move_generation_leases, migrations.RunPython.noop),
+    ]
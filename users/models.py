@@ -1,6 +1,9 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
+from recurrence.fields import RecurrenceField
+import hashlib
+import secrets
 
 class User(AbstractUser):
     email = models.EmailField(unique=True, blank=False)
@@ -57,10 +60,78 @@ class Team(models.Model):
     members = models.ManyToManyField(User, related_name='teams')
     admins = models.ManyToManyField('User', related_name='admin_teams', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Derived from age_group, tier, season and the club's association on every save
+    division = models.ForeignKey('Division', on_delete=models.RESTRICT, related_name='teams', editable=False)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.division = Division.resolve(self.age_group, self.tier, self.season, self.club.association_id)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'division'}
+        super().save(*args, **kwargs)
+
+class Division(models.Model):
+    """An age group and tier for one season within an association; teams, schedules and logs reference it"""
+    association = models.ForeignKey(Association, on_delete=models.CASCADE, related_name='divisions')
+    age_group = models.CharField(max_length=10, choices=Team.AGE_GROUPS)
+    tier = models.CharField(max_length=5, choices=Team.TIERS)
+    season = models.CharField(max_length=20)  # e.g., "2024-2025"
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['association', 'age_group', 'tier', 'season'], name='unique_division'),
+        ]
+
+    def __str__(self):
+        return f"{self.age_group} {self.tier} ({self.season})"
+
+    @property
+    def key(self):
+        """The (age_group, tier, season, association_id) tuple used in division URLs"""
+        return self.age_group, self.tier, self.season, self.association_id
+
+    @classmethod
+    def resolve(cls, age_group, tier, season, association):
+        """The division row for these values (association may be an instance or id), created if missing"""
+        association_id = getattr(association, 'id', association)
+        division, created = cls.objects.get_or_create(
+            association_id=association_id, age_group=age_group, tier=tier, season=season,
+        )
+        return division
+
+    @classmethod
+    def lookup(cls, age_group, tier, season, association_id):
+        """
+        Resolve a division URL once: the Division with its association loaded, or None when no such
+        division exists. Read-only, so arbitrary URLs never create rows; teams and saved schedules
+        create divisions through resolve().
+        """
+        return cls.objects.select_related('association').filter(
+            association_id=association_id, age_group=age_group, tier=tier, season=season,
+        ).first()
+
+    @classmethod
+    def assign(cls, rows):
+        """Set division on unsaved rows that carry the loose division columns, with one lookup for all of them"""
+        missing = [row for row in rows if row.division_id is None]
+        if not missing:
+            return
+        keys = {(row.association_id, row.age_group, row.tier, row.season) for row in missing}
+        lookup = models.Q()
+        for association_id, age_group, tier, season in keys:
+            lookup |= models.Q(association_id=association_id, age_group=age_group, tier=tier, season=season)
+        divisions = {
+            (d.association_id, d.age_group, d.tier, d.season): d.id
+            for d in cls.objects.filter(lookup)
+        }
+        for association_id, age_group, tier, season in keys - divisions.keys():
+            divisions[(association_id, age_group, tier, season)] = cls.resolve(age_group, tier, season, association_id).id
+        for row in missing:
+            row.division_id = divisions[(row.association_id, row.age_group, row.tier, row.season)]
+
 class Schedule(models.Model):
     EVENT_TYPES = [
         ('GAME', 'Game'),
@@ -89,16 +160,156 @@ class TeamInvite(models.Model):
     accepted = models.BooleanField(default=False)
     invited_at = models.DateTimeField(auto_now_add=True)
 
+class AvailabilityQuerySet(models.QuerySet):
+    """
+    TeamDate and TeamAvailabilityRule writes that bypass save()/delete() (and so the signals in
+    users/signals.py) still rebuild the affected teams' availability masks
+    """
+
+    def _refresh_masks(self, team_ids):
+        from users.signals import mask_refresh_suspended
+
+        if not mask_refresh_suspended():
+            TeamAvailabilityMask.refresh_for_teams(team_ids)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        self._refresh_masks({obj.team_id for obj in objs})
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        self._refresh_masks({obj.team_id for obj in objs})
+        return rows
+
+    def update(self, **kwargs):
+        team_ids = set(self.values_list('team_id', flat=True))
+        rows = super().update(**kwargs)
+        if 'team' in kwargs or 'team_id' in kwargs:
+            team = kwargs.get('team_id', kwargs.get('team'))
+            team_ids.add(getattr(team, 'pk', team))
+        self._refresh_masks(team_ids)
+        return rows
+
+    update.alters_data = True
+
+
 class TeamDate(models.Model):
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='dates')
     date = models.DateField()
     is_home = models.BooleanField(default=True)
     allow_doubleheader = models.BooleanField(default=False)  # <-- Add this line
 
+    objects = AvailabilityQuerySet.as_manager()
+
     class Meta:
         ordering = ['date']
         unique_together = ['team', 'date']  # Prevent duplicate dates for same team
 
+class TeamAvailabilityRule(models.Model):
+    """Recurring availability (e.g. every Saturday and Sunday Oct-Feb, except holidays) expanded lazily into dates"""
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='availability_rules')
+    recurrence = RecurrenceField(include_dtstart=False, help_text="Weekly rule plus exception dates")
+    start_date = models.DateField()
+    end_date = models.DateField()
+    is_home = models.BooleanField(default=True)
+    allow_doubleheader = models.BooleanField(default=False)
+    created_by = models.ForeignKey('User', on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = AvailabilityQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['start_date']
+
+    def __str__(self):
+        home_away = "Home" if self.is_home else "Away"
+        return f"{self.team.name} - {home_away} {self.start_date} to {self.end_date}"
+
+    def dates(self):
+        """Concrete dates produced by this rule (cached per rule version)"""
+        from users.services.recurring_availability import expand_rule
+        return expand_rule(self)
+
+class BitStringField(models.CharField):
+    """Stores a '0'/'1' string as ``bit varying`` on PostgreSQL and as text elsewhere"""
+
+    def db_type(self, connection):
+        if connection.vendor == 'postgresql':
+            return f'bit varying({self.max_length})' if self.max_length else 'bit varying'
+        return super().db_type(connection)
+
+class TeamAvailabilityMask(models.Model):
+    """
+    Compact per-team copy of TeamDate rows and rules as day bit strings (bit i = season_start + i days).
+    season_start is the team's first available day and the strings run to its last; teams with no
+    availability have no mask.
+    """
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name='availability_mask')
+    season_start = models.DateField()
+    home_bits = BitStringField(max_length=None)
+    away_bits = BitStringField(max_length=None)
+    doubleheader_bits = BitStringField(max_length=None)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['season_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.team.name} availability mask ({self.season_start})"
+
+    @classmethod
+    def refresh_for_team(cls, team):
+        """Rebuild the mask for a team from its TeamDate rows and availability rules"""
+        cls.refresh_for_teams([team.id])
+        return cls.objects.filter(team_id=team.id).first()
+
+    @classmethod
+    def refresh_for_teams(cls, team_ids):
+        """Rebuild the masks of many teams with one availability load and one upsert"""
+        from users.services.availability_bitmask import encode_team_dates
+        from users.services.recurring_availability import availability_by_team_id
+
+        team_ids = {team_id for team_id in team_ids if team_id is not None}
+        if not team_ids:
+            return
+        masks, empty = [], []
+        for team_id, entries in availability_by_team_id(team_ids).items():
+            start, home_bits, away_bits, doubleheader_bits = encode_team_dates(entries)
+            if start is None:
+                empty.append(team_id)
+                continue
+            masks.append(cls(
+                team_id=team_id,
+                season_start=start,
+                home_bits=home_bits,
+                away_bits=away_bits,
+                doubleheader_bits=doubleheader_bits,
+            ))
+        if empty:
+            cls.objects.filter(team_id__in=empty).delete()
+        cls.objects.bulk_create(
+            masks,
+            update_conflicts=True,
+            unique_fields=['team'],
+            update_fields=['season_start', 'home_bits', 'away_bits', 'doubleheader_bits', 'updated_at'],
+        )
+
+    def home_dates(self):
+        from users.services.availability_bitmask import decode_bits
+        return decode_bits(self.home_bits, self.season_start)
+
+    def away_dates(self):
+        from users.services.availability_bitmask import decode_bits
+        return decode_bits(self.away_bits, self.season_start)
+
+    def doubleheader_dates(self):
+        from users.services.availability_bitmask import decode_bits
+        return decode_bits(self.doubleheader_bits, self.season_start)
+
 class ScheduleProposal(models.Model):
     home_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='home_proposals')
     away_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='away_proposals')
@@ -123,6 +334,7 @@ class DivisionSchedulingState(models.Model):
     tier = models.CharField(max_length=3, choices=Team.TIERS)
     season = models.CharField(max_length=9, default="2024-2025")  # e.g., "2024-2025"
     association = models.ForeignKey(Association, on_delete=models.CASCADE, related_name='division_states')
+    division = models.OneToOneField(Division, on_delete=models.CASCADE, related_name='scheduling_state', editable=False)
     
     # Scheduling configuration
     availability_deadline = models.DateTimeField()
@@ -137,16 +349,68 @@ class DivisionSchedulingState(models.Model):
     # Conflict tracking
     unmatched_teams = models.ManyToManyField(Team, blank=True, related_name='division_conflicts')
     last_notification_sent = models.DateTimeField(null=True, blank=True)
+    
+    # Processing leases, one per purpose, so only one scheduler worker checks a division's deadline
+    # and only one job generates its schedule at a time; their different lease lengths never mix
+    lease_owner = models.CharField(max_length=100, blank=True, default='')
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    generation_lease_owner = models.CharField(max_length=100, blank=True, default='')
+    generation_lease_expires_at = models.DateTimeField(null=True, blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        unique_together = ['age_group', 'tier', 'season', 'association']
         ordering = ['-created_at']
     
     def __str__(self):
         return f"{self.association.name} - {self.age_group} {self.tier} ({self.season}) - {self.status}"
     
+    def save(self, *args, **kwargs):
+        if self.division_id is None:
+            self.division = Division.resolve(self.age_group, self.tier, self.season, self.association_id)
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def for_division(cls, division):
+        """The division's state row, created with the default 30-day deadline if missing"""
+        division_state, created = cls.objects.get_or_create(
+            division=division,
+            defaults={
+                'age_group': division.age_group,
+                'tier': division.tier,
+                'season': division.season,
+                'association_id': division.association_id,
+                'availability_deadline': timezone.now() + timezone.timedelta(days=30),
+                'auto_schedule_enabled': True
+            }
+        )
+        return division_state
+    
+    # Lease purpose -> (owner field, expiry field)
+    LEASES = {
+        'deadline': ('lease_owner', 'lease_expires_at'),
+        'generation': ('generation_lease_owner', 'generation_lease_expires_at'),
+    }
+    
+    @classmethod
+    def acquire_lease(cls, state_id, owner, seconds, purpose='deadline'):
+        """Claim a division's processing lease for a purpose; True if this owner now holds it"""
+        owner_field, expires_field = cls.LEASES[purpose]
+        now = timezone.now()
+        claimed = cls.objects.filter(
+            models.Q(**{f'{expires_field}__isnull': True})
+            | models.Q(**{f'{expires_field}__lt': now})
+            | models.Q(**{owner_field: owner}),
+            id=state_id,
+        ).update(**{owner_field: owner, expires_field: now + timezone.timedelta(seconds=seconds)})
+        return claimed == 1
+    
+    @classmethod
+    def release_lease(cls, state_id, owner, purpose='deadline'):
+        owner_field, expires_field = cls.LEASES[purpose]
+        cls.objects.filter(id=state_id, **{owner_field: owner}).update(**{owner_field: '', expires_field: None})
+    
     def should_trigger_scheduling(self):
         """Determine if scheduling should be triggered based on conditions"""
         # Manual hold overrides everything
@@ -157,12 +421,7 @@ class DivisionSchedulingState(models.Model):
         deadline_reached = timezone.now() >= self.availability_deadline
         
         # Check if all teams have minimum availability
-        teams = Team.objects.filter(
-            age_group=self.age_group, 
-            tier=self.tier,
-            season=self.season,
-            club__association=self.association
-        )
+        teams = Team.objects.filter(division_id=self.division_id)
         
         if teams.count() < 2:
             return False, "Insufficient teams in division"
@@ -170,9 +429,12 @@ class DivisionSchedulingState(models.Model):
         required_series = teams.count() - 1
         all_teams_ready = True
         
+        from users.services.recurring_availability import division_availability
+        availability = division_availability(teams)
+        
         for team in teams:
-            home_dates = [td.date for td in team.dates.filter(is_home=True)]
-            away_dates = [td.date for td in team.dates.filter(is_home=False)]
+            home_dates = [d.date for d in availability[team.id] if d.is_home]
+            away_dates = [d.date for d in availability[team.id] if not d.is_home]
             
             home_series = self._count_weekend_series(home_dates)
             away_series = self._count_weekend_series(away_dates)
@@ -224,13 +486,37 @@ class SchedulingNotification(models.Model):
     message = models.TextField()
     sent_at = models.DateTimeField(auto_now_add=True)
     acknowledged = models.BooleanField(default=False)
+    # Waiting to go out in the team admins' next email digest (see notification_digest)
+    email_pending = models.BooleanField(default=False)
+    content_hash = models.CharField(max_length=64, blank=True, help_text="sha256 of team, type and message")
     
     class Meta:
         ordering = ['-sent_at']
+        indexes = [
+            models.Index(
+                fields=['team', 'content_hash'],
+                name='schednotif_pending_idx',
+                condition=models.Q(email_pending=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.team.name} - {self.notification_type} - {self.sent_at}"
 
+    @staticmethod
+    def hash_content(team_id, notification_type, message):
+        return hashlib.sha256(f"{team_id}|{notification_type}|{message}".encode()).hexdigest()
+
+
+class NotificationRecipientState(models.Model):
+    """Last digest sent to an email address, used to suppress repeats of the same digest"""
+    email = models.EmailField(unique=True)
+    last_sent_at = models.DateTimeField(db_index=True)
+    last_digest_hash = models.CharField(max_length=64)
+
+    def __str__(self):
+        return f"{self.email} - {self.last_sent_at}"
+
 class GeneratedSchedule(models.Model):
     """Stores generated division schedules with matches and metadata"""
     
@@ -239,15 +525,34 @@ class GeneratedSchedule(models.Model):
     tier = models.CharField(max_length=3, choices=Team.TIERS)
     season = models.CharField(max_length=9, default="2024-2025")
     association = models.ForeignKey(Association, on_delete=models.CASCADE, related_name='generated_schedules')
+    division = models.ForeignKey(Division, on_delete=models.CASCADE, related_name='schedules', editable=False)
     
     # Schedule metadata
     generated_at = models.DateTimeField(auto_now_add=True)
     generated_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='generated_schedules', null=True, blank=True)
     is_active = models.BooleanField(default=True, help_text="Whether this is the current active schedule")
     
+    # Version history: each version only stores matches that changed since its parent
+    version = models.PositiveIntegerField(default=1)
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='children')
+    matches_added = models.PositiveIntegerField(default=0)
+    matches_removed = models.PositiveIntegerField(default=0)
+    matches_moved = models.PositiveIntegerField(default=0)
+    
+    # Pre-rendered, gzip-compressed calendar data (see services/schedule_snapshot.py)
+    events_snapshot = models.BinaryField(null=True, blank=True, editable=False)
+    summary_snapshot = models.BinaryField(null=True, blank=True, editable=False)
+    
     class Meta:
         ordering = ['-generated_at']
-        unique_together = ['age_group', 'tier', 'season', 'association', 'is_active']
+        constraints = [
+            models.UniqueConstraint(fields=['division', 'version'], name='unique_schedule_version'),
+            models.UniqueConstraint(
+                fields=['division'],
+                condition=models.Q(is_active=True),
+                name='one_active_schedule_per_division',
+            ),
+        ]
     
     def __str__(self):
         from django.utils import timezone
@@ -255,6 +560,19 @@ class GeneratedSchedule(models.Model):
         # Convert UTC timestamp to Pacific Time for display
         generated_pacific = timezone.localtime(self.generated_at)
         return f"{self.association.name} - {self.age_group} {self.tier} ({self.season}) - Generated by {generator} at {generated_pacific} (Pacific)"
+    
+    def save(self, *args, **kwargs):
+        if self.division_id is None:
+            self.division = Division.resolve(self.age_group, self.tier, self.season, self.association_id)
+        super().save(*args, **kwargs)
+    
+    def schedule_matches(self):
+        """All matches that make up this version, including rows carried over from earlier versions"""
+        return ScheduleMatch.objects.filter(
+            models.Q(retired_in__isnull=True) | models.Q(retired_in__version__gt=self.version),
+            generated_schedule__division_id=self.division_id,
+            generated_schedule__version__lte=self.version,
+        )
 
 class ScheduleMatch(models.Model):
     """Individual matches within a generated schedule"""
@@ -271,8 +589,9 @@ class ScheduleMatch(models.Model):
         ('conflict', 'Conflict'),
     ]
     
-    # Reference to the generated schedule
+    # Schedule version that introduced this match, and the version that replaced it (if any)
     generated_schedule = models.ForeignKey(GeneratedSchedule, on_delete=models.CASCADE, related_name='matches')
+    retired_in = models.ForeignKey(GeneratedSchedule, on_delete=models.SET_NULL, null=True, blank=True, related_name='retired_matches')
     
     # Match details
     home_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='home_matches')
@@ -290,11 +609,253 @@ class ScheduleMatch(models.Model):
     
     class Meta:
         ordering = ['dates']
+        indexes = [
+            # Matches still live in the newest version
+            models.Index(fields=['generated_schedule'], condition=models.Q(retired_in__isnull=True), name='schedulematch_live_idx'),
+        ]
     
     def __str__(self):
         return f"{self.home_team.name} vs {self.away_team.name} - {self.dates}"
 
 
+class ScheduleMatchDate(models.Model):
+    """One row per team per game day of a scheduled match, so games can be range-queried by team or division"""
+    
+    match = models.ForeignKey(ScheduleMatch, on_delete=models.CASCADE, related_name='match_dates')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='match_dates')
+    opponent = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='+')
+    date = models.DateField()
+    is_home = models.BooleanField()
+    
+    # Division, copied from the schedule so division and association-wide queries need no joins
+    division = models.ForeignKey(Division, on_delete=models.CASCADE, related_name='match_dates', editable=False)
+    association = models.ForeignKey(Association, on_delete=models.CASCADE, related_name='match_dates')
+    age_group = models.CharField(max_length=5, choices=Team.AGE_GROUPS)
+    tier = models.CharField(max_length=3, choices=Team.TIERS)
+    season = models.CharField(max_length=9)
+    
+    class Meta:
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['team', 'date'], name='matchdate_team_date_idx'),
+            models.Index(fields=['division', 'date'], name='matchdate_division_date_idx'),
+            models.Index(fields=['association', 'date'], name='matchdate_association_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.team.name} {'vs' if self.is_home else '@'} {self.opponent.name} - {self.date}"
+
+
+class ScheduleExport(models.Model):
+    """A rendered CSV/PDF schedule export, reused until the underlying schedule version changes"""
+    
+    SCOPES = [
+        ('division', 'Division'),
+        ('team', 'Team'),
+        ('association', 'Association'),
+    ]
+    
+    FORMATS = [
+        ('csv', 'CSV'),
+        ('pdf', 'PDF'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('building', 'Building'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    
+    scope = models.CharField(max_length=15, choices=SCOPES)
+    scope_key = models.CharField(max_length=100, help_text="Team id, association id or division key")
+    format = models.CharField(max_length=3, choices=FORMATS)
+    version_key = models.CharField(max_length=64, help_text="Identifies the schedule version(s) the export was built from")
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    content = models.BinaryField(null=True, blank=True, editable=False)
+    filename = models.CharField(max_length=200)
+    error = models.TextField(blank=True)
+    
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='schedule_exports')
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True, help_text="When the current build started")
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'scope_key', 'format', 'version_key'], name='unique_schedule_export'),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+
+def generate_feed_token():
+    return secrets.token_urlsafe(32)
+
+
+class CalendarFeedToken(models.Model):
+    """Unguessable token that lets calendar apps subscribe to a team or division .ics feed without logging in"""
+    
+    token = models.CharField(max_length=64, unique=True, default=generate_feed_token, editable=False)
+    
+    # A team feed sets team; a division feed leaves it empty
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True, blank=True, related_name='calendar_feed_tokens')
+    age_group = models.CharField(max_length=5, choices=Team.AGE_GROUPS)
+    tier = models.CharField(max_length=3, choices=Team.TIERS)
+    season = models.CharField(max_length=9)
+    association = models.ForeignKey(Association, on_delete=models.CASCADE, related_name='calendar_feed_tokens')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            # One feed per team and one per division, so concurrent get_or_create calls can't duplicate them
+            models.UniqueConstraint(fields=['team'], condition=models.Q(team__isnull=False), name='unique_team_calendar_feed'),
+            models.UniqueConstraint(
+                fields=['age_group', 'tier', 'season', 'association'],
+                condition=models.Q(team__isnull=True),
+                name='unique_division_calendar_feed',
+            ),
+        ]
+    
+    def __str__(self):
+        target = self.team.name if self.team_id else f"{self.age_group} {self.tier} ({self.season})"
+        return f"Calendar feed: {target}"
+    
+    @classmethod
+    def for_team(cls, team):
+        feed, created = cls.objects.get_or_create(
+            team=team,
+            defaults={
+                'age_group': team.age_group,
+                'tier': team.tier,
+                'season': team.season,
+                'association': team.club.association,
+            }
+        )
+        return feed
+    
+    @classmethod
+    def for_division(cls, age_group, tier, season, association):
+        feed, created = cls.objects.get_or_create(
+            team=None, age_group=age_group, tier=tier, season=season, association=association
+        )
+        return feed
+
+
+class BackgroundJob(models.Model):
+    """A queued unit of background work, claimed by runjobs workers with SELECT ... FOR UPDATE SKIP LOCKED"""
+
+    KINDS = [
+        ('generate_schedule', 'Generate Schedule'),
+        ('deadline_schedule', 'Deadline Scheduling'),
+        ('flush_outbox', 'Send Outbox Emails'),
+        ('send_digests', 'Send Notification Digests'),
+        ('build_export', 'Build Export'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KINDS)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    priority = models.SmallIntegerField(default=0, help_text="Higher priority jobs are claimed first")
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Not claimed before this time (used for retry backoff)")
+
+    # Worker currently running the job
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    # Division a schedule generation job runs for; at most one such job per division is in flight
+    division_state = models.ForeignKey(
+        DivisionSchedulingState, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs'
+    )
+
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='background_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Workers only ever scan the queued jobs, highest priority and oldest first
+            models.Index(
+                fields=['-priority', 'run_after', 'id'],
+                name='backgroundjob_queue_idx',
+                condition=models.Q(status='queued'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} job {self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+
+class OutboundEmail(models.Model):
+    """An email waiting in the outbox; the flush_outbox job sends them in batches over one SMTP connection"""
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    recipients = models.JSONField(default=list)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True, help_text="Defaults to DEFAULT_FROM_EMAIL")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    # Division log context, recorded once the email has actually gone out
+    notification_type = models.CharField(max_length=50, blank=True)
+    details = models.TextField(blank=True)
+    team = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbound_emails')
+    age_group = models.CharField(max_length=5, blank=True)
+    tier = models.CharField(max_length=3, blank=True)
+    season = models.CharField(max_length=9, blank=True)
+    association = models.ForeignKey(Association, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbound_emails')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbound_emails')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                name='outboundemail_due_idx',
+                condition=models.Q(status='queued'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {len(self.recipients)} recipient(s) ({self.status})"
+
+
 class SystemSettings(models.Model):
     """
     System-wide configuration settings
@@ -359,11 +920,28 @@ class DivisionLog(models.Model):
         ('email_notification', 'Email Notification Sent'),
     ]
     
+    # Days detailed rows are kept before compact_division_logs rolls them into daily summaries and archives them
+    RETENTION_DAYS = {
+        'team_readiness': 14,
+        'user_login': 30,
+        'availability_updated': 90,
+        'email_notification': 90,
+        'system_info': 90,
+        'schedule_generation': 365,
+        'team_added': 365,
+        'team_deleted': 365,
+        'team_modified': 365,
+        'deadline_set': 365,
+    }
+    DEFAULT_RETENTION_DAYS = 180
+    
     # Division identification
     age_group = models.CharField(max_length=10)
     tier = models.CharField(max_length=5)
     season = models.CharField(max_length=20)
     association = models.ForeignKey(Association, on_delete=models.CASCADE)
+    # Filled from the columns above when buffered entries are written (see division_log_buffer)
+    division = models.ForeignKey(Division, on_delete=models.CASCADE, null=True, blank=True, related_name='logs')
     
     # Log details
     log_type = models.CharField(max_length=30, choices=LOG_TYPES)
@@ -378,15 +956,24 @@ class DivisionLog(models.Model):
     class Meta:
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['age_group', 'tier', 'season', 'association']),
+            # Keyset pages of the division log (division_log_feed): one division, newest first
+            models.Index(fields=['division', '-timestamp', '-id'], name='divisionlog_division_idx'),
+            models.Index(fields=['division', 'log_type', '-timestamp', '-id'], name='divisionlog_division_type_idx'),
             models.Index(fields=['timestamp']),
             models.Index(fields=['log_type']),
+            models.Index(fields=['team', 'log_type', '-timestamp'], name='divisionlog_team_type_idx'),
         ]
     
     def __str__(self):
         division_name = f"{self.age_group} {self.tier} ({self.season})"
         return f"{division_name} - {self.get_log_type_display()}: {self.message[:50]}..."
     
+    @classmethod
+    def record(cls, **fields):
+        """Add a log entry; written in bulk when the current request or job ends (see division_log_buffer)"""
+        from users.services import division_log_buffer
+        return division_log_buffer.add(cls(**fields))
+    
     @classmethod
     def log_team_readiness(cls, age_group, tier, season, association, team, home_games_needed, away_games_needed, user=None):
         """Log team readiness status"""
@@ -400,7 +987,7 @@ class DivisionLog(models.Model):
                 needed_parts.append(f"{away_games_needed} more away games")
             message = f"⚠️ {team.name} needs {' and '.join(needed_parts)}"
         
-        return cls.objects.create(
+        return cls.record(
             age_group=age_group,
             tier=tier,
             season=season,
@@ -429,7 +1016,7 @@ class DivisionLog(models.Model):
         if details:
             message += f" - {details}"
         
-        return cls.objects.create(
+        return cls.record(
             age_group=age_group,
             tier=tier,
             season=season,
@@ -445,7 +1032,7 @@ class DivisionLog(models.Model):
         """Log user login to division"""
         message = f"👤 {user.get_full_name() or user.username} accessed division"
         
-        return cls.objects.create(
+        return cls.record(
             age_group=age_group,
             tier=tier,
             season=season,
@@ -471,7 +1058,7 @@ class DivisionLog(models.Model):
         
         log_type = f"team_{action}"
         
-        return cls.objects.create(
+        return cls.record(
             age_group=age_group,
             tier=tier,
             season=season,
@@ -504,7 +1091,7 @@ class DivisionLog(models.Model):
         if details:
             message += f" - {details}"
         
-        return cls.objects.create(
+        return cls.record(
             age_group=age_group,
             tier=tier,
             season=season,
@@ -520,3 +1107,25 @@ class DivisionLog(models.Model):
             }
         )
 
+
+class DivisionLogDailySummary(models.Model):
+    """Per-division daily counts of DivisionLog entries that have been compacted out of the log table"""
+    age_group = models.CharField(max_length=10)
+    tier = models.CharField(max_length=5)
+    season = models.CharField(max_length=20)
+    association = models.ForeignKey(Association, on_delete=models.CASCADE, related_name='log_summaries')
+    date = models.DateField()
+    log_type = models.CharField(max_length=30, choices=DivisionLog.LOG_TYPES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date', 'log_type']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['association', 'age_group', 'tier', 'season', 'date', 'log_type'],
+                name='unique_divisionlog_daily_summary',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.age_group} {self.tier} ({self.season}) {self.date} {self.log_type}: {self.count}"
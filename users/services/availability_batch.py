@@ -0,0 +1,138 @@
+"""
+Batch availability edits for the team calendar.
+
+The calendar queues clicks and flushes them as a list of operations; this
+service applies the whole list in one transaction with a single bulk upsert,
+a single bulk delete and one summarised DivisionLog entry.
+
+Supported operations::
+
+    {"op": "set", "date": "2024-10-05", "is_home": true, "allow_doubleheader": false}
+    {"op": "doubleheader", "date": "2024-10-05", "allow_doubleheader": true}
+    {"op": "delete", "date": "2024-10-05"}
+    {"op": "copy", "source_team_id": 12, "start": "2023-10-01", "end": "2024-02-28", "shift_years": 1}
+"""
+from datetime import datetime
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from users.models import Team, TeamDate, TeamAvailabilityMask, DivisionLog
+from users.services.permissions import roles_for
+from users.services.recurring_availability import team_availability, exclude_dates
+
+BULK_BATCH_SIZE = 500
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _shift_years(day, years):
+    """Move a date by whole years, mapping Feb 29 to Feb 28 when needed"""
+    if not years:
+        return day
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        return day.replace(year=day.year + years, day=28)
+
+
+def apply_availability_operations(team, operations, user=None):
+    """
+    Apply a list of date operations to a team's availability.
+    Later operations on the same date win. Returns a summary dict.
+    When user is given, copies are only allowed from teams the user belongs to or administers.
+    """
+    current = {entry.date: entry for entry in team_availability(team)}
+
+    # date -> (is_home, allow_doubleheader) for upserts, or None for deletes
+    changes = {}
+    copied = 0
+
+    for operation in operations:
+        op = operation.get('op')
+
+        if op == 'set':
+            day = _parse_date(operation['date'])
+            changes[day] = (bool(operation['is_home']), bool(operation.get('allow_doubleheader', False)))
+
+        elif op == 'doubleheader':
+            day = _parse_date(operation['date'])
+            if day in changes and changes[day] is not None:
+                is_home = changes[day][0]
+            elif day in current:
+                is_home = current[day].is_home
+            else:
+                raise ValueError(f"No availability on {operation['date']} to toggle doubleheader for")
+            changes[day] = (is_home, bool(operation.get('allow_doubleheader', True)))
+
+        elif op == 'delete':
+            changes[_parse_date(operation['date'])] = None
+
+        elif op == 'copy':
+            source_team = Team.objects.get(id=operation['source_team_id'])
+            if user is not None:
+                roles = roles_for(user)
+                if not (roles.is_member(source_team) or roles.can_admin(source_team)):
+                    raise PermissionDenied("You can only copy availability from your own teams")
+            start = _parse_date(operation['start'])
+            end = _parse_date(operation['end'])
+            years = int(operation.get('shift_years', 0))
+            for entry in team_availability(source_team):
+                if start <= entry.date <= end:
+                    changes[_shift_years(entry.date, years)] = (entry.is_home, entry.allow_doubleheader)
+                    copied += 1
+
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+
+    upserts = [
+        TeamDate(team=team, date=day, is_home=values[0], allow_doubleheader=values[1])
+        for day, values in sorted(changes.items()) if values is not None
+    ]
+    deletes = [day for day, values in changes.items() if values is None]
+
+    from users.signals import suspend_mask_refresh
+
+    with transaction.atomic(), suspend_mask_refresh():
+        if upserts:
+            TeamDate.objects.bulk_create(
+                upserts,
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['team', 'date'],
+                update_fields=['is_home', 'allow_doubleheader'],
+            )
+        if deletes:
+            TeamDate.objects.filter(team=team, date__in=deletes).delete()
+            exclude_dates(team, deletes)
+
+        TeamAvailabilityMask.refresh_for_team(team)
+
+        summary = {
+            'operations': len(operations),
+            'upserted': len(upserts),
+            'deleted': len(deletes),
+            'copied': copied,
+        }
+        DivisionLog.record(
+            age_group=team.age_group,
+            tier=team.tier,
+            season=team.season,
+            association=team.club.association,
+            log_type='availability_updated',
+            message=(
+                f"📅 {team.name}: Batch availability update - "
+                f"{len(upserts)} dates set, {len(deletes)} removed"
+                + (f", {copied} copied" if copied else "")
+            ),
+            user=user,
+            team=team,
+            metadata={
+                **summary,
+                'first_date': min(changes).isoformat() if changes else None,
+                'last_date': max(changes).isoformat() if changes else None,
+                'action': 'batch',
+            }
+        )
+
+    return summary
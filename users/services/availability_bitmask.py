@@ -0,0 +1,169 @@
+"""
+Day bitmask codec for team availability.
+
+Each team's availability is mirrored into three equal-length bit strings
+(home, away, doubleheader) where bit ``i`` is set when the team is available
+on ``start + i`` days. The window runs from the team's first available day
+to its last, so no date is dropped whatever the team's season string says.
+On PostgreSQL the strings are stored as ``bit varying``; masks of two teams
+are aligned to their overlapping days before ``&``/``|`` in the database.
+"""
+from datetime import timedelta
+from django.db import connection
+
+SATURDAY = 5
+
+
+def day_index(day, start, length):
+    """Return the bit position for a date, or None if outside the window"""
+    index = (day - start).days
+    if 0 <= index < length:
+        return index
+    return None
+
+
+def encode_dates(dates, start, length):
+    """Encode an iterable of dates as a bit string of length days starting at start"""
+    bits = ['0'] * length
+    for day in dates:
+        index = day_index(day, start, length)
+        if index is not None:
+            bits[index] = '1'
+    return ''.join(bits)
+
+
+def decode_bits(bits, start):
+    """Decode a bit string back into a sorted list of dates"""
+    return [start + timedelta(days=i) for i, bit in enumerate(bits or '') if bit == '1']
+
+
+def and_bits(a, b):
+    """Bitwise AND of two equal-length bit strings"""
+    return ''.join('1' if x == '1' and y == '1' else '0' for x, y in zip(a, b))
+
+
+def or_bits(a, b):
+    """Bitwise OR of two equal-length bit strings"""
+    return ''.join('1' if x == '1' or y == '1' else '0' for x, y in zip(a, b))
+
+
+def popcount(bits):
+    """Number of set bits"""
+    return (bits or '').count('1')
+
+
+def weekend_series(bits, start):
+    """Return (saturday, sunday) pairs where both days are set in the bit string"""
+    series = []
+    if not bits:
+        return series
+    first_saturday = (SATURDAY - start.weekday()) % 7
+    for i in range(first_saturday, len(bits) - 1, 7):
+        if bits[i] == '1' and bits[i + 1] == '1':
+            saturday = start + timedelta(days=i)
+            series.append((saturday, saturday + timedelta(days=1)))
+    return series
+
+
+def encode_team_dates(team_dates):
+    """
+    Build (start, home_bits, away_bits, doubleheader_bits) from TeamDate rows, AvailabilityDate
+    entries or (date, is_home, allow_doubleheader) tuples. start is None when there are no dates.
+    """
+    home, away, doubleheader = [], [], []
+    for row in team_dates:
+        if hasattr(row, 'is_home'):
+            day, is_home, allow_doubleheader = row.date, row.is_home, row.allow_doubleheader
+        else:
+            day, is_home, allow_doubleheader = row
+        (home if is_home else away).append(day)
+        if allow_doubleheader:
+            doubleheader.append(day)
+    days = home + away
+    if not days:
+        return None, '', '', ''
+    start = min(days)
+    length = (max(days) - start).days + 1
+    return (
+        start,
+        encode_dates(home, start, length),
+        encode_dates(away, start, length),
+        encode_dates(doubleheader, start, length),
+    )
+
+
+def _overlap(first_start, first_bits, second_start, second_bits):
+    """The two bit strings cut to the days both cover, and the first of those days"""
+    start = max(first_start, second_start)
+    end = min(first_start + timedelta(days=len(first_bits)), second_start + timedelta(days=len(second_bits)))
+    if end <= start:
+        return start, '', ''
+    first = first_bits[(start - first_start).days:(end - first_start).days]
+    second = second_bits[(start - second_start).days:(end - second_start).days]
+    return start, first, second
+
+
+def shared_weekends(home_team_id, away_team_id):
+    """
+    Weekends on which the home team can host and the away team can travel.
+    The intersection is computed by PostgreSQL when available.
+    """
+    from users.models import TeamAvailabilityMask
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # Cut both masks to the days they share, so the & operands have equal lengths
+            cursor.execute(
+                f"""
+                SELECT (
+                    substring(h.home_bits FROM (w.first_day - h.season_start) + 1 FOR w.last_day - w.first_day)
+                    & substring(a.away_bits FROM (w.first_day - a.season_start) + 1 FOR w.last_day - w.first_day)
+                )::text, w.first_day
+                FROM {TeamAvailabilityMask._meta.db_table} h
+                JOIN {TeamAvailabilityMask._meta.db_table} a ON a.team_id = %s
+                CROSS JOIN LATERAL (
+                    SELECT GREATEST(h.season_start, a.season_start) AS first_day,
+                           LEAST(h.season_start + length(h.home_bits), a.season_start + length(a.away_bits)) AS last_day
+                ) w
+                WHERE h.team_id = %s AND w.last_day > w.first_day
+                """,
+                [away_team_id, home_team_id],
+            )
+            row = cursor.fetchone()
+        if not row:
+            return []
+        return weekend_series(row[0], row[1])
+
+    masks = {m.team_id: m for m in TeamAvailabilityMask.objects.filter(team_id__in=[home_team_id, away_team_id])}
+    home, away = masks.get(home_team_id), masks.get(away_team_id)
+    if not home or not away:
+        return []
+    start, home_bits, away_bits = _overlap(home.season_start, home.home_bits, away.season_start, away.away_bits)
+    return weekend_series(and_bits(home_bits, away_bits), start)
+
+
+def teams_free_on_weekend(team_ids, saturday):
+    """Count how many of the given teams have home or away availability on both days of a weekend"""
+    from users.models import TeamAvailabilityMask
+
+    team_ids = list(team_ids)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT COUNT(*)
+                FROM {TeamAvailabilityMask._meta.db_table}
+                WHERE team_id = ANY(%s) AND season_start <= %s
+                  AND substring((home_bits | away_bits) FROM (%s - season_start) + 1 FOR 2) = B'11'
+                """,
+                [team_ids, saturday, saturday],
+            )
+            return cursor.fetchone()[0]
+
+    count = 0
+    for mask in TeamAvailabilityMask.objects.filter(team_id__in=team_ids, season_start__lte=saturday):
+        index = (saturday - mask.season_start).days
+        combined = or_bits(mask.home_bits, mask.away_bits)
+        if combined[index:index + 2] == '11':
+            count += 1
+    return count
@@ -1,24 +1,59 @@
 """
 Simple background thread scheduler to replace Celery for deadline-based scheduling
+
+Upcoming availability deadlines are kept in an in-memory min-heap; the thread
+sleeps until the earliest one (or until it is signalled that deadlines
+changed) instead of polling the database on a fixed interval. Deadline
+changes made in other processes (web workers, job workers) arrive as
+PostgreSQL NOTIFYs on DEADLINES_CHANNEL, which a listener thread turns into
+a heap rebuild.
 """
+import heapq
+import select
+import socket
 import threading
 import time
 import logging
 import os
 from datetime import datetime
+from django.db import connection, connections, transaction
 from django.utils import timezone
 from django.apps import apps
 
 logger = logging.getLogger(__name__)
 
+# NOTIFY channel announcing that division deadlines changed
+DEADLINES_CHANNEL = 'division_deadlines_changed'
+
+# Upper bound on sleep; a safety net should a NOTIFY be lost while the listener reconnects
+HEAP_RESYNC_SECONDS = 300
+
+# How often the listener checks whether the scheduler is stopping, and waits before reconnecting
+LISTEN_POLL_SECONDS = 5
+LISTEN_RETRY_SECONDS = 30
+
+# How long a worker may hold a division while checking its deadline before another worker can take over
+LEASE_SECONDS = 15 * 60
+
 class BackgroundScheduler:
     """Simple background thread scheduler for division deadline scheduling"""
     
-    def __init__(self):
+    def __init__(self, worker_id=None):
         self.thread = None
         self.running = False
         self.check_interval = self._get_check_interval()  # Get interval from system settings
         self.instance_id = id(self)  # Unique identifier for this instance
+        # Identifies this scheduler in division leases when several run across processes/nodes
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{self.instance_id}"
+        
+        # Min-heap of (deadline timestamp, division state id); _deadlines holds the
+        # current deadline per state so superseded heap entries can be skipped
+        self._heap = []
+        self._deadlines = {}
+        self._heap_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._rebuild_requested = threading.Event()
+        self._listener = None
     
     def _get_check_interval(self):
         """Get the current check interval from system settings"""
@@ -78,100 +113,183 @@ class BackgroundScheduler:
         logger.info(f"✅ Background scheduler instance {self.instance_id} started successfully")
         print(f"📍 BackgroundScheduler.start() completed")
     
+    def run_forever(self):
+        """Run the scheduler loop in the calling thread (used by the runscheduler command)"""
+        logger.info(f"🚀 Running background scheduler {self.worker_id} in the foreground")
+        self.running = True
+        self._run_scheduler()
+    
+    def request_stop(self):
+        """Ask the loop to exit without waiting for it (safe to call from a signal handler)"""
+        self.running = False
+        self._wakeup.set()
+    
     def stop(self):
         """Stop the background scheduler thread"""
         logger.info(f"🛑 Stopping background scheduler instance {self.instance_id}")
-        self.running = False
+        self.request_stop()
         if self.thread:
             self.thread.join()
         logger.info(f"✅ Background scheduler instance {self.instance_id} stopped")
     
     def _run_scheduler(self):
-        """Main scheduler loop that checks for deadlines"""
+        """Main scheduler loop: sleep until the earliest deadline, then process the due divisions"""
         print(f"📍 _run_scheduler thread starting for instance {self.instance_id}")
-        logger.info(f"🤖 Background scheduler thread {self.instance_id} started - checking for deadline triggers every {self.check_interval} seconds")
+        logger.info(f"🤖 Background scheduler thread {self.instance_id} started - waiting on the deadline queue")
         
-        settings_check_counter = 0
-        settings_check_interval = 10  # Check settings every 10 cycles
+        self._rebuild_requested.set()
+        self._start_listener()
         
         while self.running:
             try:
-                print(f"📍 _run_scheduler checking deadlines...")
-                self._check_deadlines()
-                print(f"📍 _run_scheduler finished checking deadlines")
-                
-                # Periodically check for settings updates
-                settings_check_counter += 1
-                if settings_check_counter >= settings_check_interval:
+                if self._rebuild_requested.is_set():
+                    self._rebuild_requested.clear()
                     self.update_check_interval()
-                    settings_check_counter = 0
+                    self._rebuild_heap()
+                
+                due = self._pop_due(time.time())
+                if due:
+                    self._check_deadlines(due)
                     
             except Exception as e:
                 print(f"❌ Error in _run_scheduler: {e}")  
                 logger.error(f"❌ Error in background scheduler {self.instance_id}: {e}")
             
-            # Sleep for the check interval
-            logger.debug(f"😴 Background scheduler {self.instance_id} sleeping for {self.check_interval} seconds...")
-            print(f"📍 _run_scheduler sleeping for {self.check_interval} seconds...")
-            time.sleep(self.check_interval)
+            timeout = self._seconds_until_next_deadline()
+            logger.debug(f"😴 Background scheduler {self.instance_id} sleeping for {timeout:.0f} seconds...")
+            if self._wakeup.wait(timeout):
+                self._wakeup.clear()
+            else:
+                # Periodic resync in case deadlines were changed by another process
+                self._rebuild_requested.set()
         
         print(f"📍 _run_scheduler thread ending for instance {self.instance_id}")
     
-    def _check_deadlines(self):
-        """Check all division states for deadline triggers"""
-        print(f"📍 _check_deadlines called")
+    def _start_listener(self):
+        """Listen for deadline changes from other processes (PostgreSQL only)"""
+        if connection.vendor != 'postgresql':
+            return
+        if self._listener and self._listener.is_alive():
+            return
+        self._listener = threading.Thread(target=self._listen_for_changes, daemon=True)
+        self._listener.start()
+    
+    def _listen_for_changes(self):
+        """LISTEN on DEADLINES_CHANNEL with a dedicated connection; each NOTIFY triggers a heap rebuild"""
+        while self.running:
+            listener = connections.create_connection('default')
+            try:
+                listener.ensure_connection()
+                with listener.cursor() as cursor:
+                    cursor.execute(f"LISTEN {DEADLINES_CHANNEL}")
+                logger.info(f"👂 Background scheduler {self.instance_id} listening for deadline changes")
+                # Changes made while no listener was connected were missed, so resync once
+                self.deadlines_changed()
+                
+                raw = listener.connection
+                while self.running:
+                    if not select.select([raw], [], [], LISTEN_POLL_SECONDS)[0]:
+                        continue
+                    raw.poll()
+                    if raw.notifies:
+                        raw.notifies.clear()
+                        logger.info(f"📣 Background scheduler {self.instance_id} notified of deadline changes")
+                        self.deadlines_changed()
+            except Exception as e:
+                logger.warning(f"⚠️ Deadline listener for scheduler {self.instance_id} failed, reconnecting: {e}")
+                time.sleep(LISTEN_RETRY_SECONDS)
+            finally:
+                listener.close()
+    
+    def _rebuild_heap(self):
+        """Reload upcoming deadlines for waiting, auto-scheduled divisions in one query"""
+        DivisionSchedulingState = apps.get_model('users', 'DivisionSchedulingState')
+        rows = DivisionSchedulingState.objects.filter(
+            auto_schedule_enabled=True,
+            status='waiting'
+        ).values_list('id', 'availability_deadline')
         
-        # Get current time in Pacific timezone for logging
+        deadlines = {state_id: deadline.timestamp() for state_id, deadline in rows if deadline}
+        heap = [(timestamp, state_id) for state_id, timestamp in deadlines.items()]
+        heapq.heapify(heap)
+        with self._heap_lock:
+            self._heap = heap
+            self._deadlines = deadlines
+        logger.info(f"📋 Background scheduler tracking {len(heap)} division deadline(s)")
+    
+    def _push(self, state_id, timestamp):
+        with self._heap_lock:
+            self._deadlines[state_id] = timestamp
+            heapq.heappush(self._heap, (timestamp, state_id))
+    
+    def _pop_due(self, now):
+        """Pop the ids of divisions whose deadline has passed, skipping superseded entries"""
+        due = []
+        with self._heap_lock:
+            while self._heap and self._heap[0][0] <= now:
+                timestamp, state_id = heapq.heappop(self._heap)
+                if self._deadlines.get(state_id) == timestamp:
+                    del self._deadlines[state_id]
+                    due.append(state_id)
+        return due
+    
+    def _seconds_until_next_deadline(self):
+        with self._heap_lock:
+            while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)  # Drop superseded entries
+            if not self._heap:
+                return HEAP_RESYNC_SECONDS
+            return min(max(self._heap[0][0] - time.time(), 0), HEAP_RESYNC_SECONDS)
+    
+    def deadlines_changed(self):
+        """Signal that deadlines changed; the heap is rebuilt and the thread re-evaluates its sleep"""
+        self._rebuild_requested.set()
+        self._wakeup.set()
+    
+    def _check_deadlines(self, state_ids):
+        """Check the given division states for deadline triggers, leasing each so no other worker processes it"""
         current_time = timezone.now()
         pacific_time = timezone.localtime(current_time)
-        logger.info(f"🔍 Background scheduler checking for divisions with passed deadlines at {pacific_time} (Pacific)")
+        logger.info(f"🔍 Background scheduler processing {len(state_ids)} division(s) with passed deadlines at {pacific_time} (Pacific)")
         
         try:
             # Import here to avoid circular imports and ensure apps are loaded
             DivisionSchedulingState = apps.get_model('users', 'DivisionSchedulingState')
-            print(f"📍 Got DivisionSchedulingState model")
-            
-            # Get all division states that might need scheduling
-            all_division_states = DivisionSchedulingState.objects.all()
-            logger.info(f"📊 Total division states in database: {all_division_states.count()}")
-            
-            eligible_states = DivisionSchedulingState.objects.filter(
-                auto_schedule_enabled=True,
-                status='waiting'
-            )
-            logger.info(f"📋 Division states with auto-schedule enabled and waiting status: {eligible_states.count()}")
-            
-            division_states = DivisionSchedulingState.objects.filter(
-                auto_schedule_enabled=True,
-                status='waiting',
-                availability_deadline__lte=timezone.now()
-            )
             
-            if division_states.exists():
-                logger.info(f"⏰ Found {division_states.count()} division(s) with passed deadlines - processing...")
-                for division_state in division_states:
-                    deadline_pacific = timezone.localtime(division_state.availability_deadline)
-                    logger.info(f"  🎯 Processing: {division_state}")
-                    logger.info(f"     Deadline: {deadline_pacific} (Pacific)")
-                    logger.info(f"     Status: {division_state.status}")
-                    logger.info(f"     Auto enabled: {division_state.auto_schedule_enabled}")
-            else:
-                logger.info(f"✅ No divisions found with passed deadlines requiring scheduling")
-            
-            for division_state in division_states:
+            for state_id in state_ids:
+                if not DivisionSchedulingState.acquire_lease(state_id, self.worker_id, LEASE_SECONDS):
+                    logger.info(f"⏭️ Division state {state_id} is leased by another scheduler worker - skipping")
+                    continue
+                
                 try:
-                    logger.info(f"🔧 Checking trigger conditions for {division_state}")
+                    division_state = DivisionSchedulingState.objects.filter(
+                        id=state_id,
+                        auto_schedule_enabled=True,
+                        status='waiting',
+                        availability_deadline__lte=current_time
+                    ).select_related('association').first()
+                    if division_state is None:
+                        continue
+                    
+                    deadline_pacific = timezone.localtime(division_state.availability_deadline)
+                    logger.info(f"🔧 Checking trigger conditions for {division_state} (deadline {deadline_pacific} Pacific)")
                     should_trigger, reason = division_state.should_trigger_scheduling()
                     logger.info(f"   Should trigger: {should_trigger}, Reason: {reason}")
                     
                     if should_trigger:
                         logger.info(f"🎯 DEADLINE HIT! Triggering scheduling for {division_state}")
                         self._trigger_scheduling(division_state)
+                        if division_state.status == 'waiting':
+                            self._push(division_state.id, time.time() + self.check_interval)
                     else:
+                        # Still waiting on availability; look again after the retry interval
                         logger.info(f"⚠️ Not triggering scheduling for {division_state}: {reason}")
+                        self._push(division_state.id, time.time() + self.check_interval)
                         
                 except Exception as e:
-                    logger.error(f"❌ Error checking deadline for {division_state}: {e}")
+                    logger.error(f"❌ Error checking deadline for division state {state_id}: {e}")
+                finally:
+                    DivisionSchedulingState.release_lease(state_id, self.worker_id)
                     
         except Exception as e:
             print(f"❌ Error in _check_deadlines: {e}")
@@ -180,50 +298,30 @@ class BackgroundScheduler:
             traceback.print_exc()
     
     def _trigger_scheduling(self, division_state):
-        """Trigger scheduling for a division"""
+        """Queue deadline scheduling for a division; a job worker generates the schedule"""
         try:
-            logger.info(f"🔥 BACKGROUND SCHEDULER: Initiating schedule generation for {division_state}")
-            
-            # Import here to avoid circular imports
-            from users.services.schedule_orchestration import SchedulingOrchestrationService
-            
-            # Create orchestration service and trigger scheduling
-            service = SchedulingOrchestrationService(
-                division_state.age_group, 
-                division_state.tier, 
-                division_state.season,
-                division_state.association
-            )
-            
-            # Attempt to trigger scheduling
-            success, message = service.check_and_trigger_scheduling(manual_trigger=False)
-            
-            if success:
-                logger.info(f"🎉 BACKGROUND SCHEDULER: Successfully triggered scheduling for {division_state}: {message}")
-            else:
-                logger.warning(f"⚠️ BACKGROUND SCHEDULER: Failed to trigger scheduling for {division_state}: {message}")
-            
-            # Update the division state
-            division_state.last_schedule_attempt = timezone.now()
-            if success:
-                division_state.status = 'triggered'
-            division_state.save()
-            
+            logger.info(f"🔥 BACKGROUND SCHEDULER: Queueing schedule generation for {division_state}")
+            job = queue_deadline_scheduling(division_state)
+            logger.info(f"🎉 BACKGROUND SCHEDULER: Queued {job} for {division_state}")
         except Exception as e:
-            logger.error(f"❌ BACKGROUND SCHEDULER: Error triggering scheduling for {division_state}: {e}")
+            logger.error(f"❌ BACKGROUND SCHEDULER: Error queueing scheduling for {division_state}: {e}")
     
     def schedule_deadline_check(self, division_state):
         """Schedule a deadline check for a specific division (for immediate use)"""
-        # For the background thread approach, we just mark it as scheduled
-        # The background thread will pick it up on the next check
         division_state.task_scheduled = True
         division_state.save()
+        self._push(division_state.id, division_state.availability_deadline.timestamp())
+        self._wakeup.set()
+        # The scheduler that acts on the deadline usually runs in another process
+        publish_deadlines_changed()
         logger.info(f"Scheduled deadline check for {division_state}")
     
     def cancel_deadline_check(self, division_state):
         """Cancel a scheduled deadline check"""
         division_state.task_scheduled = False
         division_state.save()
+        with self._heap_lock:
+            self._deadlines.pop(division_state.id, None)
         logger.info(f"Cancelled deadline check for {division_state}")
     
     def update_check_interval(self):
@@ -236,6 +334,22 @@ class BackgroundScheduler:
         return self.check_interval
 
 
+def queue_deadline_scheduling(division_state):
+    """Queue a deadline_schedule job and mark the division triggered so it isn't queued twice"""
+    from users.services import job_queue
+    
+    job, created = job_queue.enqueue_generation(
+        'deadline_schedule', division_state, {'division_state_id': division_state.id}
+    )
+    if not created:
+        # A manual generation is already running; the division is checked again after it finishes
+        return job
+    division_state.last_schedule_attempt = timezone.now()
+    division_state.status = 'triggered'
+    division_state.save(update_fields=['last_schedule_attempt', 'status', 'updated_at'])
+    return job
+
+
 # Global scheduler instance
 _scheduler = None
 _scheduler_lock = threading.Lock()  # Thread lock for scheduler access
@@ -299,6 +413,20 @@ def start_scheduler():
         import traceback
         traceback.print_exc()
 
+def publish_deadlines_changed():
+    """NOTIFY schedulers in every process; PostgreSQL delivers it when the current transaction commits"""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"NOTIFY {DEADLINES_CHANNEL}")
+
+def notify_deadlines_changed():
+    """Wake the schedulers in this and other processes after deadlines were changed in bulk"""
+    scheduler = _scheduler
+    if scheduler is not None and scheduler.running:
+        transaction.on_commit(scheduler.deadlines_changed)
+    publish_deadlines_changed()
+
 def stop_scheduler():
     """Stop the global background scheduler"""
     global _scheduler
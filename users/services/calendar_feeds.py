@@ -0,0 +1,62 @@
+"""
+Date-windowed JSON event feeds for the FullCalendar pages.
+
+FullCalendar requests ``?start=...&end=...`` for the visible range; these
+helpers turn that window into database filters and compact event payloads.
+"""
+from datetime import date, timedelta
+
+# Compact separators keep the payload small (and gzip well)
+COMPACT_JSON = {'separators': (',', ':')}
+
+
+def parse_window(start_param, end_param):
+    """Parse FullCalendar start/end params (ISO dates or datetimes) into dates"""
+    def _parse(value):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return _parse(start_param), _parse(end_param)
+
+
+def availability_events(entries):
+    """Team availability entries -> FullCalendar events"""
+    return [
+        {
+            'title': 'Home Game' if entry.is_home else 'Away Game',
+            'start': entry.date.isoformat(),
+            'allow_doubleheader': entry.allow_doubleheader,
+            'from_rule': entry.from_rule,
+        }
+        for entry in entries
+    ]
+
+
+def match_dates(match):
+    """Dates of a ScheduleMatch as date objects"""
+    return [date.fromisoformat(value) for value in match.dates]
+
+
+def match_event(match):
+    """A scheduled ScheduleMatch -> FullCalendar event, or None if it has no dates"""
+    dates = match_dates(match)
+    if not dates:
+        return None
+    event = {
+        'title': f"{match.home_team.name} vs {match.away_team.name}",
+        'start': dates[0].isoformat(),
+        'color': '#0d6efd',
+        'extendedProps': {
+            'home': match.home_team.name,
+            'away': match.away_team.name,
+            'type': match.match_type,
+        },
+    }
+    if len(dates) > 1:
+        # FullCalendar expects end to be exclusive, so add one day
+        event['end'] = (dates[-1] + timedelta(days=1)).isoformat()
+    return event
+
@@ -0,0 +1,108 @@
+"""
+Write-behind buffer for DivisionLog entries.
+
+Inside buffered() (every request, via DivisionLogBufferMiddleware, and
+every background job) DivisionLog.record collects entries in memory and
+they are written with one bulk_create when the block ends, after the
+surrounding transaction commits. Outside a buffer entries are written
+the same way one at a time. Team readiness entries identical to the
+team's previous readiness entry in the division are dropped, so viewing
+the division logs no longer adds a row per team on every visit.
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_entries = ContextVar('division_log_entries', default=None)
+
+
+def start():
+    """Begin buffering in the current context; returns (entries, token) for stop()"""
+    entries = []
+    return entries, _entries.set(entries)
+
+
+def stop(token):
+    _entries.reset(token)
+
+
+@contextmanager
+def buffered():
+    """Buffer DivisionLog entries until the block ends; nested blocks share the outer buffer"""
+    if _entries.get() is not None:
+        yield
+        return
+    entries, token = start()
+    try:
+        yield
+    finally:
+        stop(token)
+        flush(entries)
+
+
+def add(entry):
+    """Buffer an unsaved DivisionLog, or queue it for writing straight away when no buffer is active"""
+    entries = _entries.get()
+    if entries is None:
+        flush([entry])
+    else:
+        entries.append(entry)
+    return entry
+
+
+def flush(entries):
+    """Write entries with one bulk_create once the current transaction (if any) commits"""
+    if not entries:
+        return
+
+    def write():
+        from users.models import DivisionLog, Division
+
+        changed = _drop_unchanged_readiness(entries)
+        if changed:
+            Division.assign(changed)
+            DivisionLog.objects.bulk_create(changed)
+
+    # robust: a failed log write is logged rather than breaking the request or job that made it
+    transaction.on_commit(write, robust=True)
+
+
+def _readiness_key(team_id, age_group, tier, season, association_id):
+    return team_id, age_group, tier, season, association_id
+
+
+def _drop_unchanged_readiness(entries):
+    """Remove team_readiness entries whose metadata matches the team's latest readiness entry"""
+    from users.models import DivisionLog
+
+    readiness = [entry for entry in entries if entry.log_type == 'team_readiness' and entry.team_id]
+    if not readiness:
+        return entries
+
+    division_fields = ('team_id', 'age_group', 'tier', 'season', 'association_id')
+    # DISTINCT ON: the newest readiness entry per team and division
+    latest = {
+        _readiness_key(*row[:-1]): row[-1]
+        for row in DivisionLog.objects.filter(
+            log_type='team_readiness',
+            team_id__in={entry.team_id for entry in readiness},
+        )
+        .order_by(*division_fields, '-timestamp', '-id')
+        .distinct(*division_fields)
+        .values_list(*division_fields, 'metadata')
+    }
+
+    kept = []
+    for entry in entries:
+        if entry.log_type == 'team_readiness' and entry.team_id:
+            key = _readiness_key(entry.team_id, entry.age_group, entry.tier, entry.season, entry.association_id)
+            if latest.get(key) == entry.metadata:
+                continue
+            latest[key] = entry.metadata
+        kept.append(entry)
+    if len(kept) < len(entries):
+        logger.debug(f"🧹 Skipped {len(entries) - len(kept)} unchanged team readiness log entries")
+    return kept
@@ -0,0 +1,111 @@
+"""
+Keyset-paginated reads of a division's DivisionLog entries.
+
+Pages are ordered newest first by (timestamp, id) and continue from an
+opaque cursor holding the last entry's (timestamp, id), so every page is
+an index range scan on divisionlog_division_idx (or
+divisionlog_division_type_idx when filtered by log type) no matter how
+deep the reader has scrolled.
+"""
+import base64
+from datetime import datetime, time
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidLogQuery(ValueError):
+    """A cursor or filter value that can't be parsed"""
+
+
+def encode_cursor(entry):
+    raw = f"{entry.timestamp.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, entry_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        parsed = parse_datetime(timestamp)
+        if parsed is None:
+            raise ValueError(timestamp)
+        return parsed, int(entry_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidLogQuery(f"Invalid cursor: {cursor}") from e
+
+
+def _parse_bound(value, end_of_day=False):
+    """ISO datetime, or a date meaning the start (or end) of that day in the site timezone"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise InvalidLogQuery(f"Invalid date: {value}")
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _parse_id(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise InvalidLogQuery(f"Invalid {name}: {value}")
+
+
+def log_page(division, cursor=None, limit=DEFAULT_PAGE_SIZE,
+             log_types=None, team_id=None, user_id=None, since=None, until=None):
+    """
+    One page of a division's log entries, newest first.
+    Filter values are the raw strings from the query string. Returns (entries, next_cursor);
+    next_cursor is None on the last page.
+    """
+    from users.models import DivisionLog
+
+    entries = DivisionLog.objects.filter(division=division)
+    if log_types:
+        entries = entries.filter(log_type__in=log_types)
+    if team_id:
+        entries = entries.filter(team_id=_parse_id(team_id, 'team'))
+    if user_id:
+        entries = entries.filter(user_id=_parse_id(user_id, 'user'))
+    if since:
+        entries = entries.filter(timestamp__gte=_parse_bound(since))
+    if until:
+        entries = entries.filter(timestamp__lte=_parse_bound(until, end_of_day=True))
+    if cursor:
+        timestamp, entry_id = decode_cursor(cursor)
+        entries = entries.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=entry_id))
+
+    limit = max(1, min(_parse_id(limit or DEFAULT_PAGE_SIZE, 'limit'), MAX_PAGE_SIZE))
+    # One extra row tells us whether another page follows
+    page = list(
+        entries.select_related('user', 'team')
+        .only(
+            'id', 'timestamp', 'log_type', 'message', 'user', 'team',
+            'user__id', 'user__username', 'user__first_name', 'user__last_name',
+            'team__id', 'team__name',
+        )
+        .order_by('-timestamp', '-id')[:limit + 1]
+    )
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def serialize_entry(entry):
+    return {
+        'id': entry.id,
+        'timestamp': entry.timestamp.isoformat(),
+        'log_type': entry.log_type,
+        'log_type_display': entry.get_log_type_display(),
+        'message': entry.message,
+        'user_id': entry.user_id,
+        'user': (entry.user.get_full_name() or entry.user.username) if entry.user else None,
+        'team_id': entry.team_id,
+        'team': entry.team.name if entry.team else None,
+    }
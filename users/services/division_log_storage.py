@@ -0,0 +1,235 @@
+"""
+Storage upkeep for DivisionLog: monthly partitions, retention and compaction.
+
+On PostgreSQL users_divisionlog is range-partitioned by month on
+timestamp (migration 0033), with a default partition catching anything
+outside the monthly ones. compact() rolls rows older than their
+log_type's retention (DivisionLog.RETENTION_DAYS) into per-division
+DivisionLogDailySummary counts, writes the raw rows to a gzipped JSONL
+archive, deletes them, then drops emptied monthly partitions and creates
+the coming months' partitions. Run it daily with compact_division_logs.
+"""
+import gzip
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Rows archived and deleted per transaction
+BATCH_SIZE = 5000
+
+# Monthly partitions kept ready ahead of the current month
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _table():
+    from users.models import DivisionLog
+    return DivisionLog._meta.db_table
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    return f"{_table()}_p{month:%Y_%m}"
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", [_table()])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def _partitions(cursor):
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass",
+        [_table()],
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def ensure_partitions(months_ahead=PARTITION_MONTHS_AHEAD, now=None):
+    """Create monthly partitions from the current month through months_ahead; returns the names created"""
+    if not is_partitioned():
+        return []
+
+    table = _table()
+    default = f"{table}_default"
+    current = _month_start(now or timezone.now())
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        existing = _partitions(cursor)
+        for offset in range(months_ahead + 1):
+            month = _add_months(current, offset)
+            name = partition_name(month)
+            if name in existing:
+                continue
+            bounds = [month, _add_months(month, 1)]
+            cursor.execute(
+                f'SELECT EXISTS (SELECT 1 FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s)', bounds
+            )
+            strays = cursor.fetchone()[0]
+            if strays:
+                # Rows for this month landed in the default partition; move them into the new one
+                cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {default}')
+            cursor.execute(
+                f'CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)', bounds
+            )
+            if strays:
+                cursor.execute(
+                    f'WITH moved AS (DELETE FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+                    f'INSERT INTO {table} SELECT * FROM moved',
+                    bounds,
+                )
+                cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT')
+            created.append(name)
+    if created:
+        logger.info(f"🗂️ Created DivisionLog partitions: {', '.join(created)}")
+    return created
+
+
+def drop_empty_partitions(now=None):
+    """Drop monthly partitions that ended before the longest retention period and hold no rows"""
+    from users.models import DivisionLog
+
+    if not is_partitioned():
+        return []
+
+    longest = max([DivisionLog.DEFAULT_RETENTION_DAYS, *DivisionLog.RETENTION_DAYS.values()])
+    cutoff = (now or timezone.now()) - timezone.timedelta(days=longest)
+    prefix = f"{_table()}_p"
+    dropped = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for name in sorted(_partitions(cursor)):
+            if not name.startswith(prefix):
+                continue
+            month = datetime.strptime(name[len(prefix):], '%Y_%m').replace(tzinfo=dt_timezone.utc)
+            if _add_months(month, 1) > cutoff:
+                continue
+            cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {name})')
+            if cursor.fetchone()[0]:
+                continue
+            cursor.execute(f'DROP TABLE {name}')
+            dropped.append(name)
+    if dropped:
+        logger.info(f"🗑️ Dropped empty DivisionLog partitions: {', '.join(dropped)}")
+    return dropped
+
+
+def expired_filter(now=None):
+    """Q matching DivisionLog rows past their log_type's retention"""
+    from users.models import DivisionLog
+
+    now = now or timezone.now()
+    expired = Q(
+        timestamp__lt=now - timezone.timedelta(days=DivisionLog.DEFAULT_RETENTION_DAYS)
+    ) & ~Q(log_type__in=list(DivisionLog.RETENTION_DAYS))
+    for log_type, days in DivisionLog.RETENTION_DAYS.items():
+        expired |= Q(log_type=log_type, timestamp__lt=now - timezone.timedelta(days=days))
+    return expired
+
+
+def _summarise(rows):
+    """Add a batch of archived rows to the daily summaries"""
+    from users.models import DivisionLogDailySummary
+
+    counts = Counter(
+        (row['association_id'], row['age_group'], row['tier'], row['season'],
+         timezone.localtime(row['timestamp']).date(), row['log_type'])
+        for row in rows
+    )
+    existing = {
+        (s.association_id, s.age_group, s.tier, s.season, s.date, s.log_type): s
+        for s in DivisionLogDailySummary.objects.select_for_update().filter(
+            association_id__in={key[0] for key in counts},
+            date__in={key[4] for key in counts},
+        )
+    }
+    updated, created = [], []
+    for key, count in counts.items():
+        summary = existing.get(key)
+        if summary:
+            summary.count += count
+            updated.append(summary)
+        else:
+            association_id, age_group, tier, season, date, log_type = key
+            created.append(DivisionLogDailySummary(
+                association_id=association_id, age_group=age_group, tier=tier, season=season,
+                date=date, log_type=log_type, count=count,
+            ))
+    DivisionLogDailySummary.objects.bulk_update(updated, ['count'])
+    DivisionLogDailySummary.objects.bulk_create(created)
+
+
+def compact(archive_dir=None, batch_size=BATCH_SIZE, now=None, dry_run=False):
+    """
+    Archive and summarise expired DivisionLog rows, then maintain partitions.
+    Each batch is written (and fsynced) to the archive before it is deleted; a crash in between
+    at worst archives those rows twice, never loses them. Returns counts.
+    """
+    from users.models import DivisionLog
+
+    now = now or timezone.now()
+    expired = DivisionLog.objects.filter(expired_filter(now))
+    if dry_run:
+        return {'archived': 0, 'expired': expired.count(), 'archive': None, 'partitions_created': [],
+                'partitions_dropped': []}
+
+    archive_dir = archive_dir or settings.DIVISION_LOG_ARCHIVE_DIR
+    archive_path = None
+    archive = None
+    archived = 0
+    try:
+        while True:
+            rows = list(
+                expired.order_by('timestamp', 'id').values(
+                    'id', 'timestamp', 'age_group', 'tier', 'season', 'association_id',
+                    'log_type', 'message', 'user_id', 'team_id', 'metadata',
+                )[:batch_size]
+            )
+            if not rows:
+                break
+            if archive is None:
+                os.makedirs(archive_dir, exist_ok=True)
+                archive_path = os.path.join(archive_dir, f"divisionlog-{now:%Y%m%dT%H%M%S}.jsonl.gz")
+                raw = open(archive_path, 'ab')
+                archive = gzip.GzipFile(fileobj=raw, mode='ab')
+            archive.write(''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in rows).encode())
+            archive.flush()
+            raw.flush()
+            os.fsync(raw.fileno())
+
+            with transaction.atomic():
+                _summarise(rows)
+                DivisionLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            archived += len(rows)
+            logger.info(f"📦 Archived {archived} DivisionLog rows to {archive_path}")
+    finally:
+        if archive is not None:
+            archive.close()
+            raw.close()
+
+    return {
+        'archived': archived,
+        'expired': archived,
+        'archive': archive_path,
+        'partitions_dropped': drop_empty_partitions(now),
+        'partitions_created': ensure_partitions(now=now),
+    }
@@ -0,0 +1,225 @@
+"""
+Email outbox with a pooled, rate-limited sender.
+
+Request handlers and the scheduler queue OutboundEmail rows instead of
+calling send_mail, so they return as soon as the rows are written. A
+flush_outbox job claims due rows in batches (SKIP LOCKED), sends each
+batch over a single SMTP connection, paces batches to stay under the
+provider's sending limit and retries failures with exponential backoff.
+"""
+import logging
+import time
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Emails sent over one SMTP connection
+BATCH_SIZE = 20
+
+# Stay under the SMTP provider's sending limit
+MAX_EMAILS_PER_MINUTE = 60
+
+# Retry n waits RETRY_BASE_SECONDS * 2 ** (n - 1)
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+
+# Rows left 'sending' this long belong to a flush that died
+STALE_SENDING_SECONDS = 10 * 60
+
+
+def queue_email(subject, body, recipients, notification_type='', details='', team=None,
+                division=None, user=None):
+    """
+    Add an email to the outbox and make sure a flush job will send it.
+    division is (age_group, tier, season, association), used for the division log entry.
+    """
+    from users.services import job_queue
+
+    email = _outbound_email(subject, body, recipients, notification_type, details, team, division, user)
+    email.save()
+    job_queue.enqueue_unique('flush_outbox')
+    return email
+
+
+def queue_emails(emails, notification_type='', division=None, user=None):
+    """
+    Add several emails to the outbox in one insert and make sure a flush job will send them.
+    emails are dicts with subject, message, recipients and optionally details and team.
+    """
+    from users.models import OutboundEmail
+    from users.services import job_queue
+
+    created = OutboundEmail.objects.bulk_create([
+        _outbound_email(
+            email['subject'], email['message'], email['recipients'], notification_type,
+            email.get('details'), email.get('team'), division, user,
+        )
+        for email in emails
+    ])
+    if created:
+        job_queue.enqueue_unique('flush_outbox')
+    return created
+
+
+def _outbound_email(subject, body, recipients, notification_type, details, team, division, user):
+    from users.models import OutboundEmail
+
+    age_group, tier, season, association = division or ('', '', '', None)
+    return OutboundEmail(
+        recipients=list(recipients),
+        subject=subject,
+        body=body,
+        notification_type=notification_type,
+        details=details or '',
+        team=team,
+        age_group=age_group,
+        tier=tier,
+        season=season,
+        association=association,
+        created_by=user if user and user.is_authenticated else None,
+    )
+
+
+def _due():
+    """Queued emails whose retry time has come, and 'sending' claims abandoned by a flush that died"""
+    from django.db.models import Q
+
+    now = timezone.now()
+    stale = now - timezone.timedelta(seconds=STALE_SENDING_SECONDS)
+    return Q(status='queued', next_attempt_at__lte=now) | Q(status='sending', next_attempt_at__lt=stale)
+
+
+def _claim_batch():
+    """Mark up to BATCH_SIZE due emails as 'sending' and return them"""
+    from users.models import OutboundEmail
+
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(_due())
+            .order_by('next_attempt_at', 'id')[:BATCH_SIZE]
+        )
+        if batch:
+            # next_attempt_at doubles as the claim time while a row is 'sending'
+            OutboundEmail.objects.filter(id__in=[email.id for email in batch]).update(
+                status='sending', next_attempt_at=timezone.now()
+            )
+    return batch
+
+
+def next_due_at():
+    """When the earliest unsent email becomes due: its retry time, or when its 'sending' claim goes stale"""
+    from users.models import OutboundEmail
+
+    times = [
+        OutboundEmail.objects.filter(status=status).order_by('next_attempt_at')
+        .values_list('next_attempt_at', flat=True).first()
+        for status in ('queued', 'sending')
+    ]
+    if times[1]:
+        times[1] += timezone.timedelta(seconds=STALE_SENDING_SECONDS)
+    return min((due for due in times if due), default=None)
+
+
+def _record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = 'failed'
+        logger.error(f"❌ Giving up on email '{email.subject}' after {email.attempts} attempts: {error}")
+    else:
+        email.status = 'queued'
+        delay = RETRY_BASE_SECONDS * 2 ** (email.attempts - 1)
+        email.next_attempt_at = timezone.now() + timezone.timedelta(seconds=delay)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def _record_sent(email):
+    from users.models import DivisionLog
+
+    email.attempts += 1
+    email.status = 'sent'
+    email.sent_at = timezone.now()
+    email.last_error = ''
+    email.save(update_fields=['attempts', 'status', 'sent_at', 'last_error'])
+
+    if email.association_id:
+        DivisionLog.log_email_notification(
+            age_group=email.age_group,
+            tier=email.tier,
+            season=email.season,
+            association=email.association,
+            notification_type=email.notification_type,
+            recipients_count=len(email.recipients),
+            user=email.created_by,
+            team=email.team,
+            details=email.details or None,
+        )
+
+
+def send_batch(batch):
+    """Send a claimed batch over one SMTP connection; returns the number sent"""
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not connect to the mail server: {e}")
+        for email in batch:
+            _record_failure(email, e)
+        return 0
+
+    sent = 0
+    try:
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+                to=email.recipients,
+                connection=connection,
+            )
+            try:
+                # The connection is already open, so the backend reuses it instead of reconnecting
+                connection.send_messages([message])
+            except Exception as e:
+                _record_failure(email, e)
+                continue
+            _record_sent(email)
+            sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def flush():
+    """
+    Send every due email, batch by batch, pacing batches to MAX_EMAILS_PER_MINUTE.
+    Returns counts; emails waiting on a retry, and rows still 'sending' (another flush's, or a
+    dead one's), are picked up by a follow-up flush job.
+    """
+    from users.services import job_queue
+
+    sent = failed = 0
+    while True:
+        batch = _claim_batch()
+        if not batch:
+            break
+        started = time.monotonic()
+        batch_sent = send_batch(batch)
+        sent += batch_sent
+        failed += len(batch) - batch_sent
+        logger.info(f"📨 Outbox batch: {batch_sent}/{len(batch)} sent")
+
+        # Rate limit: a batch of n emails takes at least n / MAX_EMAILS_PER_MINUTE minutes
+        minimum = len(batch) * 60 / MAX_EMAILS_PER_MINUTE
+        elapsed = time.monotonic() - started
+        if elapsed < minimum:
+            time.sleep(minimum - elapsed)
+
+    next_due = next_due_at()
+    if next_due:
+        job_queue.enqueue_unique('flush_outbox', run_after=next_due)
+    return {'sent': sent, 'failed_attempts': failed}
@@ -0,0 +1,108 @@
+"""
+iCalendar (.ics) subscription feeds for teams and divisions.
+
+Feeds are rendered from the active GeneratedSchedule's game days and cached
+per schedule version, so the thousands of calendar apps polling a feed
+hourly are answered from the cache, or with a 304 when their ETag matches.
+"""
+import logging
+from datetime import timedelta
+from django.core.cache import cache
+from icalendar import Calendar, Event
+
+from users.services import match_dates
+
+logger = logging.getLogger(__name__)
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # Keyed by schedule id, so entries never go stale
+REFRESH_INTERVAL = timedelta(hours=1)
+PRODID = '-//TeamSchedule//Schedule Feed//EN'
+UID_DOMAIN = 'teamschedule'
+
+
+def feed_division(feed):
+    """(age_group, tier, season, association_id) a feed follows; team feeds follow the team's current division"""
+    if feed.team_id:
+        team = feed.team
+        return team.age_group, team.tier, team.season, team.club.association_id
+    return feed.age_group, feed.tier, feed.season, feed.association_id
+
+
+def active_schedule_for(feed):
+    """The active schedule version behind a feed, or None"""
+    from users.models import GeneratedSchedule
+
+    schedules = GeneratedSchedule.objects.filter(is_active=True)
+    if feed.team_id:
+        schedules = schedules.filter(division_id=feed.team.division_id)
+    else:
+        schedules = schedules.filter(
+            age_group=feed.age_group, tier=feed.tier, season=feed.season, association_id=feed.association_id
+        )
+    return schedules.only('id', 'version', 'generated_at').first()
+
+
+def feed_etag(feed, schedule):
+    target = f"team-{feed.team_id}" if feed.team_id else 'division'
+    version = f"schedule-{schedule.id}" if schedule else 'empty'
+    return f'"ics-{feed.id}-{target}-{version}"'
+
+
+def _calendar(name):
+    calendar = Calendar()
+    calendar.add('prodid', PRODID)
+    calendar.add('version', '2.0')
+    calendar.add('calscale', 'GREGORIAN')
+    calendar.add('method', 'PUBLISH')
+    calendar.add('x-wr-calname', name)
+    # Hints for subscribing clients on how often to poll
+    calendar.add('refresh-interval', REFRESH_INTERVAL, parameters={'VALUE': 'DURATION'})
+    calendar.add('x-published-ttl', 'PT1H')
+    return calendar
+
+
+def _event(game, summary, stamp):
+    event = Event()
+    event.add('uid', f"match-{game.match_id}-{game.date.isoformat()}@{UID_DOMAIN}")
+    event.add('summary', summary)
+    event.add('dtstart', game.date)
+    event.add('dtend', game.date + timedelta(days=1))
+    event.add('dtstamp', stamp)
+    event.add('transp', 'TRANSPARENT')
+    return event
+
+
+def render_team_feed(team, schedule):
+    """.ics bytes with a team's games in the given schedule version"""
+    calendar = _calendar(f"{team.name} Schedule")
+    if schedule:
+        for game in match_dates.team_games(team):
+            where = 'vs' if game.is_home else '@'
+            calendar.add_component(_event(game, f"{team.name} {where} {game.opponent.name}", schedule.generated_at))
+    return calendar.to_ical()
+
+
+def render_division_feed(age_group, tier, season, association, schedule):
+    """.ics bytes with every game in a division's schedule version"""
+    calendar = _calendar(f"{association.name} {age_group} {tier} ({season})")
+    if schedule:
+        for game in match_dates.division_games(schedule.division_id):
+            calendar.add_component(_event(game, f"{game.team.name} vs {game.opponent.name}", schedule.generated_at))
+    return calendar.to_ical()
+
+
+def feed_bytes(feed, schedule):
+    """Rendered feed for a schedule version, from the cache when possible"""
+    age_group, tier, season, association_id = feed_division(feed)
+    target = f"team:{feed.team_id}" if feed.team_id else f"division:{association_id}:{age_group}:{tier}:{season}"
+    key = f"ics:{target}:{schedule.id if schedule else 'empty'}"
+
+    content = cache.get(key)
+    if content is None:
+        if feed.team_id:
+            content = render_team_feed(feed.team, schedule)
+        else:
+            content = render_division_feed(age_group, tier, season, feed.association, schedule)
+        cache.set(key, content, FEED_CACHE_TIMEOUT)
+        logger.info(f"📆 Rendered calendar feed {key} ({len(content)} bytes)")
+    return content
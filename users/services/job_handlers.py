@@ -0,0 +1,141 @@
+"""
+Handlers for BackgroundJob kinds, run by job_queue workers.
+
+Each handler takes the claimed job and returns a JSON-serialisable result
+stored on the job; raising marks the attempt as failed so it is retried.
+"""
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+# Generation holds the division's generation lease for at most this long before another worker may take over
+GENERATION_LEASE_SECONDS = 60 * 60
+
+
+@contextmanager
+def _division_lease(job, division_state_id):
+    """
+    Hold the division's generation lease while a generation job runs, so a second generation for the
+    same division never runs alongside it. A busy division defers the job. Deadline checks use their
+    own lease and see the division as triggered, or coalesce onto this job, while it runs.
+    """
+    from users.models import DivisionSchedulingState
+    from users.services.job_queue import JobDeferred
+
+    # Include the worker, so a copy of the job requeued onto another worker can never share the lease
+    owner = f"job:{job.id}:{job.locked_by}"[:100]
+    if not DivisionSchedulingState.acquire_lease(division_state_id, owner, GENERATION_LEASE_SECONDS, 'generation'):
+        raise JobDeferred(f"Division state {division_state_id} is busy")
+    try:
+        yield
+    finally:
+        DivisionSchedulingState.release_lease(division_state_id, owner, 'generation')
+
+
+def _division(payload):
+    from users.models import Association
+
+    association = Association.objects.get(id=payload['association_id'])
+    return payload['age_group'], payload['tier'], payload['season'], association
+
+
+def generate_schedule(job):
+    """Manual "Generate Schedule": run the scheduler and save the result as the division's next version"""
+    from users.models import DivisionLog
+    from users.services.job_progress import ProgressReporter
+    from users.services.schedule_persistence import save_generated_schedule
+    from users.services.schedule_service import DivisionScheduler
+
+    age_group, tier, season, association = _division(job.payload)
+    user = job.created_by
+
+    with _division_lease(job, job.division_state_id):
+        DivisionLog.log_schedule_generation(age_group, tier, season, association, 'started', user)
+        try:
+            print(f"=== JOB {job.id}: CALLING DIVISION_SCHEDULER.CREATE_SCHEDULE ===")
+            progress = ProgressReporter(job.id)
+            scheduler = DivisionScheduler(age_group, tier, season, association, progress=progress)
+            schedule, unscheduled_matches = scheduler.create_schedule()
+            print(f"Schedule returned: {len(schedule)} matches, {len(unscheduled_matches)} unscheduled")
+
+            progress('saving', placed=len(schedule), conflicts=len(unscheduled_matches))
+
+            generated_schedule = save_generated_schedule(
+                age_group, tier, season, association,
+                schedule, unscheduled_matches,
+                generated_by=user,
+            )
+        except Exception as e:
+            DivisionLog.log_schedule_generation(age_group, tier, season, association, 'failed', user, details=str(e))
+            raise
+
+    if unscheduled_matches:
+        details = f"{len(schedule)} matches scheduled, {len(unscheduled_matches)} unscheduled"
+    else:
+        details = f"{len(schedule)} matches scheduled successfully"
+    DivisionLog.log_schedule_generation(age_group, tier, season, association, 'completed', user, details=details)
+
+    return {
+        'generated_schedule_id': generated_schedule.id,
+        'version': generated_schedule.version,
+        'scheduled': len(schedule),
+        'unscheduled': len(unscheduled_matches),
+    }
+
+
+def deadline_schedule(job):
+    """Deadline-triggered scheduling for a division queued by the deadline scheduler"""
+    from users.models import DivisionSchedulingState
+    from users.services.job_progress import ProgressReporter
+    from users.services.schedule_orchestration import SchedulingOrchestrationService
+
+    division_state = DivisionSchedulingState.objects.select_related('association').get(
+        id=job.payload['division_state_id']
+    )
+    with _division_lease(job, division_state.id):
+        service = SchedulingOrchestrationService(
+            division_state.age_group,
+            division_state.tier,
+            division_state.season,
+            division_state.association,
+            progress=ProgressReporter(job.id),
+        )
+        success, message = service.check_and_trigger_scheduling(manual_trigger=False)
+
+    if not success:
+        # Conditions changed while the job was queued; hand the division back to the deadline scheduler
+        DivisionSchedulingState.objects.filter(id=division_state.id, status='triggered').update(status='waiting')
+        logger.warning(f"⚠️ Deadline scheduling for {division_state} did not run: {message}")
+
+    return {'success': success, 'message': message}
+
+
+def flush_outbox(job):
+    """Send every due email in the outbox (see email_outbox)"""
+    from users.services import email_outbox
+
+    return email_outbox.flush()
+
+
+def send_digests(job):
+    """Email team admins their pending scheduling notifications (see notification_digest)"""
+    from users.services import notification_digest
+
+    return notification_digest.send_digests()
+
+
+def build_export(job):
+    """Render a large schedule export claimed by schedule_exports.start_background_build"""
+    from users.models import ScheduleExport
+    from users.services import schedule_exports
+
+    export = ScheduleExport.objects.filter(id=job.payload['export_id']).first()
+    if export is None:
+        # Superseded by an export of a newer schedule version and pruned
+        return {'status': 'pruned'}
+    if export.status != 'ready':
+        export = schedule_exports.build_export(export)
+    # A failed build is retried by the next download request, not by the queue
+    return {'status': export.status, 'bytes': len(export.content or b'')}
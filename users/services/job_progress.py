@@ -0,0 +1,263 @@
+"""
+Live progress for background jobs, streamed to pages as Server-Sent Events.
+
+Job handlers publish progress events (phase, matchups placed, conflicts,
+elapsed time) to a per-job pub/sub channel and the async SSE view
+subscribes to it, so watching a job costs no database polling. With
+REDIS_URL configured the channel is Redis pub/sub and works across the
+web and runjobs processes; without it an in-process broker serves the
+development server, whose job worker runs in the same process.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Publish at most this often while a phase is running (phase changes and the final event always go out)
+MIN_PUBLISH_INTERVAL = 0.2
+
+# Comment lines keep proxies from closing an idle stream; the job is re-checked at the same time
+KEEPALIVE_SECONDS = 15
+
+# Streams are closed after this long; EventSource reconnects by itself
+MAX_STREAM_SECONDS = 30 * 60
+
+# Latest event is kept so a page that subscribes mid-run starts with the current state
+LAST_EVENT_TTL = 60 * 60
+
+# Reconnect delay suggested to clients that can't hold a stream open (WSGI deployments)
+RETRY_MILLISECONDS = 2000
+
+
+def channel_name(job_id):
+    return f"job-progress:{job_id}"
+
+
+class InProcessBroker:
+    """Pub/sub between threads of one process; subscribers are asyncio queues on their own loops"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._last = {}
+
+    def publish(self, channel, event):
+        with self._lock:
+            if event.get('final'):
+                self._last.pop(channel, None)
+            else:
+                self._last[channel] = event
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def last_event(self, channel):
+        with self._lock:
+            return self._last.get(channel)
+
+    async def subscribe(self, channel):
+        return _InProcessSubscription(self, channel)
+
+
+class _InProcessSubscription:
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.queue = asyncio.Queue()
+        self.entry = (asyncio.get_running_loop(), self.queue)
+        with broker._lock:
+            broker._subscribers[channel].add(self.entry)
+
+    async def last_event(self):
+        return self.broker.last_event(self.channel)
+
+    async def get(self, timeout):
+        """Next event, or None if nothing arrives within timeout seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        with self.broker._lock:
+            subscribers = self.broker._subscribers.get(self.channel)
+            if subscribers is not None:
+                subscribers.discard(self.entry)
+                if not subscribers:
+                    del self.broker._subscribers[self.channel]
+
+
+class RedisBroker:
+    """Redis pub/sub, shared by every web and worker process"""
+
+    def __init__(self, url):
+        import redis
+
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel, event):
+        data = json.dumps(event)
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            pipeline.set(f"{channel}:last", data, ex=LAST_EVENT_TTL)
+            pipeline.publish(channel, data)
+            pipeline.execute()
+        except Exception as e:
+            # Progress is best-effort; never fail the job over it
+            logger.warning(f"⚠️ Could not publish progress to {channel}: {e}")
+
+    def last_event(self, channel):
+        data = self.client.get(f"{channel}:last")
+        return json.loads(data) if data else None
+
+    async def subscribe(self, channel):
+        subscription = _RedisSubscription(self.url, channel)
+        await subscription.open()
+        return subscription
+
+
+class _RedisSubscription:
+    def __init__(self, url, channel):
+        import redis.asyncio
+
+        self.channel = channel
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.pubsub = self.client.pubsub()
+
+    async def open(self):
+        # Subscribe before reading the last event so nothing published in between is missed
+        await self.pubsub.subscribe(self.channel)
+
+    async def last_event(self):
+        data = await self.client.get(f"{self.channel}:last")
+        return json.loads(data) if data else None
+
+    async def get(self, timeout):
+        """Next event, or None if nothing arrives within timeout seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message and message['type'] == 'message':
+                return json.loads(message['data'])
+
+    async def close(self):
+        await self.pubsub.unsubscribe(self.channel)
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Redis broker when REDIS_URL is configured, otherwise the in-process broker"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            redis_url = getattr(settings, 'REDIS_URL', '')
+            _broker = RedisBroker(redis_url) if redis_url else InProcessBroker()
+            logger.info(f"📡 Job progress using {type(_broker).__name__}")
+        return _broker
+
+
+def publish(job_id, event):
+    get_broker().publish(channel_name(job_id), event)
+
+
+class ProgressReporter:
+    """
+    Callable passed to DivisionScheduler as its progress hook.
+    Publishes throttled progress events for a job on its channel.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.started = time.monotonic()
+        self.last_published = 0
+        self.phase = None
+
+    def __call__(self, phase, placed=0, conflicts=0, total=0):
+        now = time.monotonic()
+        if phase == self.phase and now - self.last_published < MIN_PUBLISH_INTERVAL:
+            return
+        self.phase = phase
+        self.last_published = now
+        publish(self.job_id, {
+            'phase': phase,
+            'placed': placed,
+            'conflicts': conflicts,
+            'total': total,
+            'elapsed': round(now - self.started, 1),
+        })
+
+
+def publish_final(job):
+    """Tell watchers a job has finished (or gone back on the queue)"""
+    publish(job.id, {
+        'phase': job.status,
+        'status': job.status,
+        'final': job.is_finished,
+        'error': job.error,
+    })
+
+
+def _sse(event):
+    return f"data: {json.dumps(event)}\n\n"
+
+
+def _final_event(job):
+    return {'phase': job.status, 'status': job.status, 'final': True, 'error': job.error}
+
+
+async def _load_job(job_id):
+    from users.models import BackgroundJob
+    return await BackgroundJob.objects.filter(id=job_id).afirst()
+
+
+async def event_stream(job_id, live=True):
+    """
+    SSE lines for a job's progress until it finishes.
+    live=False sends only the current state and a reconnect hint, for servers that can't stream.
+    """
+    job = await _load_job(job_id)
+    if job is None or job.is_finished:
+        if job is not None:
+            yield _sse(_final_event(job))
+        return
+
+    subscription = await get_broker().subscribe(channel_name(job_id))
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        last = await subscription.last_event()
+        if last:
+            yield _sse(last)
+        if not live:
+            return
+
+        started = time.monotonic()
+        while time.monotonic() - started < MAX_STREAM_SECONDS:
+            event = await subscription.get(KEEPALIVE_SECONDS)
+            if event is None:
+                # Quiet for a while: make sure we didn't miss the end of the job
+                job = await _load_job(job_id)
+                if job is None or job.is_finished:
+                    if job is not None:
+                        yield _sse(_final_event(job))
+                    return
+                yield ": keepalive\n\n"
+                continue
+            yield _sse(event)
+            if event.get('final'):
+                return
+    finally:
+        await subscription.close()
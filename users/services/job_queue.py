@@ -0,0 +1,324 @@
+"""
+Durable database-backed job queue.
+
+Slow work (schedule generation, notification emails, large exports) is
+stored as BackgroundJob rows instead of running inside the request.
+``runjobs`` workers claim queued jobs with ``SELECT ... FOR UPDATE SKIP
+LOCKED``, so any number of workers can drain the queue without handing
+the same job to two of them. Failed jobs are retried with a backoff, and
+jobs left 'running' by a crashed worker are put back on the queue; a
+running job's worker refreshes its lock every HEARTBEAT_SECONDS, so a
+long job is never mistaken for an abandoned one.
+"""
+import logging
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from users.services import division_log_buffer, job_progress
+
+logger = logging.getLogger(__name__)
+
+# A user is waiting on the page for these
+PRIORITY_INTERACTIVE = 10
+PRIORITY_DEFAULT = 0
+
+# Idle workers look for new jobs this often (jobs enqueued in-process wake them immediately)
+POLL_SECONDS = 2
+
+# Retry n waits n * RETRY_BACKOFF_SECONDS
+RETRY_BACKOFF_SECONDS = 30
+
+# A job 'running' this long is assumed to belong to a dead worker
+STALE_JOB_SECONDS = 30 * 60
+
+# Workers refresh a running job's locked_at this often
+HEARTBEAT_SECONDS = 60
+
+# Finished jobs are kept this long for status polling and troubleshooting
+FINISHED_JOB_RETENTION_DAYS = 14
+
+HANDLERS = {
+    'generate_schedule': 'users.services.job_handlers.generate_schedule',
+    'deadline_schedule': 'users.services.job_handlers.deadline_schedule',
+    'flush_outbox': 'users.services.job_handlers.flush_outbox',
+    'send_digests': 'users.services.job_handlers.send_digests',
+    'build_export': 'users.services.job_handlers.build_export',
+}
+
+# Job kinds that generate a division's schedule; only one of them runs per division at a time
+GENERATION_KINDS = ('generate_schedule', 'deadline_schedule')
+
+# A generation job that finds its division busy is retried after this long
+DEFER_SECONDS = 5
+
+
+class JobDeferred(Exception):
+    """Raised by a handler to put its job back on the queue without using up an attempt"""
+
+    def __init__(self, message, seconds=DEFER_SECONDS):
+        super().__init__(message)
+        self.seconds = seconds
+
+
+# Set when a job is enqueued by this process so local workers don't wait for the next poll
+_job_available = threading.Event()
+
+
+def enqueue(kind, payload=None, priority=PRIORITY_DEFAULT, user=None, max_attempts=3, division_state=None,
+            run_after=None):
+    """Queue a job; it becomes visible to workers when the current transaction commits"""
+    from users.models import BackgroundJob
+
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = BackgroundJob.objects.create(
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts,
+        created_by=user if user and user.is_authenticated else None,
+        division_state=division_state,
+        run_after=run_after or timezone.now(),
+    )
+    transaction.on_commit(_job_available.set)
+    logger.info(f"📥 Queued {job}")
+    return job
+
+
+def enqueue_unique(kind, run_after=None, **kwargs):
+    """
+    Queue a payload-less job unless one of the same kind is already queued to run by run_after.
+    Used for "drain this table" jobs, where one pending run covers every caller; a rare duplicate
+    from a race is harmless because those jobs claim their rows with SKIP LOCKED.
+    """
+    from users.models import BackgroundJob
+
+    run_after = run_after or timezone.now()
+    existing = BackgroundJob.objects.filter(kind=kind, status='queued', run_after__lte=run_after).first()
+    return existing or enqueue(kind, run_after=run_after, **kwargs)
+
+
+def in_flight_generation(division_state):
+    """The division's queued or running schedule generation job, if any"""
+    from users.models import BackgroundJob
+
+    return BackgroundJob.objects.filter(
+        division_state=division_state,
+        kind__in=GENERATION_KINDS,
+        status__in=['queued', 'running'],
+    ).order_by('id').first()
+
+
+def enqueue_generation(kind, division_state, payload=None, **kwargs):
+    """
+    Queue schedule generation for a division unless a generation job is already in flight.
+    Concurrent callers are serialised on the DivisionSchedulingState row, so exactly one job is
+    created and everyone else coalesces onto it. Returns (job, created).
+    """
+    from users.models import DivisionSchedulingState
+
+    with transaction.atomic():
+        DivisionSchedulingState.objects.select_for_update().filter(id=division_state.id).first()
+        job = in_flight_generation(division_state)
+        if job:
+            logger.info(f"🔗 Coalesced {kind} for {division_state} onto in-flight {job}")
+            return job, False
+        return enqueue(kind, payload, division_state=division_state, **kwargs), True
+
+
+def claim_next(worker_id):
+    """Claim the next runnable job for this worker, or None when the queue is empty"""
+    from users.models import BackgroundJob
+
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            BackgroundJob.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', run_after__lte=now)
+            .order_by('-priority', 'run_after', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_at = now
+        job.started_at = now
+        job.save(update_fields=['status', 'attempts', 'locked_by', 'locked_at', 'started_at'])
+    return job
+
+
+@contextmanager
+def heartbeat(job):
+    """Keep refreshing the job's locked_at from a side thread while the block runs"""
+    from users.models import BackgroundJob
+
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT_SECONDS):
+                try:
+                    BackgroundJob.objects.filter(id=job.id, status='running', locked_by=job.locked_by).update(
+                        locked_at=timezone.now()
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️ Heartbeat for {job} failed: {e}")
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"job-heartbeat-{job.id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job):
+    """Run a claimed job's handler and record the outcome, scheduling a retry on failure"""
+    try:
+        handler = import_string(HANDLERS[job.kind])
+        with heartbeat(job), division_log_buffer.buffered():
+            result = handler(job)
+    except JobDeferred as e:
+        logger.info(f"⏸️ {job} deferred {e.seconds}s: {e}")
+        job.attempts -= 1
+        job.status = 'queued'
+        job.error = str(e)
+        job.run_after = timezone.now() + timezone.timedelta(seconds=e.seconds)
+    except Exception as e:
+        logger.exception(f"❌ {job} failed on attempt {job.attempts}/{job.max_attempts}: {e}")
+        job.error = str(e)
+        if job.attempts < job.max_attempts:
+            job.status = 'queued'
+            job.run_after = timezone.now() + timezone.timedelta(seconds=RETRY_BACKOFF_SECONDS * job.attempts)
+        else:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+    else:
+        job.status = 'succeeded'
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+        logger.info(f"✅ {job} finished")
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=['status', 'attempts', 'result', 'error', 'run_after', 'finished_at', 'locked_by', 'locked_at'])
+    job_progress.publish_final(job)
+    return job
+
+
+def requeue_stale_jobs():
+    """Put jobs abandoned by crashed workers back on the queue (or fail them if out of attempts)"""
+    from django.db.models import F
+    from users.models import BackgroundJob
+
+    cutoff = timezone.now() - timezone.timedelta(seconds=STALE_JOB_SECONDS)
+    stale = BackgroundJob.objects.filter(status='running', locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', error='Worker stopped responding', finished_at=timezone.now(), locked_by='', locked_at=None
+    )
+    requeued = stale.update(status='queued', run_after=timezone.now(), locked_by='', locked_at=None)
+    if failed or requeued:
+        logger.warning(f"♻️ Requeued {requeued} and failed {failed} job(s) abandoned by stopped workers")
+    return requeued
+
+
+def prune_finished_jobs():
+    """Delete succeeded/failed jobs older than the retention period"""
+    from users.models import BackgroundJob
+
+    cutoff = timezone.now() - timezone.timedelta(days=FINISHED_JOB_RETENTION_DAYS)
+    deleted, _ = BackgroundJob.objects.filter(status__in=['succeeded', 'failed'], finished_at__lt=cutoff).delete()
+    if deleted:
+        logger.info(f"🧹 Pruned {deleted} finished job(s)")
+    return deleted
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobWorker:
+    """Claims and runs jobs until stop_event is set (or the queue is empty, in burst mode)"""
+
+    def __init__(self, worker_id, stop_event, burst=False):
+        self.worker_id = worker_id
+        self.stop_event = stop_event
+        self.burst = burst
+        self.jobs_run = 0
+
+    def run(self):
+        logger.info(f"👷 Job worker {self.worker_id} started")
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                try:
+                    job = claim_next(self.worker_id)
+                except Exception as e:
+                    logger.error(f"❌ Job worker {self.worker_id} could not claim a job: {e}")
+                    job = None
+                if job is None:
+                    if self.burst:
+                        break
+                    _job_available.wait(POLL_SECONDS)
+                    _job_available.clear()
+                    continue
+                try:
+                    run_job(job)
+                except Exception as e:
+                    # Recording the outcome failed (e.g. lost connection); the job is requeued once stale
+                    logger.error(f"❌ Job worker {self.worker_id} could not record the outcome of {job}: {e}")
+                self.jobs_run += 1
+        finally:
+            close_old_connections()
+            logger.info(f"👷 Job worker {self.worker_id} stopped after {self.jobs_run} job(s)")
+
+
+def start_workers(count, stop_event, worker_id=None, burst=False):
+    """Start count worker threads sharing stop_event; returns the threads"""
+    worker_id = worker_id or default_worker_id()
+    threads = []
+    for index in range(count):
+        worker = JobWorker(f"{worker_id}:{index}", stop_event, burst=burst)
+        thread = threading.Thread(target=worker.run, name=f"job-worker-{index}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+_local_stop = threading.Event()
+_local_threads = []
+
+
+def start_local_worker():
+    """Run a job worker thread inside this process (used by the development server)"""
+    global _local_threads
+    if any(thread.is_alive() for thread in _local_threads):
+        return
+    _local_stop.clear()
+    _local_threads = start_workers(1, _local_stop, worker_id=f"{default_worker_id()}:local")
+
+
+def job_status(job):
+    """JSON-serialisable job state for status polling"""
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'finished': job.is_finished,
+        'attempts': job.attempts,
+        'result': job.result,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,85 @@
+"""
+Indexed game days for scheduled matches.
+
+ScheduleMatch keeps its dates as a JSON list, which cannot be indexed or
+range-queried. Every scheduled match is mirrored into ScheduleMatchDate
+rows (one per team per game day) carrying the division, so "games for
+team X between dates" and "what is on this weekend association-wide" are
+plain index range scans.
+"""
+from datetime import date
+
+
+def match_date_rows(matches, generated_schedule):
+    """Unsaved ScheduleMatchDate rows for the scheduled matches of a schedule version"""
+    from users.models import ScheduleMatchDate
+
+    rows = []
+    for match in matches:
+        if match.status != 'scheduled':
+            continue
+        for value in match.dates or ():
+            day = date.fromisoformat(value) if isinstance(value, str) else value
+            for team_id, opponent_id, is_home in (
+                (match.home_team_id, match.away_team_id, True),
+                (match.away_team_id, match.home_team_id, False),
+            ):
+                rows.append(ScheduleMatchDate(
+                    match=match,
+                    team_id=team_id,
+                    opponent_id=opponent_id,
+                    date=day,
+                    is_home=is_home,
+                    division_id=generated_schedule.division_id,
+                    association_id=generated_schedule.association_id,
+                    age_group=generated_schedule.age_group,
+                    tier=generated_schedule.tier,
+                    season=generated_schedule.season,
+                ))
+    return rows
+
+
+def live_games():
+    """Game days of matches that are part of the newest schedule version"""
+    from users.models import ScheduleMatchDate
+
+    return ScheduleMatchDate.objects.filter(match__retired_in__isnull=True)
+
+
+def _in_window(games, start=None, end=None):
+    if start:
+        games = games.filter(date__gte=start)
+    if end:
+        games = games.filter(date__lt=end)
+    return games
+
+
+def team_games(team, start=None, end=None):
+    """A team's game days in [start, end), using the (team, date) index"""
+    return _in_window(live_games().filter(team=team), start, end).select_related('opponent')
+
+
+def association_games(association, start=None, end=None):
+    """Every game in an association in [start, end), one row per match day (home side)"""
+    games = live_games().filter(association=association, is_home=True)
+    return _in_window(games, start, end).select_related('team', 'opponent')
+
+
+def division_games(division, start=None, end=None):
+    """Every game in a division (instance or id) in [start, end), one row per match day (home side)"""
+    games = live_games().filter(division_id=getattr(division, 'id', division), is_home=True)
+    return _in_window(games, start, end).select_related('team', 'opponent')
+
+
+def game_event(game):
+    """A home-side ScheduleMatchDate -> single-day FullCalendar event"""
+    return {
+        'title': f"{game.team.name} vs {game.opponent.name}",
+        'start': game.date.isoformat(),
+        'color': '#0d6efd',
+        'extendedProps': {
+            'home': game.team.name,
+            'away': game.opponent.name,
+            'division': f"{game.age_group} {game.tier}",
+        },
+    }
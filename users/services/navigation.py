@@ -0,0 +1,53 @@
+"""
+Per-user navigation data (teams, divisions, clubs, associations) for the sidebar and home page.
+
+Built with one query and cached per user under the user's roles version
+(users.services.permissions). Signals bump it for the users affected by a
+membership, admin role or team change, and for everyone when a club or
+association changes, so only those entries are rebuilt on their next use.
+The timeout bounds staleness when each process has its own cache (no
+REDIS_URL).
+"""
+from django.core.cache import cache
+from django.db.models import Q
+from users.services.permissions import roles_version
+
+NAV_CACHE_TIMEOUT = 10 * 60
+
+
+def build_navigation(user):
+    """Teams the user belongs to or administers (directly, via a club or via an association), and their divisions"""
+    from users.models import Team
+
+    user_teams = list(
+        Team.objects.filter(
+            Q(members=user) | Q(admins=user) | Q(club__admins=user) | Q(club__association__admins=user)
+        )
+        .select_related('club__association')
+        .distinct()
+        .order_by('name', 'id')
+    )
+
+    divisions = {
+        (team.age_group, team.tier, team.season, team.club.association.id, team.club.association.name)
+        for team in user_teams
+    }
+    clubs = {team.club.id: team.club for team in user_teams}
+    associations = {club.association.id: club.association for club in clubs.values()}
+
+    return {
+        'nav_teams': user_teams,
+        # Sort divisions by association name, then age group, then tier
+        'nav_divisions': sorted(divisions, key=lambda d: (d[4], d[0], d[1])),
+        'nav_clubs': sorted(clubs.values(), key=lambda c: c.name),
+        'nav_associations': sorted(associations.values(), key=lambda a: a.name),
+    }
+
+
+def user_navigation(user):
+    key = f"nav:{user.id}:{roles_version(user.id)}"
+    navigation = cache.get(key)
+    if navigation is None:
+        navigation = build_navigation(user)
+        cache.set(key, navigation, NAV_CACHE_TIMEOUT)
+    return navigation
@@ -0,0 +1,183 @@
+"""
+Notification digests for team admins.
+
+Scheduling notifications are recorded as SchedulingNotification rows
+flagged email_pending instead of being emailed one by one. A send_digests
+job runs DIGEST_WINDOW after the first pending notification and sends
+each recipient a single email covering all of their teams and divisions.
+Identical notifications are skipped with a content hash, and a digest
+identical to the last one a recipient got is suppressed for
+DUPLICATE_SUPPRESSION (NotificationRecipientState keeps the last hash).
+"""
+import hashlib
+import logging
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Notifications raised within this long of each other go out in one digest
+DIGEST_WINDOW = timezone.timedelta(minutes=15)
+
+# Don't resend an identical digest to the same address within this long (daily reminders still go out daily)
+DUPLICATE_SUPPRESSION = timezone.timedelta(hours=20)
+
+EMAIL_SUBJECTS = {
+    'schedule_conflict': 'Schedule Conflict - Action Required',
+    'insufficient_availability': 'Daily Reminder - Schedule Conflicts',
+}
+
+
+def notify(division_state, notification_type, team_messages, email=True):
+    """
+    Record a notification for each (team, message) pair, skipping ones identical to a notification
+    still waiting for the digest. With email=True they go out in the team admins' next digest.
+    """
+    from users.models import SchedulingNotification
+
+    hashed = {
+        SchedulingNotification.hash_content(team.id, notification_type, message): (team, message)
+        for team, message in team_messages
+    }
+    if email:
+        already_pending = set(
+            SchedulingNotification.objects.filter(
+                email_pending=True,
+                team__in=[team for team, _ in hashed.values()],
+                content_hash__in=list(hashed),
+            ).values_list('content_hash', flat=True)
+        )
+    else:
+        already_pending = set()
+
+    created = SchedulingNotification.objects.bulk_create([
+        SchedulingNotification(
+            division_state=division_state,
+            team=team,
+            notification_type=notification_type,
+            message=message,
+            email_pending=email,
+            content_hash=content_hash,
+        )
+        for content_hash, (team, message) in hashed.items()
+        if content_hash not in already_pending
+    ])
+    if email and created:
+        schedule_digest()
+    return created
+
+
+def schedule_digest():
+    """Make sure a send_digests job runs within DIGEST_WINDOW"""
+    from users.services import job_queue
+
+    return job_queue.enqueue_unique('send_digests', run_after=timezone.now() + DIGEST_WINDOW)
+
+
+def _digest_hash(content_hashes):
+    return hashlib.sha256("\n".join(sorted(content_hashes)).encode()).hexdigest()
+
+
+def _build_digest(items):
+    """Subject and body for one recipient's notifications"""
+    associations = {item['association_name'] for item in items}
+    prefix = f"[{next(iter(associations))}] " if len(associations) == 1 else ""
+    if len(items) == 1:
+        notification_type = items[0]['notification_type']
+        subject = EMAIL_SUBJECTS.get(notification_type, notification_type.replace('_', ' ').title())
+        return prefix + subject, items[0]['message']
+
+    sections = [
+        f"{item['team_name']} ({item['age_group']} {item['tier']} {item['season']}, {item['association_name']})\n"
+        f"{item['message']}"
+        for item in items
+    ]
+    body = f"You have {len(items)} scheduling updates for your teams:\n\n" + "\n\n".join(sections)
+    return f"{prefix}{len(items)} scheduling updates for your teams", body
+
+
+def send_digests():
+    """
+    Send one digest per recipient for every pending notification.
+    Team admins for all pending rows are resolved in one query; returns counts.
+    """
+    from users.models import Association, NotificationRecipientState, SchedulingNotification, Team
+    from users.services import email_outbox
+    from users.services.team_recipients import team_recipients
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            SchedulingNotification.objects.select_for_update(skip_locked=True)
+            .filter(email_pending=True)
+            .values_list('id', flat=True)
+        )
+        if not ids:
+            return {'notifications': 0, 'digests': 0, 'suppressed': 0}
+
+        rows = list(
+            SchedulingNotification.objects.filter(id__in=ids)
+            .order_by('sent_at', 'id')
+            .values(
+                'team_id', 'notification_type', 'message', 'content_hash',
+                team_name=F('team__name'),
+                age_group=F('division_state__age_group'),
+                tier=F('division_state__tier'),
+                season=F('division_state__season'),
+                association_id=F('division_state__association_id'),
+                association_name=F('division_state__association__name'),
+            )
+        )
+        admin_emails = team_recipients({row['team_id'] for row in rows}, roles=('admins',))
+        by_recipient = defaultdict(dict)
+        for row in rows:
+            for email in admin_emails.get(row['team_id'], ()):
+                # Same content for the same team only appears once per digest
+                by_recipient[email].setdefault(row['content_hash'], row)
+
+        states = NotificationRecipientState.objects.in_bulk(list(by_recipient), field_name='email')
+        associations = Association.objects.in_bulk({
+            item['association_id'] for items in by_recipient.values() for item in items.values()
+        })
+        teams = Team.objects.in_bulk({item['team_id'] for items in by_recipient.values() for item in items.values()})
+
+        sent_states = []
+        suppressed = 0
+        for email, items_by_hash in by_recipient.items():
+            digest_hash = _digest_hash(items_by_hash)
+            state = states.get(email)
+            if state and state.last_digest_hash == digest_hash and now - state.last_sent_at < DUPLICATE_SUPPRESSION:
+                suppressed += 1
+                continue
+
+            items = list(items_by_hash.values())
+            subject, body = _build_digest(items)
+            divisions = {(i['age_group'], i['tier'], i['season'], i['association_id']) for i in items}
+            team_ids = {item['team_id'] for item in items}
+            division = None
+            if len(divisions) == 1:
+                age_group, tier, season, association_id = divisions.pop()
+                division = (age_group, tier, season, associations[association_id])
+            email_outbox.queue_email(
+                subject,
+                body,
+                [email],
+                notification_type='team_notification',
+                details=subject,
+                team=teams[team_ids.pop()] if len(team_ids) == 1 else None,
+                division=division,
+            )
+            sent_states.append(NotificationRecipientState(email=email, last_sent_at=now, last_digest_hash=digest_hash))
+
+        NotificationRecipientState.objects.bulk_create(
+            sent_states,
+            update_conflicts=True,
+            unique_fields=['email'],
+            update_fields=['last_sent_at', 'last_digest_hash'],
+        )
+        SchedulingNotification.objects.filter(id__in=ids).update(email_pending=False)
+
+    logger.info(f"📬 Digests: {len(sent_states)} queued, {suppressed} suppressed for {len(ids)} notification(s)")
+    return {'notifications': len(ids), 'digests': len(sent_states), 'suppressed': suppressed}
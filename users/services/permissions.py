@@ -0,0 +1,200 @@
+"""
+Role and permission resolver.
+
+roles_for(user) loads the ids of every team, club and association the
+user administers or belongs to with one UNION query over the membership
+and admin join tables, memoised on the user object for the rest of the
+request, so views answer can_admin()/is_member() with set lookups instead
+of loading each object's full admin list.
+
+When the default cache is shared by every process (REDIS_URL), role sets
+are also cached across requests under a per-user roles version. Signals
+bump it for just the users whose membership or admin roles changed, and
+bump a global version when a club or association changes (see
+users/signals.py). A per-process cache can't see another process's bump,
+so without one every request loads the roles afresh rather than honour a
+revoked admin role.
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Value
+
+# Cross-request cache lifetime when a shared cache is configured
+ROLE_CACHE_TIMEOUT = 10 * 60
+
+# Cache backends that keep a separate copy in each process
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+ROLES_VERSION_KEY = 'roles-version'
+USER_ROLES_VERSION_KEY = 'roles-version:{}'
+
+
+def roles_version(user_id):
+    """Version of a user's cached roles and navigation: the global version and the user's own"""
+    keys = [ROLES_VERSION_KEY, USER_ROLES_VERSION_KEY.format(user_id)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return f"{versions[keys[0]]}.{versions[keys[1]]}"
+
+
+def bump_roles_version(user_ids=None):
+    """
+    Invalidate cached role sets and navigation once the current transaction commits:
+    for user_ids only, or for everyone when user_ids is None
+    """
+    if user_ids is None:
+        transaction.on_commit(lambda: cache.set(ROLES_VERSION_KEY, time.time_ns(), None))
+        return
+    keys = [USER_ROLES_VERSION_KEY.format(user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), None))
+
+
+def team_user_ids(team):
+    """Users whose roles or navigation include the team: its members and admins, and its club and association admins"""
+    from users.models import Association, Club, Team
+
+    association_id = Club.objects.filter(id=team.club_id).values('association_id')[:1]
+    queries = [
+        query.values_list('user_id', flat=True)
+        for query in (
+            Team.members.through.objects.filter(team_id=team.id),
+            Team.admins.through.objects.filter(team_id=team.id),
+            Club.admins.through.objects.filter(club_id=team.club_id),
+            Association.admins.through.objects.filter(association_id=association_id),
+        )
+    ]
+    return set(queries[0].union(*queries[1:]))
+
+
+class UserRoles:
+    """Ids of the teams, clubs and associations a user administers or belongs to"""
+
+    # role name -> (model name, many-to-many field, object id column on the join table)
+    RELATIONS = {
+        'admin_teams': ('Team', 'admins', 'team_id'),
+        'member_teams': ('Team', 'members', 'team_id'),
+        'admin_clubs': ('Club', 'admins', 'club_id'),
+        'member_clubs': ('Club', 'members', 'club_id'),
+        'admin_associations': ('Association', 'admins', 'association_id'),
+    }
+
+    def __init__(self, user, ids):
+        self.is_superuser = user.is_superuser
+        self.admin_teams = ids.get('admin_teams', frozenset())
+        self.member_teams = ids.get('member_teams', frozenset())
+        self.admin_clubs = ids.get('admin_clubs', frozenset())
+        self.member_clubs = ids.get('member_clubs', frozenset())
+        self.admin_associations = ids.get('admin_associations', frozenset())
+
+    @classmethod
+    def load_ids(cls, user):
+        from django.apps import apps
+
+        queries = [
+            apps.get_model('users', model_name)._meta.get_field(field).remote_field.through.objects
+            .filter(user_id=user.id)
+            .annotate(role=Value(role), object_id=F(column))
+            .values_list('role', 'object_id')
+            for role, (model_name, field, column) in cls.RELATIONS.items()
+        ]
+        ids = {}
+        for role, object_id in queries[0].union(*queries[1:], all=True):
+            ids.setdefault(role, set()).add(object_id)
+        return {role: frozenset(values) for role, values in ids.items()}
+
+    def can_admin(self, obj):
+        """Superusers, and direct admins of the team, club or association"""
+        from users.models import Association, Club, Team
+
+        if self.is_superuser:
+            return True
+        if isinstance(obj, Team):
+            return obj.id in self.admin_teams
+        if isinstance(obj, Club):
+            return obj.id in self.admin_clubs
+        if isinstance(obj, Association):
+            return obj.id in self.admin_associations
+        raise TypeError(f"No admin role for {type(obj).__name__}")
+
+    def is_member(self, obj):
+        from users.models import Club, Team
+
+        if isinstance(obj, Team):
+            return obj.id in self.member_teams
+        if isinstance(obj, Club):
+            return obj.id in self.member_clubs
+        raise TypeError(f"No membership for {type(obj).__name__}")
+
+    def can_view_team(self, team):
+        """Members and admins of the team, and admins of its club or association"""
+        return (
+            self.is_superuser
+            or team.id in self.member_teams
+            or team.id in self.admin_teams
+            or team.club_id in self.admin_clubs
+            or team.club.association_id in self.admin_associations
+        )
+
+    def can_view_division(self, division):
+        """Admins of the division's association, and members or admins of any team in it"""
+        from users.models import Team
+
+        if self.is_superuser or division.association_id in self.admin_associations:
+            return True
+        own_teams = self.member_teams | self.admin_teams
+        return bool(own_teams) and Team.objects.filter(division=division, id__in=own_teams).exists()
+
+
+def shared_cache():
+    """True when the default cache is shared by every process, so a version bump reaches all of them"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+
+def roles_for(user, use_cache=None):
+    """
+    The user's roles, loaded once per request (memoised on the user). use_cache enables the
+    cross-request cache; by default it is used only when the cache is shared (see shared_cache).
+    """
+    roles = getattr(user, '_roles', None)
+    if roles is not None:
+        return roles
+    if use_cache is None:
+        use_cache = shared_cache()
+    if not user.is_authenticated:
+        roles = UserRoles(user, {})
+    elif use_cache:
+        key = f"roles:{user.id}:{roles_version(user.id)}"
+        ids = cache.get(key)
+        if ids is None:
+            ids = UserRoles.load_ids(user)
+            cache.set(key, ids, ROLE_CACHE_TIMEOUT)
+        roles = UserRoles(user, ids)
+    else:
+        roles = UserRoles(user, UserRoles.load_ids(user))
+    user._roles = roles
+    return roles
+
+
+def can_admin(user, obj):
+    return roles_for(user).can_admin(obj)
+
+
+def is_member(user, obj):
+    return roles_for(user).is_member(obj)
+
+
+def can_view_team(user, team):
+    return roles_for(user).can_view_team(team)
+
+
+def can_view_division(user, division):
+    return roles_for(user).can_view_division(division)
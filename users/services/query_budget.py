@@ -0,0 +1,62 @@
+"""
+Per-request SQL accounting for development and tests.
+
+QueryStats is a database execute wrapper that counts the queries a block
+runs, how many of them repeat an earlier query with the same SQL and
+parameters (the usual N+1 signature), and their total time.
+QueryBudgetMiddleware wraps every request in one and logs a warning when
+a request goes over settings.QUERY_BUDGET.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connection
+
+DEFAULT_BUDGET = {
+    'queries': 50,
+    'duplicates': 10,
+    'sql_ms': 500,
+}
+
+
+def budget():
+    return {**DEFAULT_BUDGET, **getattr(settings, 'QUERY_BUDGET', {})}
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.sql_ms = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        """Queries that repeated an earlier query exactly"""
+        return sum(times - 1 for times in self.statements.values())
+
+    def most_repeated(self, limit=3):
+        return [(sql, times) for (sql, params), times in self.statements.most_common(limit) if times > 1]
+
+    def over_budget(self, limits=None):
+        """Names of the limits this block exceeded"""
+        limits = limits or budget()
+        measured = {'queries': self.count, 'duplicates': self.duplicates, 'sql_ms': self.sql_ms}
+        return [name for name, value in measured.items() if value > limits[name]]
+
+
+@contextmanager
+def recording():
+    """Count the queries run on the default connection inside the block"""
+    stats = QueryStats()
+    with connection.execute_wrapper(stats):
+        yield stats
@@ -0,0 +1,141 @@
+"""
+Recurring team availability.
+
+Teams describe availability as rules ("every Saturday and Sunday from October
+through February, except holidays") instead of one TeamDate row per day. Rules
+are expanded lazily into concrete dates; each expansion is cached and keyed by
+the rule's ``updated_at`` so editing a rule naturally invalidates it.
+Explicit TeamDate rows always win over rule-generated dates.
+"""
+from collections import namedtuple
+from datetime import date, datetime, time
+from django.core.cache import cache
+import recurrence
+
+# A single available day, whether entered directly or produced by a rule
+AvailabilityDate = namedtuple('AvailabilityDate', ['date', 'is_home', 'allow_doubleheader', 'from_rule'])
+
+RULE_CACHE_TIMEOUT = 60 * 60 * 24  # Expansions only change when the rule is saved
+
+WEEKDAYS = [recurrence.MO, recurrence.TU, recurrence.WE, recurrence.TH, recurrence.FR, recurrence.SA, recurrence.SU]
+
+
+def _as_datetime(day):
+    return datetime.combine(day, time.min)
+
+
+def build_recurrence(weekdays, end_date, exception_dates=()):
+    """Build a weekly Recurrence on the given weekdays (0=Monday) with excluded dates"""
+    rule = recurrence.Rule(
+        recurrence.WEEKLY,
+        byday=[WEEKDAYS[int(day)] for day in weekdays],
+        until=_as_datetime(end_date),
+    )
+    return recurrence.Recurrence(
+        include_dtstart=False,
+        rrules=[rule],
+        exdates=[_as_datetime(day) for day in exception_dates],
+    )
+
+
+def _cache_key(rule):
+    return f"availability_rule:{rule.id}:{rule.updated_at.timestamp()}"
+
+
+def expand_rule(rule):
+    """Return the dates produced by a TeamAvailabilityRule (cached per rule version)"""
+    key = _cache_key(rule)
+    ordinals = cache.get(key)
+    if ordinals is None:
+        occurrences = rule.recurrence.between(
+            _as_datetime(rule.start_date),
+            _as_datetime(rule.end_date),
+            dtstart=_as_datetime(rule.start_date),
+            inc=True,
+        )
+        ordinals = [occurrence.date().toordinal() for occurrence in occurrences]
+        cache.set(key, ordinals, RULE_CACHE_TIMEOUT)
+    return [date.fromordinal(ordinal) for ordinal in ordinals]
+
+
+def merge_availability(rules, team_dates):
+    """Combine rule expansions with explicit TeamDate rows into a sorted list of AvailabilityDate"""
+    by_date = {}
+    for rule in rules:
+        for day in expand_rule(rule):
+            by_date[day] = AvailabilityDate(day, rule.is_home, rule.allow_doubleheader, True)
+    for team_date in team_dates:
+        by_date[team_date.date] = AvailabilityDate(
+            team_date.date, team_date.is_home, team_date.allow_doubleheader, False
+        )
+    return [by_date[day] for day in sorted(by_date)]
+
+
+def team_availability(team, start=None, end=None):
+    """All available days for one team, optionally limited to [start, end)"""
+    from users.models import TeamDate, TeamAvailabilityRule
+
+    rules = TeamAvailabilityRule.objects.filter(team=team)
+    team_dates = TeamDate.objects.filter(team=team)
+    if start:
+        rules = rules.filter(end_date__gte=start)
+        team_dates = team_dates.filter(date__gte=start)
+    if end:
+        rules = rules.filter(start_date__lt=end)
+        team_dates = team_dates.filter(date__lt=end)
+
+    entries = merge_availability(rules, team_dates)
+    if start or end:
+        entries = [
+            entry for entry in entries
+            if (start is None or entry.date >= start) and (end is None or entry.date < end)
+        ]
+    return entries
+
+
+def division_availability(teams):
+    """Available days for many teams in two queries, keyed by team id"""
+    return availability_by_team_id([team.id for team in teams])
+
+
+def availability_by_team_id(team_ids):
+    """Available days for the given team ids in two queries, keyed by team id"""
+    from users.models import TeamDate, TeamAvailabilityRule
+
+    team_ids = list(team_ids)
+    rules_by_team = {team_id: [] for team_id in team_ids}
+    dates_by_team = {team_id: [] for team_id in team_ids}
+
+    for rule in TeamAvailabilityRule.objects.filter(team_id__in=team_ids):
+        rules_by_team[rule.team_id].append(rule)
+    for team_date in TeamDate.objects.filter(team_id__in=team_ids):
+        dates_by_team[team_date.team_id].append(team_date)
+
+    return {
+        team_id: merge_availability(rules_by_team[team_id], dates_by_team[team_id])
+        for team_id in team_ids
+    }
+
+
+def exclude_date(team, day):
+    """Add an exception date to every rule of the team that produces ``day``"""
+    return exclude_dates(team, [day])
+
+
+def exclude_dates(team, days):
+    """Add exception dates to the team's rules, saving each affected rule once"""
+    from users.models import TeamAvailabilityRule
+
+    days = set(days)
+    if not days:
+        return 0
+
+    excluded = 0
+    rules = TeamAvailabilityRule.objects.filter(team=team, start_date__lte=max(days), end_date__gte=min(days))
+    for rule in rules:
+        produced = days.intersection(expand_rule(rule))
+        if produced:
+            rule.recurrence.exdates.extend(_as_datetime(day) for day in sorted(produced))
+            rule.save()
+            excluded += len(produced)
+    return excluded
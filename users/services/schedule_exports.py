@@ -0,0 +1,244 @@
+"""
+CSV and PDF schedule exports for a division, a team or a whole association.
+
+Small CSV exports are streamed straight from an ``.iterator()`` over the
+indexed game-day rows. PDFs and large exports are rendered once into a
+ScheduleExport artifact keyed by the schedule version(s) they were built
+from; big ones are built by a background job worker and every later
+download is served from the stored artifact.
+"""
+import csv
+import hashlib
+import io
+import logging
+from collections import namedtuple
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from users.services import match_dates
+
+logger = logging.getLogger(__name__)
+
+# Exports with more game days than this are built in the background
+INLINE_EXPORT_LIMIT = 2000
+ITERATOR_CHUNK_SIZE = 2000
+
+# A build claimed this long ago is assumed to have died with its worker or request and may be reclaimed
+STALE_BUILD_SECONDS = 10 * 60
+
+CSV_HEADER = ['Date', 'Day', 'Division', 'Home', 'Away']
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'pdf': 'application/pdf',
+}
+
+# division_id is set for division and team targets so their queries filter on the Division FK
+ExportTarget = namedtuple('ExportTarget', ['scope', 'scope_key', 'title', 'slug', 'division_id'], defaults=[None])
+
+
+def division_target(division):
+    age_group, tier, season, association_id = division.key
+    return ExportTarget(
+        'division',
+        f"{association_id}:{age_group}:{tier}:{season}",
+        f"{division.association.name} {age_group} {tier} ({season})",
+        f"{age_group}-{tier}-{season}",
+        division.id,
+    )
+
+
+def team_target(team):
+    return ExportTarget(
+        'team', str(team.id), f"{team.name} ({team.season})", f"team-{team.id}-{team.season}", team.division_id,
+    )
+
+
+def association_target(association):
+    return ExportTarget('association', str(association.id), association.name, f"association-{association.id}")
+
+
+def target_for_export(export):
+    """Rebuild the ExportTarget a stored ScheduleExport was requested for"""
+    from users.models import Association, Division, Team
+
+    if export.scope == 'team':
+        return team_target(Team.objects.get(id=export.scope_key))
+    if export.scope == 'association':
+        return association_target(Association.objects.get(id=export.scope_key))
+    association_id, age_group, tier, season = export.scope_key.split(':', 3)
+    return division_target(Division.objects.select_related('association').get(
+        association_id=association_id, age_group=age_group, tier=tier, season=season,
+    ))
+
+
+def _active_schedules(target):
+    from users.models import GeneratedSchedule
+
+    schedules = GeneratedSchedule.objects.filter(is_active=True)
+    if target.scope == 'association':
+        return schedules.filter(association_id=target.scope_key)
+    return schedules.filter(division_id=target.division_id)
+
+
+def version_key(target):
+    """Key that changes whenever any schedule version behind the export changes"""
+    ids = '-'.join(str(pk) for pk in _active_schedules(target).order_by('id').values_list('id', flat=True))
+    if len(ids) > 64:
+        return hashlib.sha1(ids.encode()).hexdigest()
+    return ids or 'empty'
+
+
+def target_games(target):
+    """Game-day rows for an export target, ordered for output"""
+    from users.models import Association, Team
+
+    if target.scope == 'team':
+        games = match_dates.team_games(Team.objects.get(id=target.scope_key)).select_related('team')
+    elif target.scope == 'association':
+        games = match_dates.association_games(Association.objects.get(id=target.scope_key))
+    else:
+        games = match_dates.division_games(target.division_id)
+    return games.order_by('date', 'age_group', 'tier', 'match_id')
+
+
+def game_row(game):
+    """One output row; team exports list both home and away games from the team's side"""
+    home, away = (game.team, game.opponent) if game.is_home else (game.opponent, game.team)
+    return [
+        game.date.isoformat(),
+        game.date.strftime('%a'),
+        f"{game.age_group} {game.tier}",
+        home.name,
+        away.name,
+    ]
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(games):
+    """Yield CSV lines for a queryset of game days without loading it into memory"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for game in games.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        yield writer.writerow(game_row(game))
+
+
+def render_csv(games):
+    return ''.join(stream_csv(games)).encode('utf-8')
+
+
+def render_pdf(title, games):
+    """A landscape PDF table of the games using reportlab"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    buffer = io.BytesIO()
+    document = SimpleDocTemplate(buffer, pagesize=landscape(letter), title=title)
+    styles = getSampleStyleSheet()
+
+    rows = [CSV_HEADER] + [game_row(game) for game in games.iterator(chunk_size=ITERATOR_CHUNK_SIZE)]
+    table = Table(rows, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0d6efd')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ]))
+
+    story = [
+        Paragraph(f"{title} Schedule", styles['Title']),
+        Paragraph(f"Generated {timezone.localtime():%Y-%m-%d %H:%M}", styles['Normal']),
+        Spacer(1, 12),
+    ]
+    story.append(table if len(rows) > 1 else Paragraph("No games have been scheduled yet.", styles['Normal']))
+    document.build(story)
+    return buffer.getvalue()
+
+
+def render(target, export_format):
+    games = target_games(target)
+    if export_format == 'pdf':
+        return render_pdf(target.title, games)
+    return render_csv(games)
+
+
+def is_large(target):
+    return target.scope == 'association' or target_games(target).count() > INLINE_EXPORT_LIMIT
+
+
+def get_or_create_export(target, export_format, user=None):
+    """The ScheduleExport row for the target's current schedule version (created as pending if new)"""
+    from users.models import ScheduleExport
+
+    key = version_key(target)
+    lookup = {'scope': target.scope, 'scope_key': target.scope_key, 'format': export_format, 'version_key': key}
+    export = ScheduleExport.objects.filter(**lookup).first()
+    if export is None:
+        try:
+            with transaction.atomic():
+                export = ScheduleExport.objects.create(
+                    **lookup,
+                    filename=f"schedule-{target.slug}.{export_format}",
+                    requested_by=user if user and user.is_authenticated else None,
+                )
+        except IntegrityError:
+            # Another request created it first
+            export = ScheduleExport.objects.get(**lookup)
+    return export
+
+
+def build_export(export):
+    """Render an export artifact and store it on the row"""
+    try:
+        export.content = render(target_for_export(export), export.format)
+        export.status = 'ready'
+        export.error = ''
+        logger.info(f"📄 Built export {export.filename} ({len(export.content)} bytes)")
+    except Exception as e:
+        export.status = 'failed'
+        export.error = str(e)
+        logger.error(f"❌ Failed to build export {export.filename}: {e}")
+    export.completed_at = timezone.now()
+    export.save(update_fields=['content', 'status', 'error', 'completed_at'])
+    if export.status == 'ready':
+        # Artifacts built from older schedule versions will never be served again
+        type(export).objects.filter(
+            scope=export.scope, scope_key=export.scope_key, format=export.format
+        ).exclude(version_key=export.version_key).delete()
+    return export
+
+
+def claim_export(export_id):
+    """
+    Atomically move a pending, failed or stale building export to 'building'; returns the row, or None
+    if another request or worker is building it
+    """
+    from django.db.models import Q
+    from users.models import ScheduleExport
+
+    now = timezone.now()
+    stale = now - timezone.timedelta(seconds=STALE_BUILD_SECONDS)
+    # Rows left 'building' without a claim time predate claimed_at and are treated as stale
+    abandoned = Q(status='building') & (Q(claimed_at__lt=stale) | Q(claimed_at__isnull=True))
+    claimed = ScheduleExport.objects.filter(
+        Q(status__in=['pending', 'failed']) | abandoned, id=export_id,
+    ).update(status='building', claimed_at=now)
+    return ScheduleExport.objects.get(id=export_id) if claimed else None
+
+
+def start_background_build(export):
+    """Claim an export nobody is building and queue a job to build it; returns the job, or None if already claimed"""
+    from users.services import job_queue
+
+    if claim_export(export.id) is None:
+        return None
+    return job_queue.enqueue('build_export', {'export_id': export.id}, user=export.requested_by, max_attempts=1)
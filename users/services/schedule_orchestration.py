@@ -1,13 +1,15 @@
+from collections import defaultdict
 from django.utils import timezone
-from django.core.mail import send_mail
-from django.conf import settings
-from users.models import DivisionSchedulingState, Team, SchedulingNotification
+from users.models import Division, DivisionSchedulingState, Team
+from users.services import notification_digest
 from users.services.schedule_service import DivisionScheduler  # Enhanced scheduler with doubleheader support
 from users.services.dynamic_schedule_manager import DynamicScheduleManager
 import logging
 
 logger = logging.getLogger(__name__)
 
+UPCOMING_GAMES_IN_NOTIFICATION = 5
+
 class SchedulingOrchestrationService:
     """
     Orchestrates the scheduling process by implementing the hybrid scheduling approach:
@@ -16,20 +18,14 @@ class SchedulingOrchestrationService:
     - Sends notifications for conflicts and keeps notifying until resolved
     - Manages the overall scheduling workflow around the core DivisionScheduler
     """
-    def __init__(self, age_group, tier, season, association):
+    def __init__(self, age_group, tier, season, association, progress=None):
         self.age_group = age_group
         self.tier = tier
         self.season = season
         self.association = association
-        self.division_state, created = DivisionSchedulingState.objects.get_or_create(
-            age_group=age_group,
-            tier=tier,
-            season=season,
-            association=association,
-            defaults={
-                'availability_deadline': timezone.now() + timezone.timedelta(days=30),
-                'auto_schedule_enabled': True            }
-        )
+        self.progress = progress  # Passed on to DivisionScheduler for live progress
+        self.division = Division.resolve(age_group, tier, season, association)
+        self.division_state = DivisionSchedulingState.for_division(self.division)
     
     def check_and_trigger_scheduling(self, manual_trigger=False):
         """
@@ -95,7 +91,7 @@ class SchedulingOrchestrationService:
         
         # Use your existing scheduler with all required parameters
         print(f"🏗️  Creating DivisionScheduler instance...")
-        scheduler = DivisionScheduler(self.age_group, self.tier, self.season, self.association)
+        scheduler = DivisionScheduler(self.age_group, self.tier, self.season, self.association, progress=self.progress)
         
         print(f"⚙️  Calling scheduler.create_schedule()...")
         schedule, unscheduled_matches = scheduler.create_schedule()
@@ -106,6 +102,8 @@ class SchedulingOrchestrationService:
         logger.info(f"✅ Schedule generation completed: {len(schedule)} matches scheduled, {len(unscheduled_matches)} unscheduled")
         
         # Save the generated schedule to database (like manual generation does)
+        if self.progress:
+            self.progress('saving', placed=len(schedule), conflicts=len(unscheduled_matches))
         self._save_schedule_to_database(schedule, unscheduled_matches)
         
         if unscheduled_matches:
@@ -151,26 +149,38 @@ class SchedulingOrchestrationService:
         self.division_state.save()
         
         # Send success notifications
-        teams = Team.objects.filter(
-            age_group=self.age_group,
-            tier=self.tier,
-            association=self.association
-        )
+        teams = Team.objects.filter(division=self.division)
         
+        from users.services.match_dates import division_games
+        
+        # One query for the division's upcoming games, split into each team's (date, where, opponent)
+        upcoming_by_team = defaultdict(list)
+        for game in division_games(self.division, start=timezone.localdate()):
+            upcoming_by_team[game.team_id].append((game.date, 'vs', game.opponent))
+            upcoming_by_team[game.opponent_id].append((game.date, '@', game.team))
+        
+        completion_messages = []
         for team in teams:
-            self._send_notification(
+            upcoming = upcoming_by_team[team.id][:UPCOMING_GAMES_IN_NOTIFICATION]
+            games_text = "".join(
+                f"\n• {day:%a %b %d}: {where} {opponent.name}"
+                for day, where, opponent in upcoming
+            )
+            completion_messages.append((
                 team,
-                'schedule_complete',
                 f"Great news! The schedule for {self.age_group} {self.tier} has been successfully generated. "
                 f"Check the division schedule to see your team's games."
-            )
+                + (f"\nUpcoming games:{games_text}" if games_text else "")
+            ))
+        notification_digest.notify(self.division_state, 'schedule_complete', completion_messages, email=False)
         
         return True, "Schedule generated successfully"
     
     def _send_conflict_notifications(self, teams, unscheduled_matches):
         """
-        Send notifications to teams about scheduling conflicts
+        Send notifications to teams about scheduling conflicts; team admins get them in their next digest
         """
+        conflict_messages = []
         for team in teams:
             # Find specific reasons for this team's conflicts
             team_conflicts = [m for m in unscheduled_matches 
@@ -181,10 +191,8 @@ class SchedulingOrchestrationService:
                 if hasattr(conflict, 'reason'):
                     conflict_reasons.add(conflict['reason'])
             
-            message = self._build_conflict_message(team, conflict_reasons)
-            
-            self._send_notification(team, 'schedule_conflict', message)
-            self._send_email_notification(team, 'Schedule Conflict - Action Required', message)
+            conflict_messages.append((team, self._build_conflict_message(team, conflict_reasons)))
+        notification_digest.notify(self.division_state, 'schedule_conflict', conflict_messages)
     
     def _build_conflict_message(self, team, conflict_reasons):
         """
@@ -204,127 +212,17 @@ class SchedulingOrchestrationService:
         
         return base_message
     
-    def _send_notification(self, team, notification_type, message):
-        """
-        Create a notification record
-        """
-        SchedulingNotification.objects.create(
-            division_state=self.division_state,
-            team=team,
-            notification_type=notification_type,
-            message=message        )
-    
-    def _send_email_notification(self, team, subject, message):
-        """
-        Send email notification to team admins
-        """
-        admin_emails = [admin.email for admin in team.admins.all() if admin.email]
-        
-        if admin_emails:
-            try:
-                send_mail(
-                    subject=f"[{self.association.name}] {subject}",
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=admin_emails,
-                    fail_silently=False
-                )
-                logger.info(f"Email sent to {team.name} admins: {admin_emails}")
-                
-                # Log the email notification
-                from users.models import DivisionLog
-                DivisionLog.log_email_notification(
-                    age_group=self.age_group,
-                    tier=self.tier,
-                    season=self.season,
-                    association=self.association,
-                    notification_type='team_notification',
-                    recipients_count=len(admin_emails),
-                    user=None,  # System-generated
-                    team=team,
-                    details=subject
-                )
-                
-            except Exception as e:
-                logger.error(f"Failed to send email to {team.name}: {e}")
-    
     def _save_schedule_to_database(self, schedule, unscheduled_matches):
         """
-        Save the generated schedule to the database, similar to manual generation
+        Save the generated schedule to the database, credited to the system user
         """
-        from users.models import GeneratedSchedule, ScheduleMatch
+        from users.services.schedule_persistence import save_generated_schedule
         
         logger.info(f"💾 SAVING GENERATED SCHEDULE TO DATABASE")
-          # Delete any existing schedules for this division first (to avoid duplicates)
-        existing_schedules = GeneratedSchedule.objects.filter(
-            age_group=self.age_group,
-            tier=self.tier,
-            season=self.season,
-            association=self.association
-        )
-        if existing_schedules.exists():
-            logger.info(f"🗑️ Deleting {existing_schedules.count()} existing schedule(s)")
-            existing_schedules.delete()        # Get or create a system user for automated generation
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        system_user, created = User.objects.get_or_create(
-            username='system',
-            defaults={
-                'email': 'system@teamschedule.local',
-                'first_name': 'System',
-                'last_name': 'Scheduler',
-                'is_active': False,  # System user shouldn't be able to log in
-            }
+        return save_generated_schedule(
+            self.age_group, self.tier, self.season, self.association,
+            schedule, unscheduled_matches,
         )
-        
-        # Create new GeneratedSchedule record
-        generated_schedule = GeneratedSchedule.objects.create(
-            age_group=self.age_group,
-            tier=self.tier,
-            season=self.season,
-            association=self.association,
-            generated_by=system_user,  # Use system user for automated generation
-            is_active=True
-        )
-        logger.info(f"📊 Generated schedule saved with ID: {generated_schedule.id}")
-        
-        logger.info(f"💾 SAVING {len(schedule)} SCHEDULED MATCHES TO DATABASE")
-        # Save all scheduled matches to the database
-        for i, match in enumerate(schedule, 1):
-            # Convert dates to strings if they're date objects
-            dates_list = []
-            for date in match['dates']:
-                if hasattr(date, 'strftime'):
-                    dates_list.append(date.strftime('%Y-%m-%d'))
-                else:
-                    dates_list.append(str(date))
-            
-            ScheduleMatch.objects.create(
-                generated_schedule=generated_schedule,
-                home_team=match['home_team'],
-                away_team=match['away_team'],
-                dates=dates_list,
-                match_type=match.get('type', 'series'),
-                status='scheduled'
-            )
-            logger.info(f"  ✅ Match {i}: {match['home_team'].name} vs {match['away_team'].name} saved")
-        
-        logger.info(f"⚠️ SAVING {len(unscheduled_matches)} UNSCHEDULED MATCHES TO DATABASE")
-        # Save unscheduled matches as well (for tracking conflicts)
-        for i, match in enumerate(unscheduled_matches, 1):
-            ScheduleMatch.objects.create(
-                generated_schedule=generated_schedule,
-                home_team=match['home_team'],
-                away_team=match['away_team'],
-                dates=[],  # No dates for unscheduled matches
-                match_type='series',  # Default type
-                status='unscheduled',  # Important: mark as unscheduled
-                conflict_reason=match.get('reason', 'Scheduling conflict')
-            )
-            logger.info(f"  ❌ Unscheduled Match {i}: {match['home_team'].name} vs {match['away_team'].name} - {match.get('reason', 'Scheduling conflict')}")
-        
-        logger.info(f"💾 SCHEDULE DATABASE SAVE COMPLETE - {len(schedule)} scheduled, {len(unscheduled_matches)} unscheduled")
-        return generated_schedule
     
     def send_daily_reminders(self):
         """
@@ -338,15 +236,15 @@ class SchedulingOrchestrationService:
             timezone.now() - self.division_state.last_notification_sent < timezone.timedelta(hours=24)):
             return
         
-        # Send reminders to unmatched teams
-        for team in self.division_state.unmatched_teams.all():
-            message = (
+        # Send reminders to unmatched teams; the digest merges them with reminders from their other divisions
+        notification_digest.notify(self.division_state, 'insufficient_availability', [
+            (
+                team,
                 f"Daily Reminder: Your team {team.name} still has scheduling conflicts. "
                 f"Please add more weekend availability dates to resolve these issues."
             )
-            
-            self._send_notification(team, 'insufficient_availability', message)
-            self._send_email_notification(team, 'Daily Reminder - Schedule Conflicts', message)
+            for team in self.division_state.unmatched_teams.all()
+        ])
         
         # Update last notification time
         self.division_state.last_notification_sent = timezone.now()
@@ -361,11 +259,7 @@ class SchedulingOrchestrationService:
             return
         
         # Check if any team has added dates since last attempt
-        teams = Team.objects.filter(
-            age_group=self.age_group,
-            tier=self.tier,
-            association=self.association
-        )
+        teams = Team.objects.filter(division=self.division)
         
         new_dates_added = False
         for team in teams:
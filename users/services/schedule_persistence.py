@@ -0,0 +1,132 @@
+"""
+Persistence for generated division schedules.
+
+Used by both the manual "Generate Schedule" view and the automated
+orchestration service so a new schedule version is always saved
+atomically, with matches written in bulk rather than one INSERT per match.
+"""
+import logging
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+
+SYSTEM_USERNAME = 'system'
+
+
+def get_system_user():
+    """The inactive 'system' user credited with automated schedules"""
+    # Not held for the process: a row created in a rolled-back transaction, or deleted later,
+    # would leave a cached instance that every later save fails its foreign key on
+    User = get_user_model()
+    system_user, created = User.objects.get_or_create(
+        username=SYSTEM_USERNAME,
+        defaults={
+            'email': 'system@teamschedule.local',
+            'first_name': 'System',
+            'last_name': 'Scheduler',
+            'is_active': False,  # System user shouldn't be able to log in
+        }
+    )
+    return system_user
+
+
+def _date_strings(dates):
+    """Match dates as 'YYYY-MM-DD' strings, whether given as dates or strings"""
+    return [day.strftime('%Y-%m-%d') if hasattr(day, 'strftime') else str(day) for day in dates]
+
+
+def build_match_rows(generated_schedule, schedule, unscheduled_matches):
+    """Unsaved ScheduleMatch instances for scheduled and unscheduled matches"""
+    from users.models import ScheduleMatch
+
+    rows = [
+        ScheduleMatch(
+            generated_schedule=generated_schedule,
+            home_team=match['home_team'],
+            away_team=match['away_team'],
+            dates=_date_strings(match['dates']),
+            match_type=match.get('type', 'series'),
+            status='scheduled',
+        )
+        for match in schedule
+    ]
+    rows.extend(
+        ScheduleMatch(
+            generated_schedule=generated_schedule,
+            home_team=match['home_team'],
+            away_team=match['away_team'],
+            dates=[],  # No dates for unscheduled matches
+            match_type='series',
+            status='unscheduled',  # Important: mark as unscheduled
+            conflict_reason=match.get('reason', 'Scheduling conflict'),
+        )
+        for match in unscheduled_matches
+    )
+    return rows
+
+
+def save_generated_schedule(age_group, tier, season, association, schedule, unscheduled_matches, generated_by=None):
+    """
+    Save a newly generated schedule as the division's next version in a single transaction.
+    Only matches that changed since the active version are written.
+    generated_by defaults to the system user. Returns the new GeneratedSchedule.
+    """
+    from users.models import Division, DivisionSchedulingState, GeneratedSchedule, ScheduleMatch, ScheduleMatchDate
+    from users.services.match_dates import match_date_rows
+    from users.services.schedule_snapshot import store_snapshot
+    from users.services.schedule_versions import diff_matches, count_moved
+
+    if generated_by is None:
+        generated_by = get_system_user()
+
+    division = Division.resolve(age_group, tier, season, association)
+    division_state = DivisionSchedulingState.for_division(division)
+    with transaction.atomic():
+        # Locking the division's state row serialises version numbering, even for its very first schedule
+        DivisionSchedulingState.objects.select_for_update().filter(id=division_state.id).first()
+        schedules = GeneratedSchedule.objects.filter(division=division)
+        parent = schedules.filter(is_active=True).first()
+        latest_version = schedules.order_by('-version').values_list('version', flat=True).first() or 0
+
+        proposed = build_match_rows(None, schedule, unscheduled_matches)
+        current = list(parent.schedule_matches()) if parent else []
+        retired, added = diff_matches(current, proposed)
+
+        if parent:
+            parent.is_active = False
+            parent.save(update_fields=['is_active'])
+
+        generated_schedule = GeneratedSchedule.objects.create(
+            age_group=age_group,
+            tier=tier,
+            season=season,
+            association=association,
+            division=division,
+            generated_by=generated_by,
+            is_active=True,
+            version=latest_version + 1,
+            parent=parent,
+            matches_added=len(added),
+            matches_removed=len(retired),
+            matches_moved=count_moved(retired, added),
+        )
+        if retired:
+            ScheduleMatch.objects.filter(id__in=[match.id for match in retired]).update(retired_in=generated_schedule)
+        for match in added:
+            match.generated_schedule = generated_schedule
+        ScheduleMatch.objects.bulk_create(added, batch_size=BULK_BATCH_SIZE)
+        ScheduleMatchDate.objects.bulk_create(
+            match_date_rows(added, generated_schedule), batch_size=BULK_BATCH_SIZE
+        )
+        store_snapshot(generated_schedule)
+
+    logger.info(
+        f"💾 Saved schedule v{generated_schedule.version} (ID {generated_schedule.id}) for "
+        f"{association.name} {age_group} {tier} ({season}) - "
+        f"{len(schedule)} scheduled, {len(unscheduled_matches)} unscheduled; "
+        f"{len(added)} rows written, {len(retired)} retired"
+    )
+    return generated_schedule
@@ -1,20 +1,19 @@
 from datetime import datetime, timedelta
-from users.models import Team, TeamDate, ScheduleProposal
+from users.models import Division, Team, TeamDate, TeamAvailabilityMask, ScheduleProposal
+from users.services.recurring_availability import availability_by_team_id
 from django.db.models import Q
 import random
 
 class DivisionScheduler:
-    def __init__(self, age_group, tier, season, association):
+    def __init__(self, age_group, tier, season, association, progress=None):
         self.age_group = age_group
         self.tier = tier
         self.season = season
         self.association = association
-        self.teams = Team.objects.filter(
-            age_group=age_group, 
-            tier=tier, 
-            season=season,
-            club__association=association
-        )
+        # Optional callable(phase, placed, conflicts, total) for live progress (see job_progress.ProgressReporter)
+        self.progress = progress or (lambda phase, placed=0, conflicts=0, total=0: None)
+        self.division = Division.resolve(age_group, tier, season, association)
+        self.teams = Team.objects.filter(division=self.division)
 
     def get_required_matchups(self):
         """Generate all required home/away matchups between teams"""
@@ -42,20 +41,32 @@ class DivisionScheduler:
         """Get all team availability data organized by team and home/away"""
         availability = {}
         
-        for team in self.teams:
-            availability[team.id] = {
-                'home_dates': list(TeamDate.objects.filter(
-                    team=team, is_home=True
-                ).values_list('date', flat=True)),
-                'away_dates': list(TeamDate.objects.filter(
-                    team=team, is_home=False
-                ).values_list('date', flat=True)),
-                'home_doubleheader_dates': list(TeamDate.objects.filter(
-                    team=team, is_home=True, allow_doubleheader=True
-                ).values_list('date', flat=True)),
-                'away_doubleheader_dates': list(TeamDate.objects.filter(
-                    team=team, is_home=False, allow_doubleheader=True
-                ).values_list('date', flat=True))            }
+        # Decode the availability bitmasks in one query; teams without a mask are expanded from their
+        # TeamDate rows and rules together, in two more queries
+        masks = {
+            mask.team_id: mask
+            for mask in TeamAvailabilityMask.objects.filter(team__in=self.teams)
+        }
+        team_ids = [team.id for team in self.teams]
+        unmasked = availability_by_team_id([team_id for team_id in team_ids if team_id not in masks])
+        
+        for team_id in team_ids:
+            mask = masks.get(team_id)
+            if mask is not None:
+                home_dates = mask.home_dates()
+                away_dates = mask.away_dates()
+                doubleheader_dates = set(mask.doubleheader_dates())
+            else:
+                entries = unmasked[team_id]
+                home_dates = [entry.date for entry in entries if entry.is_home]
+                away_dates = [entry.date for entry in entries if not entry.is_home]
+                doubleheader_dates = {entry.date for entry in entries if entry.allow_doubleheader}
+            availability[team_id] = {
+                'home_dates': home_dates,
+                'away_dates': away_dates,
+                'home_doubleheader_dates': [d for d in home_dates if d in doubleheader_dates],
+                'away_doubleheader_dates': [d for d in away_dates if d in doubleheader_dates],
+            }
             
         return availability
 
@@ -128,6 +139,7 @@ class DivisionScheduler:
         
         # Get team availability
         print("🔍 Analyzing team availability...")
+        self.progress('availability', total=len(required_matchups))
         self.availability = self.get_team_availability()
         
         # Track scheduled series and completed matchups
@@ -176,6 +188,7 @@ class DivisionScheduler:
         for opportunity in doubleheader_opportunities:
             weekend_series = opportunity['weekend_series']
             team = opportunity['team']
+            self.progress('doubleheaders', placed=len(completed_matchups), total=len(required_matchups))
             
             print(f"\nProcessing {opportunity['type']} for {team.name} on {weekend_series[0].strftime('%m/%d')}-{weekend_series[1].strftime('%m/%d')}")
             
@@ -286,6 +299,13 @@ class DivisionScheduler:
             
             if matchup_key in completed_matchups:
                 continue
+            
+            self.progress(
+                'series',
+                placed=len(completed_matchups),
+                conflicts=len(unscheduled_matchups),
+                total=len(required_matchups),
+            )
                 
             # Find available weekend series for this matchup
             home_series = all_weekend_series[home_team.id]['home_series']
@@ -331,6 +351,12 @@ class DivisionScheduler:
                 })
                 print(f"  ✗ Could not schedule: {reason}")
         
+        self.progress(
+            'scheduled',
+            placed=len(completed_matchups),
+            conflicts=len(unscheduled_matchups),
+            total=len(required_matchups),
+        )
         print(f"\n🏁 SCHEDULE GENERATION COMPLETED!")
         print("=" * 80)
         print(f"✅ Successfully scheduled: {len(scheduled_series)} weekend series")
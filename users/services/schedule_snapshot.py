@@ -0,0 +1,135 @@
+"""
+Pre-rendered calendar snapshots for generated schedules.
+
+A GeneratedSchedule never changes once its matches are saved, so the
+calendar events, per-team event lists and the summary table are rendered
+once at save time and stored gzip-compressed on the schedule. Read-heavy
+pages then load a single column instead of rebuilding events from
+ScheduleMatch rows on every request.
+"""
+import gzip
+import json
+import logging
+from datetime import timedelta
+
+from users.services import calendar_feeds
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_LEVEL = 6
+
+
+def _pack(payload):
+    return gzip.compress(
+        json.dumps(payload, **calendar_feeds.COMPACT_JSON).encode('utf-8'),
+        compresslevel=COMPRESS_LEVEL,
+    )
+
+
+def _unpack(blob):
+    return json.loads(gzip.decompress(bytes(blob)).decode('utf-8'))
+
+
+def render_snapshot(generated_schedule):
+    """Render (events_blob, summary_blob) for a schedule from its ScheduleMatch rows"""
+    matches = generated_schedule.schedule_matches().select_related('home_team', 'away_team').order_by('dates', 'id')
+
+    events = []
+    team_events = {}
+    scheduled = []
+    unscheduled = []
+
+    for match in matches:
+        home = {'id': match.home_team_id, 'name': match.home_team.name}
+        away = {'id': match.away_team_id, 'name': match.away_team.name}
+
+        if match.status == 'unscheduled':
+            unscheduled.append({
+                'home_team': home,
+                'away_team': away,
+                'reason': match.conflict_reason or 'Scheduling conflict',
+            })
+            continue
+
+        if match.status != 'scheduled':
+            continue
+
+        scheduled.append({
+            'home_team': home,
+            'away_team': away,
+            'dates': list(match.dates),
+            'status': match.status,
+            'type': match.match_type,
+        })
+        event = calendar_feeds.match_event(match)
+        if event:
+            events.append(event)
+            team_events.setdefault(str(match.home_team_id), []).append(event)
+            team_events.setdefault(str(match.away_team_id), []).append(event)
+
+    events.sort(key=lambda event: event['start'])
+    summary = {
+        'schedule_id': generated_schedule.id,
+        'scheduled': scheduled,
+        'unscheduled': unscheduled,
+        'team_events': team_events,
+    }
+    return _pack(events), _pack(summary)
+
+
+def store_snapshot(generated_schedule):
+    """Render and save the snapshot columns of a GeneratedSchedule"""
+    events_blob, summary_blob = render_snapshot(generated_schedule)
+    generated_schedule.events_snapshot = events_blob
+    generated_schedule.summary_snapshot = summary_blob
+    generated_schedule.save(update_fields=['events_snapshot', 'summary_snapshot'])
+    logger.info(
+        f"🗜️ Stored calendar snapshot for schedule {generated_schedule.id} "
+        f"({len(events_blob)} + {len(summary_blob)} bytes compressed)"
+    )
+    return generated_schedule
+
+
+def events_blob(generated_schedule):
+    """Compressed division events, rendering the snapshot first for schedules saved before snapshots existed"""
+    if generated_schedule.events_snapshot is None:
+        store_snapshot(generated_schedule)
+    return bytes(generated_schedule.events_snapshot)
+
+
+def load_events(generated_schedule):
+    """Division events as a list of FullCalendar event dicts"""
+    return _unpack(events_blob(generated_schedule))
+
+
+def load_summary(generated_schedule):
+    """Scheduled/unscheduled summary and per-team event lists"""
+    if generated_schedule.summary_snapshot is None:
+        store_snapshot(generated_schedule)
+    return _unpack(generated_schedule.summary_snapshot)
+
+
+def events_in_window(events, start=None, end=None):
+    """Filter pre-rendered events to the visible window (ISO strings compare as dates)"""
+    if start:
+        # A two-day series starting the day before the window still shows in it
+        first = (start - timedelta(days=1)).isoformat()
+        events = [event for event in events if event['start'] >= first]
+    if end:
+        last = end.isoformat()
+        events = [event for event in events if event['start'] < last]
+    return events
+
+
+def pack_events(events):
+    """Compress an event list for a gzip-encoded response"""
+    return _pack(events)
+
+
+def snapshot_etag(schedule_id, *parts):
+    """
+    Strong ETag for a snapshot; schedules are immutable so the id identifies the content. parts
+    name the window, team and content coding, which each select a different representation.
+    """
+    suffix = ''.join(f"-{part}" for part in parts if part is not None)
+    return f'"schedule-{schedule_id}{suffix}"'
@@ -0,0 +1,109 @@
+"""
+Schedule version history.
+
+Regenerating a division no longer deletes its schedule. A new
+GeneratedSchedule version is created that stores only the matches that
+were added or moved; matches that disappeared are marked ``retired_in``
+the new version and unchanged matches are carried over untouched. Write
+volume therefore follows the amount of change, not the schedule size.
+"""
+from collections import Counter, defaultdict
+
+
+def match_key(match):
+    """Identity of a match's content; equal keys mean the match is unchanged between versions"""
+    return (
+        match.home_team_id,
+        match.away_team_id,
+        match.match_type,
+        match.status,
+        tuple(match.dates or ()),
+        match.conflict_reason or '',
+    )
+
+
+def diff_matches(current, proposed):
+    """
+    Compare the live matches of the current version with a proposed list of unsaved matches.
+    Returns (retired, added): existing rows to retire and proposed rows to insert.
+    """
+    remaining = Counter(match_key(match) for match in proposed)
+    retired = []
+    for match in current:
+        key = match_key(match)
+        if remaining[key]:
+            remaining[key] -= 1  # Unchanged, carried over
+        else:
+            retired.append(match)
+
+    added = []
+    for match in proposed:
+        key = match_key(match)
+        if remaining[key]:
+            remaining[key] -= 1
+            added.append(match)
+    return retired, added
+
+
+def count_moved(retired, added):
+    """Number of fixtures (home, away) that were retired and re-added, i.e. moved or rescheduled"""
+    retired_pairs = Counter((m.home_team_id, m.away_team_id) for m in retired)
+    added_pairs = Counter((m.home_team_id, m.away_team_id) for m in added)
+    return sum((retired_pairs & added_pairs).values())
+
+
+def _describe(match):
+    return {
+        'id': match.id,
+        'home_team': match.home_team.name,
+        'away_team': match.away_team.name,
+        'dates': list(match.dates or ()),
+        'status': match.status,
+        'type': match.match_type,
+    }
+
+
+def schedule_changes(schedule, since_version):
+    """
+    What changed in a division between ``since_version`` and ``schedule``.
+    Two indexed queries: rows introduced after N that are still live, and rows
+    live at N that were retired since.
+    """
+    from users.models import ScheduleMatch
+
+    added = list(
+        schedule.schedule_matches()
+        .filter(generated_schedule__version__gt=since_version)
+        .select_related('home_team', 'away_team')
+    )
+    removed = list(
+        ScheduleMatch.objects.filter(
+            generated_schedule__division_id=schedule.division_id,
+            generated_schedule__version__lte=since_version,
+            retired_in__version__gt=since_version,
+            retired_in__version__lte=schedule.version,
+        ).select_related('home_team', 'away_team')
+    )
+
+    # Pair retired and added rows for the same fixture into moves
+    added_by_pair = defaultdict(list)
+    for match in added:
+        added_by_pair[(match.home_team_id, match.away_team_id)].append(match)
+
+    moved = []
+    still_removed = []
+    for match in removed:
+        candidates = added_by_pair.get((match.home_team_id, match.away_team_id))
+        if candidates:
+            new = candidates.pop(0)
+            moved.append({'from': _describe(match), 'to': _describe(new)})
+        else:
+            still_removed.append(match)
+
+    return {
+        'from_version': since_version,
+        'to_version': schedule.version,
+        'added': [_describe(match) for matches in added_by_pair.values() for match in matches],
+        'removed': [_describe(match) for match in still_removed],
+        'moved': moved,
+    }
@@ -0,0 +1,41 @@
+"""
+Email recipients for team notifications.
+
+Resolves team_id -> set of email addresses for any number of teams (a
+whole division) in a single query: a UNION over the Team.admins and
+Team.members join tables, so notifications never walk each team's
+relations.
+"""
+from collections import defaultdict
+
+# Team roles that can receive notifications (Team many-to-many fields to User)
+ROLES = ('admins', 'members')
+
+
+def team_recipients(team_ids, roles=ROLES):
+    """
+    Map each team to the email addresses of its users in the given roles.
+    team_ids may be a list or a queryset of ids (it becomes a subquery). Teams without
+    recipients are absent from the result.
+    """
+    from users.models import Team
+
+    unknown = set(roles) - set(ROLES)
+    if unknown:
+        raise ValueError(f"Unknown team roles: {', '.join(sorted(unknown))}")
+
+    queries = [
+        Team._meta.get_field(role).remote_field.through.objects
+        .filter(team_id__in=team_ids)
+        .exclude(user__email='')
+        .values_list('team_id', 'user__email')
+        for role in roles
+    ]
+    # UNION (not UNION ALL) drops a user who is both admin and member of the same team
+    rows = queries[0].union(*queries[1:]) if len(queries) > 1 else queries[0]
+
+    recipients = defaultdict(set)
+    for team_id, email in rows:
+        recipients[team_id].add(email)
+    return recipients
+
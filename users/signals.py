@@ -0,0 +1,94 @@
+import threading
+from contextlib import contextmanager
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from .models import Team, TeamDate, TeamAvailabilityRule, TeamAvailabilityMask, Club, Association
+from .services.permissions import bump_roles_version, team_user_ids
+
+_state = threading.local()
+
+
+@contextmanager
+def suspend_mask_refresh():
+    """Skip per-row mask refreshes; the caller rebuilds the mask once when done"""
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def mask_refresh_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+@receiver(post_save, sender=TeamDate)
+@receiver(post_delete, sender=TeamDate)
+@receiver(post_save, sender=TeamAvailabilityRule)
+@receiver(post_delete, sender=TeamAvailabilityRule)
+def refresh_availability_mask(sender, instance, **kwargs):
+    """Keep the team's availability bitmask in step with its TeamDate rows and rules"""
+    if mask_refresh_suspended():
+        return
+    origin = kwargs.get('origin')
+    if origin is not None:
+        origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+        if origin_model is not sender:
+            return  # Cascade from deleting the team, club or association
+    try:
+        team = Team.objects.get(id=instance.team_id)
+    except Team.DoesNotExist:
+        return  # Team is being deleted along with its dates
+    TeamAvailabilityMask.refresh_for_team(team)
+
+
+@receiver(post_save, sender=Club)
+def move_teams_with_club(sender, instance, created, **kwargs):
+    """A club moved to another association takes its teams into that association's divisions"""
+    if created:
+        return
+    for team in instance.teams.exclude(division__association_id=instance.association_id):
+        team.save(update_fields=['division'])
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+@receiver(post_save, sender=Association)
+@receiver(post_delete, sender=Association)
+def invalidate_all_roles(sender, **kwargs):
+    """Club and association names and structure appear in many users' navigation"""
+    bump_roles_version()
+
+
+@receiver(post_save, sender=Team)
+@receiver(pre_delete, sender=Team)
+def invalidate_team_roles(sender, instance, **kwargs):
+    """A team's name and division only appear in the navigation of the users related to it"""
+    origin = kwargs.get('origin')
+    if origin is not None:
+        origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+        if origin_model is not sender:
+            return  # Cascade from deleting the club or association, which bumps everyone
+    bump_roles_version(team_user_ids(instance))
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+@receiver(m2m_changed, sender=Team.admins.through)
+@receiver(m2m_changed, sender=Club.admins.through)
+@receiver(m2m_changed, sender=Club.members.through)
+@receiver(m2m_changed, sender=Association.admins.through)
+def invalidate_member_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    """A membership or admin change only affects the users added or removed"""
+    if reverse:
+        # Changed from the user's side, e.g. user.teams.add(team)
+        user_ids = [instance.pk] if action in ('post_add', 'post_remove', 'post_clear') else []
+    elif action in ('post_add', 'post_remove'):
+        user_ids = pk_set
+    elif action == 'pre_clear':
+        # pk_set is empty for a clear, so collect the users before their rows go
+        user_ids = sender.objects.filter(**{instance._meta.model_name: instance}).values_list('user_id', flat=True)
+    else:
+        user_ids = []
+    bump_roles_version(user_ids)
@@ -0,0 +1,304 @@
+"""
+Regression tests: per-view query counts, notification digests, availability
+permissions, scheduler signalling and division leases.
+
+Every major view is rendered against a small and a large seeded
+association; the number of queries must be the same for both, so a
+per-team, per-club or per-division query loop fails here before it
+reaches production. Run with: python manage.py test users
+"""
+import json
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from users.models import (
+    Association, BackgroundJob, Club, Division, DivisionLog, DivisionSchedulingState, OutboundEmail,
+    SchedulingNotification, Team, TeamDate, User,
+)
+from users.services import background_scheduler, job_handlers, job_queue, notification_digest
+from users.services.schedule_persistence import save_generated_schedule
+
+SMALL = 3
+LARGE = 9
+
+AGE_GROUP, TIER, SEASON = '12U', 'A', '2024-2025'
+
+# Further divisions in the large association, with two teams each
+EXTRA_DIVISIONS = [('14U', 'A'), ('14U', 'B'), ('16U', 'AA')]
+
+SEASON_START = date(2024, 10, 5)  # A Saturday
+
+
+def seed_association(name, team_count, extra_divisions=()):
+    """
+    An association with team_count teams (each in its own club) in the 12U A division, plus two
+    teams in each extra division; availability, a generated 12U A schedule and some division log
+    entries. Administered by a fresh user, who is returned with the association and 12U A teams.
+    """
+    admin = User.objects.create_user(username=f'{name}-admin', email=f'{name}@example.com', password='pw')
+    association = Association.objects.create(name=name)
+    association.admins.add(admin)
+
+    teams = []
+    for index in range(team_count):
+        club = Club.objects.create(name=f'{name} Club {index}', association=association)
+        club.add_admin(admin)
+        team = Team.objects.create(name=f'{name} Team {index}', club=club, age_group=AGE_GROUP, tier=TIER, season=SEASON)
+        team.admins.add(admin)
+        team.members.add(admin, User.objects.create_user(
+            username=f'{name}-player-{index}', email=f'{name}-player-{index}@example.com', password='pw',
+        ))
+        teams.append(team)
+    for age_group, tier in extra_divisions:
+        for index in range(2):
+            club = Club.objects.create(name=f'{name} {age_group} {tier} Club {index}', association=association)
+            club.add_admin(admin)
+            team = Team.objects.create(
+                name=f'{name} {age_group} {tier} Team {index}', club=club, age_group=age_group, tier=tier, season=SEASON,
+            )
+            team.admins.add(admin)
+            team.members.add(admin)
+
+    dates = []
+    for team in teams:
+        for week in range(team_count):
+            saturday = SEASON_START + timedelta(weeks=week)
+            is_home = (week + team.id) % 2 == 0
+            dates += [
+                TeamDate(team=team, date=saturday, is_home=is_home),
+                TeamDate(team=team, date=saturday + timedelta(days=1), is_home=is_home),
+            ]
+    TeamDate.objects.bulk_create(dates)
+
+    schedule = []
+    for week, (home, away) in enumerate((home, away) for home in teams for away in teams if home != away):
+        saturday = SEASON_START + timedelta(weeks=week % team_count)
+        schedule.append({'home_team': home, 'away_team': away, 'dates': [saturday, saturday + timedelta(days=1)]})
+    save_generated_schedule(AGE_GROUP, TIER, SEASON, association, schedule[1:], [
+        {'home_team': schedule[0]['home_team'], 'away_team': schedule[0]['away_team'], 'reason': 'No dates'},
+    ], generated_by=admin)
+
+    for team in teams:
+        DivisionLog.log_team_change(AGE_GROUP, TIER, SEASON, association, 'modified', team, admin)
+    return admin, association, teams
+
+
+def division_args(association):
+    return [AGE_GROUP, TIER, SEASON, association.id]
+
+
+class ViewQueryCountTests(TestCase):
+    """Views must run the same number of queries for 3 teams in one division as for 9 teams and more divisions"""
+
+    # Each entry: (url name, function of (association, team) -> reverse() args)
+    VIEWS = [
+        ('user_home', lambda association, team: []),
+        ('team_profile', lambda association, team: [team.id]),
+        ('team_page', lambda association, team: [team.id]),
+        ('team_calendar', lambda association, team: [team.id]),
+        ('team_events', lambda association, team: [team.id]),
+        ('clubs_list', lambda association, team: [association.id]),
+        ('association_divisions', lambda association, team: [association.id]),
+        ('association_games', lambda association, team: [association.id]),
+        ('division_schedule', lambda association, team: division_args(association)),
+        ('division_calendar', lambda association, team: division_args(association)),
+        ('division_events', lambda association, team: division_args(association)),
+        ('division_schedule_changes', lambda association, team: division_args(association)),
+        ('division_page', lambda association, team: division_args(association)),
+        ('division_teams', lambda association, team: division_args(association)),
+        ('division_logs', lambda association, team: division_args(association)),
+        ('division_log_entries', lambda association, team: division_args(association)),
+        ('export_division_schedule', lambda association, team: division_args(association) + ['csv']),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = seed_association('small', SMALL)
+        cls.large = seed_association('large', LARGE, EXTRA_DIVISIONS)
+
+    def count_queries(self, seeded, url_name, args):
+        admin, association, teams = seeded
+        self.client.force_login(admin)
+        url = reverse(url_name, args=args(association, teams[0]))
+        # The first visit creates per-division rows (scheduling state, feed token, log entries)
+        response = self.client.get(url)
+        self.assertLess(response.status_code, 400, f"{url_name}: {response.status_code}")
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_teams(self):
+        for url_name, args in self.VIEWS:
+            with self.subTest(view=url_name):
+                small = self.count_queries(self.small, url_name, args)
+                large = self.count_queries(self.large, url_name, args)
+                self.assertEqual(
+                    small, large,
+                    f"{url_name} ran {small} queries for {SMALL} teams but {large} for {LARGE}",
+                )
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET={'queries': 5, 'duplicates': 0, 'sql_ms': 10_000})
+class QueryBudgetMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.association, cls.teams = seed_association('budget', SMALL)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_reports_query_counts_in_headers(self):
+        response = self.client.get(reverse('division_teams', args=division_args(self.association)))
+        self.assertGreater(int(response['X-Query-Count']), 0)
+        self.assertIn('X-Query-Duplicates', response)
+        self.assertIn('X-Query-Time-Ms', response)
+
+    def test_warns_over_budget(self):
+        with self.assertLogs('users.middleware', level='WARNING') as logs:
+            self.client.get(reverse('division_page', args=division_args(self.association)))
+        self.assertIn('over query budget', logs.output[0])
+
+    @override_settings(QUERY_BUDGET_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('division_page', args=division_args(self.association)))
+        self.assertNotIn('X-Query-Count', response)
+
+
+class NotificationDigestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.association, cls.teams = seed_association('digest', SMALL)
+        cls.state = DivisionSchedulingState.for_division(Division.lookup(AGE_GROUP, TIER, SEASON, cls.association.id))
+
+    def test_admin_without_email_does_not_hide_the_team(self):
+        """A blank-email co-admin must not drop the team's digest for its other admins"""
+        team = self.teams[0]
+        team.admins.add(User.objects.create_user(username='no-email', email='', password='pw'))
+        notification_digest.notify(self.state, 'schedule_conflict', [(team, 'Home series missing')])
+
+        notification_digest.send_digests()
+
+        self.assertEqual(list(OutboundEmail.objects.values_list('recipients', flat=True)), [[self.admin.email]])
+        self.assertFalse(SchedulingNotification.objects.filter(email_pending=True).exists())
+
+
+class AvailabilityPermissionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.association, cls.teams = seed_association('availability', SMALL)
+        cls.outsider = User.objects.create_user(username='outsider', email='outsider@example.com', password='pw')
+
+    def test_batch_rejects_users_outside_the_team(self):
+        team = self.teams[0]
+        before = list(TeamDate.objects.filter(team=team).values_list('date', 'is_home'))
+        self.client.force_login(self.outsider)
+        response = self.client.post(
+            reverse('save_team_dates_batch', args=[team.id]),
+            {'operations': [
+                {'op': 'set', 'date': '2025-01-04', 'is_home': True},
+                {'op': 'delete', 'date': before[0][0].isoformat()},
+            ]},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(list(TeamDate.objects.filter(team=team).values_list('date', 'is_home')), before)
+
+    def test_batch_allows_team_members(self):
+        team = self.teams[0]
+        member = team.members.exclude(id=self.admin.id).get()
+        self.client.force_login(member)
+        response = self.client.post(
+            reverse('save_team_dates_batch', args=[team.id]),
+            {'operations': [{'op': 'set', 'date': '2025-01-04', 'is_home': True}]},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(TeamDate.objects.filter(team=team, date=date(2025, 1, 4)).exists())
+
+
+class DeadlineNotificationTests(TransactionTestCase):
+    """Deadline changes made in another process must reach a running scheduler without waiting for the resync"""
+
+    def test_notify_wakes_scheduler_listening_in_another_process(self):
+        scheduler = background_scheduler.BackgroundScheduler(worker_id='listener-test')
+        scheduler.running = True
+        scheduler._start_listener()
+        try:
+            # The listener requests a rebuild once it is listening
+            self.assertTrue(scheduler._rebuild_requested.wait(10))
+            scheduler._rebuild_requested.clear()
+
+            # scheduler is not this process's global scheduler, so only the NOTIFY can reach it
+            background_scheduler.notify_deadlines_changed()
+            self.assertTrue(scheduler._rebuild_requested.wait(10))
+        finally:
+            scheduler.running = False
+            scheduler._listener.join(background_scheduler.LISTEN_POLL_SECONDS + 5)
+
+
+class DivisionLeaseTests(TestCase):
+    """A deadline check and a schedule generation for one division hold separate leases"""
+
+    def test_scheduler_tick_during_generation(self):
+        admin, association, teams = seed_association('lease', 2)
+        state = DivisionSchedulingState.for_division(teams[0].division)
+        DivisionSchedulingState.objects.filter(id=state.id).update(
+            status='waiting', auto_schedule_enabled=True, availability_deadline=timezone.now() - timedelta(minutes=1),
+        )
+        state.refresh_from_db()
+        job, created = job_queue.enqueue_generation('generate_schedule', state, {'division_state_id': state.id})
+        BackgroundJob.objects.filter(id=job.id).update(status='running', locked_by='worker-1')
+        job.refresh_from_db()
+
+        with job_handlers._division_lease(job, state.id):
+            scheduler = background_scheduler.BackgroundScheduler(worker_id='scheduler-1')
+            scheduler._check_deadlines([state.id])
+
+            # The tick ran (and coalesced onto the running job) instead of finding the division leased
+            self.assertIn(state.id, scheduler._deadlines)
+            self.assertEqual(BackgroundJob.objects.filter(division_state=state).count(), 1)
+            state.refresh_from_db()
+            self.assertEqual(state.lease_owner, '')
+            self.assertEqual(state.generation_lease_owner, f"job:{job.id}:worker-1")
+            self.assertGreater(state.generation_lease_expires_at, timezone.now() + timedelta(minutes=30))
+            self.assertFalse(DivisionSchedulingState.acquire_lease(state.id, 'job:0:worker-2', 60, 'generation'))
+
+        state.refresh_from_db()
+        self.assertEqual((state.generation_lease_owner, state.generation_lease_expires_at), ('', None))
+
+
+class DivisionEventsEncodingTests(TestCase):
+    """The stored gzip snapshot is only sent to clients whose Accept-Encoding allows gzip"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.association, cls.teams = seed_association('encoding', SMALL)
+
+    def get(self, accept_encoding):
+        self.client.force_login(self.admin)
+        return self.client.get(
+            reverse('division_events', args=division_args(self.association)), HTTP_ACCEPT_ENCODING=accept_encoding,
+        )
+
+    def test_accept_encoding_q_values(self):
+        for accept_encoding, gzipped in [
+            ('gzip, deflate, br', True),
+            ('br;q=1.0, gzip;q=0.5', True),
+            ('*', True),
+            ('gzip;q=0', False),
+            ('gzip;q=0.0, deflate', False),
+            ('*;q=0.5, gzip;q=0', False),
+            ('identity', False),
+            ('', False),
+        ]:
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.get(accept_encoding)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get('Content-Encoding') == 'gzip', gzipped)
+                if not gzipped:
+                    self.assertIsInstance(json.loads(response.content), list)
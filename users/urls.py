@@ -34,16 +34,30 @@ urlpatterns = [
     path('club/<int:club_id>/delete/', views.delete_club, name='delete_club'),
     path('association/<int:association_id>/edit/', views.edit_association, name='edit_association'),    path('association/<int:association_id>/delete/', views.delete_association, name='delete_association'),
     path('team/<int:team_id>/save-dates/', views.save_team_dates, name='save_team_dates'),
+    path('team/<int:team_id>/events/', views.team_events, name='team_events'),
+    path('team/<int:team_id>/save-dates/batch/', views.save_team_dates_batch, name='save_team_dates_batch'),
+    path('team/<int:team_id>/availability-rules/', views.save_availability_rule, name='save_availability_rule'),
+    path('team/<int:team_id>/availability-rules/<int:rule_id>/delete/', views.delete_availability_rule, name='delete_availability_rule'),
     path('association/<int:association_id>/clubs/', views.clubs_list, name='clubs_list'),
     path('association/<int:association_id>/divisions/', views.association_divisions, name='association_divisions'),
+    path('association/<int:association_id>/games/', views.association_games, name='association_games'),
+    path('association/<int:association_id>/export.<str:export_format>', views.export_association_schedule, name='export_association_schedule'),
     path('division-schedule/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/', 
         views.generate_division_schedule, 
         name='division_schedule'),
     path('generate-schedule/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/', views.generate_schedule_service, name='generate_schedule_service'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
+    path('jobs/<int:job_id>/progress/', views.job_progress_stream, name='job_progress'),
     path('send-unscheduled-notifications/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/', views.send_unscheduled_notifications, name='send_unscheduled_notifications'),
     path('send-availability-notifications/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/', views.send_availability_notifications, name='send_availability_notifications'),
     path('division-calendar/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/', views.division_calendar, name='division_calendar'),
+    path('division-calendar/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/events/', views.division_events, name='division_events'),
+    path('calendar/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
+    path('division-schedule/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/changes/', views.division_schedule_changes, name='division_schedule_changes'),
+    path('division-schedule/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/export.<str:export_format>', views.export_division_schedule, name='export_division_schedule'),
+    path('team/<int:team_id>/export.<str:export_format>', views.export_team_schedule, name='export_team_schedule'),
     path('division/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/', views.division_page, name='division_page'),
     path('division/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/teams/', views.division_teams, name='division_teams'),
     path('division/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/logs/', views.division_logs, name='division_logs'),
+    path('division/<str:age_group>/<str:tier>/<str:season>/<int:association_id>/logs/entries/', views.division_log_entries, name='division_log_entries'),
 ]
\ No newline at end of file
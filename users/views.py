@@ -2,11 +2,13 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, authenticate
 from django.contrib import messages
-from django.views.decorators.http import require_http_methods  # Add this line
+from django.views.decorators.http import require_http_methods, condition  # Add this line
+from django.views.decorators.gzip import gzip_page
 from django.utils import timezone  # Add timezone import
-from django.db import IntegrityError  # Add IntegrityError import
+from django.db import IntegrityError, transaction  # Add IntegrityError import
+from django.db.models import Count
 import json  # Add json import
-from .models import User, Team, Club, Association, Schedule, TeamInvite, TeamDate, DivisionSchedulingState, ScheduleProposal, DivisionLog
+from .models import User, Team, Club, Association, Division, Schedule, TeamInvite, TeamDate, TeamAvailabilityRule, TeamAvailabilityMask, DivisionSchedulingState, ScheduleProposal, DivisionLog, CalendarFeedToken
 from .forms import (
     CustomUserCreationForm, TeamForm, ScheduleForm, 
     ClubForm, AssociationForm, SimpleRegistrationForm,
@@ -16,12 +18,25 @@ from django.core.mail import send_mail  # At the top if you want to send real em
 from django.contrib.admin.views.decorators import staff_member_required
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
+import gzip
 import json
 from datetime import datetime
 from users.services.schedule_orchestration import SchedulingOrchestrationService
 from users.services.schedule_service import DivisionScheduler
+from users.services.background_scheduler import notify_deadlines_changed
+from users.services.recurring_availability import (
+    team_availability, division_availability, build_recurrence, exclude_date
+)
+from users.services.availability_batch import apply_availability_operations
+from users.services.team_recipients import team_recipients
+from users.services.permissions import can_admin, can_view_division, can_view_team, is_member, roles_for
+from users.services.schedule_versions import schedule_changes
+from users.services import calendar_feeds, schedule_snapshot, match_dates, ical_feeds, schedule_exports, job_queue, job_progress, division_log_feed
 from django.utils.dateformat import format as date_format
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
 
 def register(request):
     if request.method == 'POST':
@@ -53,21 +68,13 @@ def user_home(request):
     tiers = Team._meta.get_field('tier').choices
     
     # Get all divisions (age_group + tier + season combinations) for associations the user manages
-    divisions = []
-    if request.user.admin_associations.exists():
-        # Get unique combinations of age_group, tier, season for each association the user manages
-        for association in request.user.admin_associations.all():
-            division_combinations = Team.objects.filter(club__association=association).values(
-                'age_group', 'tier', 'season'
-            ).distinct().order_by('age_group', 'tier', 'season')
-            
-            for combo in division_combinations:
-                divisions.append({
-                    'association': association,
-                    'age_group': combo['age_group'],
-                    'tier': combo['tier'],
-                    'season': combo['season']
-                })
+    # Divisions with teams in them, across every association the user manages
+    divisions = (
+        Division.objects.filter(association__admins=request.user, teams__isnull=False)
+        .select_related('association')
+        .distinct()
+        .order_by('association_id', 'age_group', 'tier', 'season')
+    )
       # Get clubs the user administers
     admin_clubs = request.user.admin_clubs.all()
     
@@ -213,7 +220,7 @@ def team_profile(request, team_id=None):
 def create_schedule(request, team_id):
     team = get_object_or_404(Team, id=team_id)
     # Ensure the user is a member of the team
-    if request.user not in team.members.all():
+    if not is_member(request.user, team):
         messages.error(request, "You do not have permission to create a schedule for this team.")
         return redirect('home')
     
@@ -298,31 +305,18 @@ def team_calendar(request, team_id):
     
     # Get the division scheduling state for this team's division
     try:
-        division_state = DivisionSchedulingState.objects.get(
-            age_group=team.age_group,
-            tier=team.tier,
-            season=team.season,
-            association=team.club.association
-        )
+        division_state = DivisionSchedulingState.objects.get(division_id=team.division_id)
         availability_deadline = division_state.availability_deadline
         # Convert to Pacific Time for display
         availability_deadline_local = timezone.localtime(availability_deadline) if availability_deadline else None
     except DivisionSchedulingState.DoesNotExist:
         availability_deadline_local = None
     
-    # Get existing dates
-    team_dates = TeamDate.objects.filter(team=team)
-    team_dates_json = [
-        {
-            'title': 'Home Game' if date.is_home else 'Away Game',
-            'start': date.date.strftime('%Y-%m-%d'),
-            'allDay': True,
-            'color': '#0d6efd' if date.is_home else '#ffb366',
-            'allow_doubleheader': date.allow_doubleheader
-        } for date in team_dates
-    ]
+    # Get existing dates (explicit dates plus expanded recurring rules);
+    # the calendar itself loads events from the windowed team_events feed
+    team_dates = team_availability(team)
       # Calculate division requirements and availability
-    division_teams = Team.objects.filter(age_group=team.age_group, tier=team.tier)
+    division_teams = Team.objects.filter(division_id=team.division_id)
     total_teams = division_teams.count()
     required_series = total_teams - 1  # Each team needs (N-1) home and (N-1) away series
       # Helper function to count weekend series from dates
@@ -363,7 +357,6 @@ def team_calendar(request, team_id):
     
     context = {
         'team': team,
-        'team_dates_json': json.dumps(team_dates_json),
         'required_series': required_series,
         'available_home_series': available_home_series,
         'available_away_series': available_away_series,
@@ -371,14 +364,29 @@ def team_calendar(request, team_id):
         'away_series_needed': away_series_needed,
         'total_teams': total_teams,
         'availability_notifications': availability_notifications,
-        'availability_deadline': availability_deadline_local
+        'availability_deadline': availability_deadline_local,
+        'availability_rules': TeamAvailabilityRule.objects.filter(team=team),
+        'weekday_choices': [(0, 'Mon'), (1, 'Tue'), (2, 'Wed'), (3, 'Thu'), (4, 'Fri'), (5, 'Sat'), (6, 'Sun')],
     }
     return render(request, 'users/team_calendar.html', context)
 
+def _availability_forbidden(request, team):
+    """A 403 response unless the user administers or belongs to the team, else None"""
+    roles = roles_for(request.user)
+    if roles.can_admin(team) or roles.is_member(team):
+        return None
+    return JsonResponse(
+        {'success': False, 'error': "You must be a member or admin of this team to change its availability"},
+        status=403,
+    )
+
 @login_required
 @require_http_methods(["POST"])
 def save_team_dates(request, team_id):
     team = get_object_or_404(Team, id=team_id)
+    forbidden = _availability_forbidden(request, team)
+    if forbidden:
+        return forbidden
     data = json.loads(request.body)
     date_str = data.get('date')
     is_home = data.get('is_home')
@@ -389,8 +397,9 @@ def save_team_dates(request, team_id):
         action_description = ""
         
         if is_home is None:
-            # Delete the date
+            # Delete the date, and exclude it from any recurring rule that produces it
             TeamDate.objects.filter(team=team, date=date_obj).delete()
+            exclude_date(team, date_obj)
             action_description = f"Removed availability for {date_str}"
         else:
             # Create or update the date, including allow_doubleheader
@@ -407,7 +416,7 @@ def save_team_dates(request, team_id):
                 action_description = f"Updated {home_away} availability for {date_str}{dh_text}"
         
         # Log availability update
-        DivisionLog.objects.create(
+        DivisionLog.record(
             age_group=team.age_group,
             tier=team.tier,
             season=team.season,
@@ -428,10 +437,146 @@ def save_team_dates(request, team_id):
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
+@login_required
+@require_http_methods(["POST"])
+def save_team_dates_batch(request, team_id):
+    """Apply a batch of availability operations (set, doubleheader, delete, copy) in one transaction"""
+    team = get_object_or_404(Team, id=team_id)
+    forbidden = _availability_forbidden(request, team)
+    if forbidden:
+        return forbidden
+    
+    try:
+        data = json.loads(request.body)
+        operations = data.get('operations', [])
+        if not operations:
+            return JsonResponse({'success': True, 'operations': 0})
+        summary = apply_availability_operations(team, operations, request.user)
+        return JsonResponse({'success': True, **summary})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+
+def _team_events_etag(request, team):
+    mask = TeamAvailabilityMask.objects.filter(team_id=team.id).only('updated_at').first()
+    if mask is None:
+        return None
+    start, end = calendar_feeds.parse_window(request.GET.get('start'), request.GET.get('end'))
+    return f"team-{team.id}-{mask.updated_at.timestamp()}-{start}-{end}"
+
+def _team_events_last_modified(request, team):
+    mask = TeamAvailabilityMask.objects.filter(team_id=team.id).only('updated_at').first()
+    return mask.updated_at if mask else None
+
+@login_required
+def team_events(request, team_id):
+    """Availability events for the visible calendar window (FullCalendar start/end params)"""
+    team = get_object_or_404(Team.objects.select_related('club'), id=team_id)
+    # Checked before the conditional GET so outsiders never get a 304 either
+    if not can_view_team(request.user, team):
+        return JsonResponse({'success': False, 'error': "You must belong to this team to view its availability"}, status=403)
+    return _team_events_response(request, team)
+
+@gzip_page
+@condition(etag_func=_team_events_etag, last_modified_func=_team_events_last_modified)
+def _team_events_response(request, team):
+    start, end = calendar_feeds.parse_window(request.GET.get('start'), request.GET.get('end'))
+    events = calendar_feeds.availability_events(team_availability(team, start, end))
+    return JsonResponse(events, safe=False, json_dumps_params=calendar_feeds.COMPACT_JSON)
+
+@login_required
+@require_http_methods(["POST"])
+def save_availability_rule(request, team_id):
+    """Create a recurring availability rule, e.g. every Saturday and Sunday from October through February"""
+    team = get_object_or_404(Team, id=team_id)
+    forbidden = _availability_forbidden(request, team)
+    if forbidden:
+        return forbidden
+    
+    try:
+        data = json.loads(request.body)
+        start_date = datetime.strptime(data.get('start_date'), '%Y-%m-%d').date()
+        end_date = datetime.strptime(data.get('end_date'), '%Y-%m-%d').date()
+        weekdays = [int(day) for day in data.get('weekdays', [5, 6])]
+        exception_dates = [
+            datetime.strptime(date_str, '%Y-%m-%d').date()
+            for date_str in data.get('exception_dates', []) if date_str
+        ]
+        is_home = bool(data.get('is_home', True))
+        allow_doubleheader = bool(data.get('allow_doubleheader', False))
+        
+        if end_date < start_date:
+            raise ValueError("End date must be on or after start date")
+        if not weekdays:
+            raise ValueError("Select at least one weekday")
+        
+        rule = TeamAvailabilityRule.objects.create(
+            team=team,
+            recurrence=build_recurrence(weekdays, end_date, exception_dates),
+            start_date=start_date,
+            end_date=end_date,
+            is_home=is_home,
+            allow_doubleheader=allow_doubleheader,
+            created_by=request.user,
+        )
+        dates = rule.dates()
+        
+        home_away = "home" if is_home else "away"
+        DivisionLog.record(
+            age_group=team.age_group,
+            tier=team.tier,
+            season=team.season,
+            association=team.club.association,
+            log_type='availability_updated',
+            message=f"📅 {team.name}: Added recurring {home_away} availability {start_date} to {end_date} ({len(dates)} dates)",
+            user=request.user,
+            team=team,
+            metadata={
+                'rule_id': rule.id,
+                'weekdays': weekdays,
+                'exception_dates': [d.isoformat() for d in exception_dates],
+                'is_home': is_home,
+                'allow_doubleheader': allow_doubleheader,
+                'action': 'rule_created'
+            }
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'rule_id': rule.id,
+            'dates': [d.strftime('%Y-%m-%d') for d in dates],
+        })
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+
+@login_required
+@require_http_methods(["POST"])
+def delete_availability_rule(request, team_id, rule_id):
+    """Delete a recurring availability rule"""
+    team = get_object_or_404(Team, id=team_id)
+    forbidden = _availability_forbidden(request, team)
+    if forbidden:
+        return forbidden
+    rule = get_object_or_404(TeamAvailabilityRule, id=rule_id, team=team)
+    description = f"{rule.start_date} to {rule.end_date}"
+    rule.delete()
+    
+    DivisionLog.record(
+        age_group=team.age_group,
+        tier=team.tier,
+        season=team.season,
+        association=team.club.association,
+        log_type='availability_updated',
+        message=f"📅 {team.name}: Removed recurring availability {description}",
+        user=request.user,
+        team=team,
+        metadata={'rule_id': rule_id, 'action': 'rule_deleted'}
+    )
+    return JsonResponse({'success': True})
+
 @login_required
 def edit_team(request, team_id):
     team = get_object_or_404(Team, id=team_id)
-    if not (request.user.is_superuser or request.user in team.admins.all()):
+    if not can_admin(request.user, team):
         messages.error(request, "You do not have permission to edit this team.")
         return redirect('team_profile', team_id=team.id)
     if request.method == 'POST':
@@ -453,7 +598,7 @@ def edit_team(request, team_id):
 @login_required
 def invite_member(request, team_id):
     team = get_object_or_404(Team, id=team_id)
-    if request.user not in team.admins.all():
+    if not can_admin(request.user, team):
         messages.error(request, "You do not have permission to invite members.")
         return redirect('team_profile', team_id=team.id)
     if request.method == 'POST':
@@ -602,32 +747,19 @@ def team_page(request, team_id):
     
     # Get the division scheduling state for this team's division
     try:
-        division_state = DivisionSchedulingState.objects.get(
-            age_group=team.age_group,
-            tier=team.tier,
-            season=team.season,
-            association=team.club.association
-        )
+        division_state = DivisionSchedulingState.objects.get(division_id=team.division_id)
         availability_deadline = division_state.availability_deadline
         # Convert to Pacific Time for display
         availability_deadline_local = timezone.localtime(availability_deadline) if availability_deadline else None
     except DivisionSchedulingState.DoesNotExist:
         availability_deadline_local = None
     
-    # Get existing dates
-    team_dates = TeamDate.objects.filter(team=team)
-    team_dates_json = [
-        {
-            'title': 'Home Game' if date.is_home else 'Away Game',
-            'start': date.date.strftime('%Y-%m-%d'),
-            'allDay': True,
-            'color': '#0d6efd' if date.is_home else '#ffb366',
-            'allow_doubleheader': date.allow_doubleheader
-        } for date in team_dates
-    ]
+    # Get existing dates (explicit dates plus expanded recurring rules);
+    # the calendar itself loads events from the windowed team_events feed
+    team_dates = team_availability(team)
     
     # Calculate division requirements and availability
-    division_teams = Team.objects.filter(age_group=team.age_group, tier=team.tier)
+    division_teams = Team.objects.filter(division_id=team.division_id)
     total_teams = division_teams.count()
     required_series = total_teams - 1  # Each team needs (N-1) home and (N-1) away series
     
@@ -674,7 +806,6 @@ def team_page(request, team_id):
         'team': team,
         'members': team.members.all(),
         'admins': team.admins.all(),
-        'team_dates_json': json.dumps(team_dates_json),
         'required_series': required_series,
         'available_home_series': available_home_series,
         'available_away_series': available_away_series,
@@ -682,7 +813,8 @@ def team_page(request, team_id):
         'away_series_needed': away_series_needed,
         'total_teams': total_teams,
         'availability_notifications': availability_notifications,
-        'availability_deadline': availability_deadline_local
+        'availability_deadline': availability_deadline_local,
+        'calendar_feed_url': _webcal_url(request, CalendarFeedToken.for_team(team)),
     }
     return render(request, 'users/team_page.html', context)
 
@@ -692,7 +824,7 @@ def edit_club(request, club_id):
     club = get_object_or_404(Club, id=club_id)
     
     # Check if user has permission (superuser or club admin)
-    if not (request.user.is_superuser or request.user in club.admins.all()):
+    if not can_admin(request.user, club):
         messages.error(request, "You don't have permission to edit this club.")
         return redirect('home')
     
@@ -722,7 +854,7 @@ def delete_club(request, club_id):
     club = get_object_or_404(Club, id=club_id)
 
     # Check if user has permission or is a superuser
-    if not request.user.is_superuser and request.user not in club.admins.all():
+    if not can_admin(request.user, club):
         messages.error(request, "You don't have permission to delete this club.")
         return redirect('home')
 
@@ -740,7 +872,7 @@ def edit_association(request, association_id):
     association = get_object_or_404(Association, id=association_id)
     
     # Check if user has permission (superuser or association admin)
-    if not (request.user.is_superuser or request.user in association.admins.all()):
+    if not can_admin(request.user, association):
         messages.error(request, "You don't have permission to edit this association.")
         return redirect('home')
     
@@ -770,7 +902,7 @@ def delete_association(request, association_id):
     association = get_object_or_404(Association, id=association_id)
     
     # Check if user has permission
-    if request.user not in association.admins.all():
+    if not can_admin(request.user, association):
         messages.error(request, "You don't have permission to delete this association.")
         return redirect('home')
     
@@ -783,33 +915,32 @@ def delete_association(request, association_id):
     return render(request, 'users/delete_association.html', {'association': association})
 
 
+def _division_or_404(age_group, tier, season, association_id):
+    """The Division (with its association) named by a division URL"""
+    division = Division.lookup(age_group, tier, season, association_id)
+    if division is None:
+        raise Http404("Division not found")
+    return division
+
+
 @login_required
 def generate_division_schedule(request, age_group, tier, season, association_id):
-    # Get the association and validate access
-    try:
-        association = Association.objects.get(id=association_id)
-    except Association.DoesNotExist:
-        messages.error(request, "Association not found")
+    # Resolve the division and validate access
+    division = Division.lookup(age_group, tier, season, association_id)
+    if division is None:
+        messages.error(request, "Division not found")
         return redirect('home')
+    association = division.association
     
     # Check if user is an association admin
-    if request.user not in association.admins.all():
+    if not can_admin(request.user, association):
         messages.error(request, "You must be an association admin to access the division scheduler")
         return redirect('home')
     
     # Get or create the division scheduling state
-    from users.models import DivisionSchedulingState
     from django.utils import timezone
-    division_state, created = DivisionSchedulingState.objects.get_or_create(
-        age_group=age_group,
-        tier=tier,
-        season=season,
-        association=association,
-        defaults={
-            'availability_deadline': timezone.now() + timezone.timedelta(days=30),
-            'auto_schedule_enabled': True
-        }
-    )      # Handle deadline updates
+    division_state = DivisionSchedulingState.for_division(division)
+    # Handle deadline updates
     if request.method == 'POST' and 'update_deadline' in request.POST:
         deadline_str = request.POST.get('availability_deadline')
         auto_schedule = request.POST.get('auto_schedule_enabled') == 'on'
@@ -843,13 +974,8 @@ def generate_division_schedule(request, age_group, tier, season, association_id)
                 messages.error(request, f"Error scheduling deadline task: {str(e)}")
         
         return redirect('division_schedule', age_group=age_group, tier=tier, season=season, association_id=association_id)
-      # Get teams in this specific division (age_group + tier + season + association)
-    teams = Team.objects.filter(
-        age_group=age_group, 
-        tier=tier, 
-        season=season,
-        club__association=association
-    )
+    # Get teams in this specific division
+    teams = Team.objects.filter(division=division)
     
     if not teams.exists():
         messages.error(request, f"No teams found for {age_group} {tier} {season} division")
@@ -859,23 +985,16 @@ def generate_division_schedule(request, age_group, tier, season, association_id)
     scheduler = DivisionScheduler(age_group, tier, season, association)
     
     # Only get existing schedule proposals, don't generate new ones automatically
-    existing_proposals = ScheduleProposal.objects.filter(
-        home_team__age_group=age_group,
-        home_team__tier=tier,
-        home_team__season=season,
-        home_team__club__association=association    ).exists()
+    existing_proposals = ScheduleProposal.objects.filter(home_team__division=division).exists()
     
     # Load existing generated schedule if available
     from users.models import GeneratedSchedule, ScheduleMatch
     
     # Check for existing active schedule
     existing_schedule = GeneratedSchedule.objects.filter(
-        age_group=age_group,
-        tier=tier,
-        season=season,
-        association=association,
+        division=division,
         is_active=True
-    ).first()
+    ).defer('events_snapshot').first()
     
     schedule = []
     unscheduled_matches = []
@@ -886,39 +1005,10 @@ def generate_division_schedule(request, age_group, tier, season, association_id)
         generated_pacific = timezone.localtime(existing_schedule.generated_at)
         print(f"Schedule ID: {existing_schedule.id}, Generated: {generated_pacific} (Pacific)")
         
-        # Load scheduled matches
-        scheduled_matches = ScheduleMatch.objects.filter(
-            generated_schedule=existing_schedule,
-            status='scheduled'
-        ).select_related('home_team', 'away_team')
-        
-        for match in scheduled_matches:
-            # Convert date strings back to date objects for template compatibility
-            dates_as_dates = []
-            for date_str in match.dates:
-                from datetime import datetime
-                dates_as_dates.append(datetime.strptime(date_str, '%Y-%m-%d').date())
-            
-            schedule.append({
-                'home_team': match.home_team,
-                'away_team': match.away_team,
-                'dates': dates_as_dates,
-                'status': match.status,
-                'type': match.match_type
-            })
-        
-        # Load unscheduled matches
-        unscheduled_match_records = ScheduleMatch.objects.filter(
-            generated_schedule=existing_schedule,
-            status='unscheduled'
-        ).select_related('home_team', 'away_team')
-        
-        for match in unscheduled_match_records:
-            unscheduled_matches.append({
-                'home_team': match.home_team,
-                'away_team': match.away_team,
-                'reason': match.conflict_reason or 'Scheduling conflict'
-            })
+        # Scheduled and unscheduled matches come pre-rendered from the schedule snapshot
+        summary = schedule_snapshot.load_summary(existing_schedule)
+        schedule = summary['scheduled']
+        unscheduled_matches = summary['unscheduled']
     
     # If no existing schedule, initialize empty data structures
     
@@ -947,14 +1037,15 @@ def generate_division_schedule(request, age_group, tier, season, association_id)
         
         return series_count
     
+    availability = division_availability(teams)
     for team in teams:
         # Get home dates with doubleheader info
-        home_date_objects = TeamDate.objects.filter(team=team, is_home=True).values('date', 'allow_doubleheader')
-        away_date_objects = TeamDate.objects.filter(team=team, is_home=False).values('date', 'allow_doubleheader')
+        home_date_objects = [d for d in availability[team.id] if d.is_home]
+        away_date_objects = [d for d in availability[team.id] if not d.is_home]
         
         # Extract dates for counting weekend series
-        home_dates = [obj['date'] for obj in home_date_objects]
-        away_dates = [obj['date'] for obj in away_date_objects]
+        home_dates = [obj.date for obj in home_date_objects]
+        away_dates = [obj.date for obj in away_date_objects]
         
         # Calculate availability status using weekend series count
         available_home_series = count_weekend_series(home_dates)
@@ -980,6 +1071,9 @@ def generate_division_schedule(request, age_group, tier, season, association_id)
             f"Schedule generated with {len(unscheduled_matches)} conflicts that need resolution"
         )
     
+    # A generation job still in flight (e.g. the page was reloaded) is picked up by the page's polling
+    pending_job = job_queue.in_flight_generation(division_state)
+    
     return render(request, 'users/division_schedule.html', {
         'schedule': schedule,
         'unscheduled_matches': unscheduled_matches,
@@ -989,272 +1083,321 @@ def generate_division_schedule(request, age_group, tier, season, association_id)
         'association': association,
         'teams_with_availability': teams_with_availability,
         'division_state': division_state,  # Add deadline management context
+        'pending_job': pending_job,
     })
 
 @login_required
 @require_http_methods(["POST"])
 def generate_schedule_service(request, age_group, tier, season, association_id):
-    from users.models import GeneratedSchedule, ScheduleMatch, DivisionLog
+    """Queue schedule generation for a division; the page polls the returned job until it finishes"""
+    division = Division.lookup(age_group, tier, season, association_id)
+    if division is None:
+        return JsonResponse({'success': False, 'message': 'Division not found'}, status=404)
+    association = division.association
     
-    try:
-        # Get the association and validate access
-        try:
-            association = Association.objects.get(id=association_id)
-        except Association.DoesNotExist:
-            raise Exception("Association not found")
-        
-        # Check if user is an association admin
-        if request.user not in association.admins.all():
-            raise Exception("You must be an association admin to generate schedules")
-        
-        # Log schedule generation start
-        DivisionLog.log_schedule_generation(
-            age_group, tier, season, association,
-            'started', request.user
-        )        # Delete any existing schedule and its matches - use a transaction for consistency
-        from django.db import transaction
-        
-        with transaction.atomic():
-            # Delete all existing schedules and their matches
-            existing_schedules = GeneratedSchedule.objects.filter(
-                age_group=age_group,
-                tier=tier,
-                season=season,
-                association=association
-            )
-            
-            print(f"=== FOUND {existing_schedules.count()} EXISTING SCHEDULES TO DELETE ===")
-            for i, schedule in enumerate(existing_schedules, 1):
-                match_count = ScheduleMatch.objects.filter(generated_schedule=schedule).count()
-                print(f"  Deleting schedule {i} (ID: {schedule.id}) with {match_count} matches")
-                ScheduleMatch.objects.filter(generated_schedule=schedule).delete()
-            existing_schedules.delete()
-            print("=== EXISTING SCHEDULES DELETED ===")
-        print("=== CALLING DIVISION_SCHEDULER.CREATE_SCHEDULE ===")
-        scheduler = DivisionScheduler(age_group, tier, season, association)
-        schedule, unscheduled_matches = scheduler.create_schedule()
-        print(f"Schedule returned: {len(schedule)} matches, {len(unscheduled_matches)} unscheduled")
-        
-        print("=== SAVING GENERATED SCHEDULE TO DATABASE ===")
-        # Create new GeneratedSchedule record
-        print("=== SAVING GENERATED SCHEDULE TO DATABASE ===")
-        generated_schedule = GeneratedSchedule.objects.create(
-            age_group=age_group,
-            tier=tier,
-            season=season,
-            association=association,
-            generated_by=request.user,
-            is_active=True        )
-        print(f"Generated schedule saved with ID: {generated_schedule.id}")
-        
-        print(f"=== SAVING {len(schedule)} SCHEDULED MATCHES TO DATABASE ===")
-        # Save all matches to the database
-        for i, match in enumerate(schedule, 1):
-            # Convert dates to strings if they're date objects
-            dates_list = []
-            for date in match['dates']:
-                if hasattr(date, 'strftime'):
-                    dates_list.append(date.strftime('%Y-%m-%d'))
-                else:
-                    dates_list.append(str(date))
-            
-            ScheduleMatch.objects.create(
-                generated_schedule=generated_schedule,
-                home_team=match['home_team'],
-                away_team=match['away_team'],
-                dates=dates_list,
-                match_type=match.get('type', 'series'),
-                status='scheduled'            )
-            print(f"  Match {i}: {match['home_team'].name} vs {match['away_team'].name} saved")
-        
-        print(f"=== SAVING {len(unscheduled_matches)} UNSCHEDULED MATCHES TO DATABASE ===")
-        # Save unscheduled matches as well (for tracking conflicts)
-        for i, match in enumerate(unscheduled_matches, 1):
-            ScheduleMatch.objects.create(
-                generated_schedule=generated_schedule,
-                home_team=match['home_team'],
-                away_team=match['away_team'],
-                dates=[],  # No dates for unscheduled matches
-                match_type='series',  # Default type
-                status='unscheduled',  # Important: mark as unscheduled
-                conflict_reason=match.get('reason', 'Scheduling conflict')
-            )
-            print(f"  Unscheduled Match {i}: {match['home_team'].name} vs {match['away_team'].name} - {match.get('reason', 'Scheduling conflict')}")
+    # Check if user is an association admin
+    if not can_admin(request.user, association):
+        return JsonResponse({'success': False, 'message': 'You must be an association admin to generate schedules'}, status=403)
+    
+    # Clicks while a generation is already queued or running share that job and its result
+    division_state = DivisionSchedulingState.for_division(division)
+    job, created = job_queue.enqueue_generation(
+        'generate_schedule',
+        division_state,
+        {'age_group': age_group, 'tier': tier, 'season': season, 'association_id': association.id},
+        priority=job_queue.PRIORITY_INTERACTIVE,
+        user=request.user,
+        max_attempts=1,
+    )
+    if created:
+        print(f"📥 Schedule generation for {association.name} {age_group} {tier} ({season}) queued as job {job.id}")
+    else:
+        print(f"🔗 Schedule generation for {association.name} {age_group} {tier} ({season}) already in flight as job {job.id}")
+    
+    return JsonResponse({
+        'success': True,
+        'job_id': job.id,
+        'coalesced': not created,
+        'status_url': reverse('job_status', args=[job.id]),
+        'progress_url': reverse('job_progress', args=[job.id]),
+    }, status=202)
 
-        # Get teams and their availability data for the template
-        teams = Team.objects.filter(
-            age_group=age_group, 
-            tier=tier, 
-            season=season,
-            club__association=association
-        )
-        
-        teams_with_availability = []
-        for team in teams:
-            home_date_objects = TeamDate.objects.filter(team=team, is_home=True).values('date', 'allow_doubleheader')
-            away_date_objects = TeamDate.objects.filter(team=team, is_home=False).values('date', 'allow_doubleheader')
-            teams_with_availability.append({
-                'team': team,
-                'home_dates': home_date_objects,
-                'away_dates': away_date_objects
-            })
+def _job_for_user(user, job_id):
+    """A job the user may follow: their own, any job for staff, or one for an association they administer"""
+    from users.models import BackgroundJob
+    job = get_object_or_404(BackgroundJob, id=job_id)
+    if job.created_by_id != user.id and not user.is_staff:
+        association_id = job.payload.get('association_id')
+        if not association_id or association_id not in roles_for(user).admin_associations:
+            raise Http404("Job not found")
+    return job
 
-        # Get or create division state for template context
-        from users.models import DivisionSchedulingState
-        division_state, created = DivisionSchedulingState.objects.get_or_create(
-            age_group=age_group,
-            tier=tier,
-            season=season,
-            association=association,
-            defaults={
-                'availability_deadline': timezone.now() + timezone.timedelta(days=30),
-                'auto_schedule_enabled': True
-            }
-        )
-        
-        if unscheduled_matches:
-            # Log partial success
-            DivisionLog.log_schedule_generation(
-                age_group, tier, season, association,
-                'completed', request.user,
-                details=f"{len(schedule)} matches scheduled, {len(unscheduled_matches)} unscheduled"
-            )
-            messages.warning(
-                request,
-                f"Schedule generated with {len(unscheduled_matches)} unscheduled matches that need resolution"
-            )
-        else:
-            # Log complete success
-            DivisionLog.log_schedule_generation(
-                age_group, tier, season, association,
-                'completed', request.user,
-                details=f"{len(schedule)} matches scheduled successfully"
-            )
-            messages.success(request, "Schedule generated successfully!")
-        
-        # Redirect back to the division schedule page to load fresh data from database
-        return redirect('division_schedule', 
-                       age_group=age_group, 
-                       tier=tier, 
-                       season=season, 
-                       association_id=association_id)                       
-    except Exception as e:
-        # Log failure
-        DivisionLog.log_schedule_generation(
-            age_group, tier, season, association,
-            'failed', request.user,
-            details=str(e)
-        )
-        error_message = str(e)
-        print(f"ERROR in generate_schedule_service: {error_message}")
-        messages.error(request, f"Error generating schedule: {error_message}")
-        return redirect('division_schedule', 
-                       age_group=age_group, 
-                       tier=tier, 
-                       season=season, 
-                       association_id=association_id)
+@login_required
+def job_status(request, job_id):
+    """Polled by pages waiting on a background job"""
+    return JsonResponse(job_queue.job_status(_job_for_user(request.user, job_id)))
+
+@login_required
+async def job_progress_stream(request, job_id):
+    """Server-Sent Events stream of a running job's progress, fed by pub/sub rather than polling"""
+    user = await request.auser()
+    job = await sync_to_async(_job_for_user)(user, job_id)
+    
+    if not isinstance(request, ASGIRequest):
+        # WSGI can't hold a stream open; send the current state and let EventSource reconnect
+        events = [chunk async for chunk in job_progress.event_stream(job.id, live=False)]
+        return HttpResponse(''.join(events), content_type='text/event-stream')
+    
+    response = StreamingHttpResponse(job_progress.event_stream(job.id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
 
 @login_required
 def division_calendar(request, age_group, tier, season, association_id):
-    # Get the association
-    try:
-        association = Association.objects.get(id=association_id)
-    except Association.DoesNotExist:
-        messages.error(request, "Association not found")
+    # Resolve the division
+    division = Division.lookup(age_group, tier, season, association_id)
+    if division is None:
+        messages.error(request, "Division not found")
         return redirect('home')
+    association = division.association
     
     # Get teams in this specific division
-    teams = Team.objects.filter(
-        age_group=age_group, 
-        tier=tier, 
-        season=season,
-        club__association=association
-    )
+    teams = Team.objects.filter(division=division)
     if not teams.exists():
         messages.error(request, f"No teams found for {age_group} {tier} {season} division")
         return redirect('home')
     
-    # Load existing generated schedule
-    from users.models import GeneratedSchedule, ScheduleMatch
-    
-    existing_schedule = GeneratedSchedule.objects.filter(
-        age_group=age_group,
-        tier=tier,
-        season=season,
-        association=association,
-        is_active=True
-    ).first()
-    
-    schedule = []
-    has_generated_calendar = False
+    # Events are loaded by the calendar from the windowed division_events feed
+    from users.models import GeneratedSchedule
     
-    if existing_schedule:
-        has_generated_calendar = True
-        # Load scheduled matches from database
-        scheduled_matches = ScheduleMatch.objects.filter(
-            generated_schedule=existing_schedule,
-            status='scheduled'
-        ).select_related('home_team', 'away_team')
-        
-        for match in scheduled_matches:
-            # Convert date strings back to date objects for template compatibility
-            dates_as_dates = []
-            for date_str in match.dates:
-                from datetime import datetime
-                dates_as_dates.append(datetime.strptime(date_str, '%Y-%m-%d').date())
-            
-            schedule.append({
-                'home_team': match.home_team,
-                'away_team': match.away_team,
-                'dates': dates_as_dates,
-                'status': match.status,
-                'type': match.match_type
-            })
+    has_generated_calendar = GeneratedSchedule.objects.filter(division=division, is_active=True).exists()
     
-    # Serialize schedule to JSON for FullCalendar
-    events = []
-    for match in schedule:
-        # Simple title and color for all matches
-        title = f"{match['home_team'].name} vs {match['away_team'].name}"
-        color = '#0d6efd'  # Blue for all games
-            
-        # Handle the date format - matches have 'dates' array for series
-        match_dates = match.get('dates', [])
-        if not match_dates:
-            continue  # Skip if no dates
-            
-        event = {
-            'title': title,
-            'start': date_format(match_dates[0], 'Y-m-d'),
-            'allDay': True,
-            'color': color,            'extendedProps': {
-                'home': match['home_team'].name,
-                'away': match['away_team'].name,
-                'type': match['type']
-            }
-        }
-        
-        # Handle multi-day series
-        if len(match_dates) > 1:
-            # FullCalendar expects end to be exclusive, so add one day
-            from datetime import timedelta
-            end_date = match_dates[1] + timedelta(days=1)
-            event['end'] = date_format(end_date, 'Y-m-d')
-            
-        events.append(event)
-    
-    events_json = json.dumps(events)
     return render(request, 'users/division_calendar.html', {
-        'schedule': schedule,
         'association': association,
         'age_group': age_group,
         'tier': tier,
         'season': season,
-        'events_json': events_json,
         'has_generated_calendar': has_generated_calendar,
         'division_name': f"{age_group} {tier}",
+        'calendar_feed_url': _webcal_url(request, CalendarFeedToken.for_division(age_group, tier, season, association)),
     })
 
+def _request_division(request, age_group, tier, season, association_id):
+    """Resolve a division URL to its Division once per request, or None if there is none"""
+    if not hasattr(request, '_division'):
+        request._division = Division.lookup(age_group, tier, season, association_id)
+    return request._division
+
+def _active_schedule(request, age_group, tier, season, association_id):
+    """Resolve a division URL to its active schedule once per request (condition checks, then the view)"""
+    if not hasattr(request, '_active_schedule'):
+        from users.models import GeneratedSchedule
+        division = _request_division(request, age_group, tier, season, association_id)
+        request._active_schedule = division and GeneratedSchedule.objects.filter(
+            division_id=division.id, is_active=True
+        ).only('id', 'generated_at', 'version', 'division_id').first()
+    return request._active_schedule
+
+def _accepts_gzip(request):
+    """Whether Accept-Encoding allows gzip: a q-value of 0 refuses it, and * covers it when not named"""
+    qualities = {}
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, *params = [item.strip() for item in part.split(';')]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+def _division_events_etag(request, age_group, tier, season, association_id):
+    schedule = _active_schedule(request, age_group, tier, season, association_id)
+    if schedule is None:
+        return None
+    start, end = calendar_feeds.parse_window(request.GET.get('start'), request.GET.get('end'))
+    # Each content coding is a different representation, so it needs its own strong ETag
+    coding = 'gzip' if _accepts_gzip(request) else None
+    return schedule_snapshot.snapshot_etag(schedule.id, start, end, request.GET.get('team'), coding)
+
+def _division_events_last_modified(request, age_group, tier, season, association_id):
+    schedule = _active_schedule(request, age_group, tier, season, association_id)
+    return schedule.generated_at if schedule else None
+
+@login_required
+@condition(etag_func=_division_events_etag, last_modified_func=_division_events_last_modified)
+def division_events(request, age_group, tier, season, association_id):
+    """Scheduled matches for the visible calendar window, served from the schedule snapshot"""
+    schedule = _active_schedule(request, age_group, tier, season, association_id)
+    if schedule is None:
+        return JsonResponse([], safe=False)
+    
+    start, end = calendar_feeds.parse_window(request.GET.get('start'), request.GET.get('end'))
+    team_id = request.GET.get('team')
+    
+    if start or end or team_id:
+        if team_id:
+            summary = schedule_snapshot.load_summary(schedule)
+            events = summary['team_events'].get(str(team_id), [])
+        else:
+            events = schedule_snapshot.load_events(schedule)
+        events = schedule_snapshot.events_in_window(events, start, end)
+        body = schedule_snapshot.pack_events(events)
+    else:
+        # Whole season: the stored snapshot is the response body
+        body = schedule_snapshot.events_blob(schedule)
+    
+    # The snapshot is stored gzipped, so serve it as-is when the client accepts gzip
+    if _accepts_gzip(request):
+        response = HttpResponse(body, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(gzip.decompress(body), content_type='application/json')
+    response['Vary'] = 'Accept-Encoding'
+    return response
+
+@login_required
+def division_schedule_changes(request, age_group, tier, season, association_id):
+    """JSON diff of the active schedule against version ?since=N (defaults to the previous version)"""
+    division = _request_division(request, age_group, tier, season, association_id)
+    if division is None:
+        raise Http404("Division not found")
+    if not can_view_division(request.user, division):
+        return JsonResponse({'success': False, 'message': 'You must belong to this division to view its schedule changes'}, status=403)
+    
+    schedule = _active_schedule(request, age_group, tier, season, association_id)
+    if schedule is None:
+        return JsonResponse({'success': False, 'message': 'No active schedule found'}, status=404)
+    
+    try:
+        since = int(request.GET.get('since', schedule.version - 1))
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'since must be a version number'}, status=400)
+    
+    changes = schedule_changes(schedule, since)
+    return JsonResponse({'success': True, **changes}, json_dumps_params=calendar_feeds.COMPACT_JSON)
+
+@login_required
+def association_games(request, association_id):
+    """Every game in the association inside ?start=&end= (e.g. "what is on this weekend")"""
+    association = get_object_or_404(Association, id=association_id)
+    if not can_admin(request.user, association):
+        return JsonResponse({'success': False, 'message': 'You must be an association admin to view games'}, status=403)
+    
+    start, end = calendar_feeds.parse_window(request.GET.get('start'), request.GET.get('end'))
+    games = match_dates.association_games(association, start, end)
+    events = [match_dates.game_event(game) for game in games]
+    return JsonResponse(events, safe=False, json_dumps_params=calendar_feeds.COMPACT_JSON)
+
+def _calendar_feed_state(request, token):
+    """Resolve a feed token and its active schedule once per request"""
+    if not hasattr(request, '_calendar_feed_state'):
+        from users.models import CalendarFeedToken
+        feed = CalendarFeedToken.objects.select_related('team__club', 'association').filter(token=token).first()
+        schedule = ical_feeds.active_schedule_for(feed) if feed else None
+        request._calendar_feed_state = (feed, schedule)
+    return request._calendar_feed_state
+
+def _calendar_feed_etag(request, token):
+    feed, schedule = _calendar_feed_state(request, token)
+    return ical_feeds.feed_etag(feed, schedule) if feed else None
+
+def _calendar_feed_last_modified(request, token):
+    feed, schedule = _calendar_feed_state(request, token)
+    return schedule.generated_at if schedule else None
+
+@condition(etag_func=_calendar_feed_etag, last_modified_func=_calendar_feed_last_modified)
+def calendar_feed(request, token):
+    """Public .ics subscription feed; the token in the URL is the only credential"""
+    feed, schedule = _calendar_feed_state(request, token)
+    if feed is None:
+        raise Http404("Unknown calendar feed")
+    
+    response = HttpResponse(ical_feeds.feed_bytes(feed, schedule), content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = f'inline; filename="{"team" if feed.team_id else "division"}-schedule.ics"'
+    # The token is a credential, so shared caches must not keep a copy
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+def _webcal_url(request, feed):
+    """Absolute webcal:// URL for a feed, which phones open as a calendar subscription"""
+    url = request.build_absolute_uri(reverse('calendar_feed', args=[feed.token]))
+    return 'webcal://' + url.split('://', 1)[1]
+
+def _export_pending_response(request, export, target):
+    """202 page that reloads itself until the export is ready"""
+    response = render(request, 'users/export_pending.html', {'export': export, 'title': target.title}, status=202)
+    response['Retry-After'] = '3'
+    return response
+
+def _schedule_export_response(request, target, export_format):
+    """Serve a schedule export: streamed CSV, stored artifact, inline PDF, or a 202 while a large one builds"""
+    if export_format not in schedule_exports.CONTENT_TYPES:
+        raise Http404("Unknown export format")
+    content_type = schedule_exports.CONTENT_TYPES[export_format]
+    large = schedule_exports.is_large(target)
+    
+    if export_format == 'csv' and not large:
+        # Small CSVs stream straight from the database
+        response = StreamingHttpResponse(
+            schedule_exports.stream_csv(schedule_exports.target_games(target)), content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="schedule-{target.slug}.csv"'
+        return response
+    
+    export = schedule_exports.get_or_create_export(target, export_format, request.user)
+    if export.status != 'ready':
+        if large:
+            # No-op while a live build holds the claim; restarts failed and abandoned builds
+            schedule_exports.start_background_build(export)
+            return _export_pending_response(request, export, target)
+        
+        claimed = schedule_exports.claim_export(export.id)
+        if claimed is None:
+            # Another request is building it right now
+            return _export_pending_response(request, export, target)
+        export = schedule_exports.build_export(claimed)
+        if export.status != 'ready':
+            return HttpResponse("Export failed, please try again", status=500)
+    
+    response = HttpResponse(bytes(export.content), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{export.filename}"'
+    return response
+
+@login_required
+def export_division_schedule(request, age_group, tier, season, association_id, export_format):
+    division = _division_or_404(age_group, tier, season, association_id)
+    if not can_view_division(request.user, division):
+        messages.error(request, "You must belong to this division to export its schedule")
+        return redirect('home')
+    target = schedule_exports.division_target(division)
+    return _schedule_export_response(request, target, export_format)
+
+@login_required
+def export_team_schedule(request, team_id, export_format):
+    team = get_object_or_404(Team.objects.select_related('club'), id=team_id)
+    if not can_view_team(request.user, team):
+        messages.error(request, "You must belong to this team to export its schedule")
+        return redirect('home')
+    return _schedule_export_response(request, schedule_exports.team_target(team), export_format)
+
+@login_required
+def export_association_schedule(request, association_id, export_format):
+    association = get_object_or_404(Association, id=association_id)
+    if not can_admin(request.user, association):
+        messages.error(request, "You must be an association admin to export the association schedule")
+        return redirect('home')
+    return _schedule_export_response(request, schedule_exports.association_target(association), export_format)
+
 @login_required
 def clubs_list(request, association_id):
     """View clubs for a specific association - only accessible by association admins"""
@@ -1265,21 +1408,19 @@ def clubs_list(request, association_id):
         return redirect('home')
     
     # Check if user is an association admin
-    if request.user not in association.admins.all():
+    if not can_admin(request.user, association):
         messages.error(request, "You must be an association admin to view clubs")
         return redirect('home')
     
-    # Get all clubs in this association
-    clubs = Club.objects.filter(association=association).order_by('name')
+    # Get all clubs in this association, with team counts and admins loaded up front
+    clubs = (
+        Club.objects.filter(association=association)
+        .annotate(team_count=Count('teams'))
+        .prefetch_related('admins')
+        .order_by('name')
+    )
     
-    # Add team count for each club
-    clubs_with_stats = []
-    for club in clubs:
-        team_count = club.teams.count()
-        clubs_with_stats.append({
-            'club': club,
-            'team_count': team_count
-        })
+    clubs_with_stats = [{'club': club, 'team_count': club.team_count} for club in clubs]
     
     return render(request, 'users/clubs_list.html', {
         'association': association,
@@ -1289,15 +1430,13 @@ def clubs_list(request, association_id):
 @login_required
 def association_divisions(request, association_id):
     """Show all divisions for an association admin"""
-    from users.models import DivisionSchedulingState  # Import at function level
-    
     try:
         association = Association.objects.get(id=association_id)
     except Association.DoesNotExist:
         messages.error(request, "Association not found")
         return redirect('home')
       # Check if user is an association admin
-    if request.user not in association.admins.all():
+    if not can_admin(request.user, association):
         messages.error(request, "You must be an association admin to access this page")
         return redirect('home')
     
@@ -1339,6 +1478,7 @@ def association_divisions(request, association_id):
                     updated_count = DivisionSchedulingState.objects.filter(
                         association=association
                     ).update(availability_deadline=deadline_aware)
+                    notify_deadlines_changed()
                     
                     messages.success(request, f"Scheduling deadline updated for {updated_count} divisions!")
                 except ValueError:
@@ -1355,40 +1495,38 @@ def association_divisions(request, association_id):
         'scheduling_deadline': (timezone.now() + timezone.timedelta(days=30)).strftime('%Y-%m-%dT%H:%M')
     })
     
-    # Get all unique division combinations for this association
-    divisions = Team.objects.filter(club__association=association).values(
-        'age_group', 'tier', 'season'
-    ).distinct().order_by('season', 'age_group', 'tier')
+    # Divisions of this association that have teams, with their teams and scheduling states in one query each
+    divisions = list(
+        Division.objects.filter(association=association, teams__isnull=False)
+        .distinct()
+        .order_by('season', 'age_group', 'tier')
+    )
+    teams_by_division = {}
+    for team in Team.objects.filter(division__in=divisions).values(
+        'id', 'name', 'description', 'location', 'club__name', 'division_id'
+    ):
+        teams_by_division.setdefault(team.pop('division_id'), []).append(team)
+    states = {
+        state.division_id: state
+        for state in DivisionSchedulingState.objects.filter(division__in=divisions).select_related('association')
+    }
     
-    # Get team counts for each division and scheduling state
     divisions_with_data = []
     for division in divisions:
-        teams_in_division = Team.objects.filter(
-            club__association=association,
-            age_group=division['age_group'],
-            tier=division['tier'],
-            season=division['season']        )
-        
         # Get or create division scheduling state
-        division_state, created = DivisionSchedulingState.objects.get_or_create(
-            age_group=division['age_group'],
-            tier=division['tier'],
-            season=division['season'],
-            association=association,
-            defaults={
-                'availability_deadline': timezone.now() + timezone.timedelta(days=30),
-                'auto_schedule_enabled': True
-            }
-        )
+        division_state = states.get(division.id)
+        if division_state is None:
+            division_state = DivisionSchedulingState.for_division(division)
+            division_state.association = association
+        teams_in_division = teams_by_division.get(division.id, [])
         
         divisions_with_data.append({
-            'age_group': division['age_group'],
-            'tier': division['tier'],
-            'season': division['season'],
-            'team_count': teams_in_division.count(),
-            'division_state': division_state,            'teams': list(teams_in_division.select_related('club').values(
-                'id', 'name', 'description', 'location', 'club__name'
-            )),
+            'age_group': division.age_group,
+            'tier': division.tier,
+            'season': division.season,
+            'team_count': len(teams_in_division),
+            'division_state': division_state,
+            'teams': teams_in_division,
         })
     
     return render(request, 'users/association_divisions.html', {
@@ -1459,6 +1597,27 @@ def edit_user_profile(request):
         'user': request.user
     })
 
+def _queue_notification_emails(request, age_group, tier, season, association, notification_type, emails, message):
+    """Add prepared per-team notification emails to the outbox in one insert"""
+    from users.services import email_outbox
+
+    if not emails:
+        return JsonResponse({'success': False, 'message': 'No team members with email addresses to notify'})
+    with transaction.atomic():
+        email_outbox.queue_emails(
+            emails,
+            notification_type=notification_type,
+            division=(age_group, tier, season, association),
+            user=request.user,
+        )
+    return JsonResponse({
+        'success': True,
+        'message': message,
+        'teams_notified': len(emails),
+        'total_emails_sent': sum(len(email['recipients']) for email in emails),
+    })
+
+
 @login_required
 @require_http_methods(["POST"])
 def send_unscheduled_notifications(request, age_group, tier, season, association_id):
@@ -1472,31 +1631,24 @@ def send_unscheduled_notifications(request, age_group, tier, season, association
     from users.models import ScheduleMatch, GeneratedSchedule
     
     try:
-        # Get the association and validate access
-        try:
-            association = Association.objects.get(id=association_id)
-        except Association.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'Association not found'})
+        # Resolve the division and validate access
+        division = Division.lookup(age_group, tier, season, association_id)
+        if division is None:
+            return JsonResponse({'success': False, 'message': 'Division not found'})
+        association = division.association
         
         # Check if user is an association admin
-        if request.user not in association.admins.all():
+        if not can_admin(request.user, association):
             return JsonResponse({'success': False, 'message': 'You must be an association admin to send notifications'})
         
         # Get the existing schedule
-        existing_schedule = GeneratedSchedule.objects.filter(
-            age_group=age_group,
-            tier=tier,
-            season=season,
-            association=association,
-            is_active=True
-        ).first()
+        existing_schedule = GeneratedSchedule.objects.filter(division=division, is_active=True).first()
         
         if not existing_schedule:
             return JsonResponse({'success': False, 'message': 'No active schedule found'})
         
         # Get unscheduled matches
-        unscheduled_matches = ScheduleMatch.objects.filter(
-            generated_schedule=existing_schedule,
+        unscheduled_matches = existing_schedule.schedule_matches().filter(
             status='unscheduled'
         ).select_related('home_team', 'away_team')
         
@@ -1544,80 +1696,29 @@ def send_unscheduled_notifications(request, age_group, tier, season, association
         
         message = '\n'.join(message_lines)
         
-        # Send emails to team admins, managers, coaches, and all team members
-        teams_notified = 0
-        total_emails_sent = 0
+        # Emails to team admins and all team members are sent from the outbox
+        emails = []
+        recipients_by_team = team_recipients([team.id for team in teams_involved])
         
         for team in teams_involved:
-            # Get all recipients with email addresses
-            recipients = []
-            
-            # Add team admins
-            for admin in team.admins.all():
-                if admin.email and admin.email not in recipients:
-                    recipients.append(admin.email)
-                    print(f"  📧 Added admin: {admin.email}")
-            
-            # Add team members
-            for member in team.members.all():
-                if member.email and member.email not in recipients:
-                    recipients.append(member.email)
-                    print(f"  📧 Added member: {member.email}")
-            
-            # Add managers if they exist (check if team has managers field)
-            if hasattr(team, 'managers'):
-                for manager in team.managers.all():
-                    if manager.email and manager.email not in recipients:
-                        recipients.append(manager.email)
-                        print(f"  📧 Added manager: {manager.email}")
-            
-            # Add coaches if they exist (check if team has coaches field)  
-            if hasattr(team, 'coaches'):
-                for coach in team.coaches.all():
-                    if coach.email and coach.email not in recipients:
-                        recipients.append(coach.email)
-                        print(f"  📧 Added coach: {coach.email}")
-            
+            recipients = sorted(recipients_by_team.get(team.id, ()))
             print(f"🔍 Team {team.name}: Found {len(recipients)} email recipients")
             
             if recipients:
-                try:
-                    send_mail(
-                        subject=subject,
-                        message=message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=recipients,
-                        fail_silently=False
-                    )
-                    teams_notified += 1
-                    total_emails_sent += len(recipients)
-                    print(f"✅ Email sent to {team.name}: {recipients}")
-                    
-                    # Log the email notification
-                    from users.models import DivisionLog
-                    DivisionLog.log_email_notification(
-                        age_group=age_group,
-                        tier=tier,
-                        season=season,
-                        association=association,
-                        notification_type='unscheduled_matches',
-                        recipients_count=len(recipients),
-                        user=request.user,
-                        team=team,
-                        details=f"Unscheduled matches notification sent to {len(recipients)} team members"
-                    )
-                    
-                except Exception as e:
-                    print(f"❌ Failed to send email to {team.name}: {e}")
+                emails.append({
+                    'team': team,
+                    'subject': subject,
+                    'message': message,
+                    'recipients': recipients,
+                    'details': f"Unscheduled matches notification sent to {len(recipients)} team members",
+                })
             else:
                 print(f"⚠️ No email addresses found for team {team.name}")
         
-        return JsonResponse({
-            'success': True, 
-            'message': f'Notifications sent to team members successfully',
-            'teams_notified': teams_notified,
-            'total_emails_sent': total_emails_sent
-        })
+        return _queue_notification_emails(
+            request, age_group, tier, season, association, 'unscheduled_matches', emails,
+            'Notifications queued for team members'
+        )
         
     except Exception as e:
         print(f"❌ Error sending unscheduled match notifications: {e}")
@@ -1636,29 +1737,24 @@ def send_availability_notifications(request, age_group, tier, season, associatio
     from django.conf import settings
     
     try:
-        # Get the association and validate access
-        try:
-            association = Association.objects.get(id=association_id)
-        except Association.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'Association not found'})
+        # Resolve the division and validate access
+        division = Division.lookup(age_group, tier, season, association_id)
+        if division is None:
+            return JsonResponse({'success': False, 'message': 'Division not found'})
+        association = division.association
         
         # Check if user is an association admin
-        if request.user not in association.admins.all():
+        if not can_admin(request.user, association):
             return JsonResponse({'success': False, 'message': 'You must be an association admin to send notifications'})
         
         # Get teams for this division
-        teams = Team.objects.filter(
-            club__association=association,
-            age_group=age_group,
-            tier=tier,
-            season=season
-        )
+        teams = list(Team.objects.filter(division=division))
         
-        if not teams.exists():
+        if not teams:
             return JsonResponse({'success': False, 'message': 'No teams found for this division'})
         
         # Calculate which teams need more availability
-        total_teams = teams.count()
+        total_teams = len(teams)
         required_series = total_teams - 1  # Each team needs (N-1) home and (N-1) away series
         
         # Helper function to count weekend series from dates
@@ -1684,10 +1780,11 @@ def send_availability_notifications(request, age_group, tier, season, associatio
         # Find teams that need more availability
         teams_needing_availability = []
         
+        availability = division_availability(teams)
         for team in teams:
             # Get availability dates
-            home_dates = list(TeamDate.objects.filter(team=team, is_home=True).values_list('date', flat=True))
-            away_dates = list(TeamDate.objects.filter(team=team, is_home=False).values_list('date', flat=True))
+            home_dates = [d.date for d in availability[team.id] if d.is_home]
+            away_dates = [d.date for d in availability[team.id] if not d.is_home]
             
             # Calculate availability status
             available_home_series = count_weekend_series(home_dates)
@@ -1710,9 +1807,9 @@ def send_availability_notifications(request, age_group, tier, season, associatio
         if not teams_needing_availability:
             return JsonResponse({'success': False, 'message': 'All teams have sufficient availability. No notifications sent.'})
         
-        # Send emails to teams needing more availability
-        teams_notified = 0
-        total_emails_sent = 0
+        # Emails to teams needing more availability are sent from the outbox
+        emails = []
+        recipients_by_team = team_recipients([team.id for team in teams])
         
         for team_data in teams_needing_availability:
             team = team_data['team']
@@ -1755,71 +1852,25 @@ def send_availability_notifications(request, age_group, tier, season, associatio
             
             message = '\n'.join(message_lines)
             
-            # Get all recipients with email addresses
-            recipients = []
-            
-            # Add team admins
-            for admin in team.admins.all():
-                if admin.email and admin.email not in recipients:
-                    recipients.append(admin.email)
-            
-            # Add team members
-            for member in team.members.all():
-                if member.email and member.email not in recipients:
-                    recipients.append(member.email)
-            
-            # Add managers if they exist
-            if hasattr(team, 'managers'):
-                for manager in team.managers.all():
-                    if manager.email and manager.email not in recipients:
-                        recipients.append(manager.email)
-            
-            # Add coaches if they exist  
-            if hasattr(team, 'coaches'):
-                for coach in team.coaches.all():
-                    if coach.email and coach.email not in recipients:
-                        recipients.append(coach.email)
+            recipients = sorted(recipients_by_team.get(team.id, ()))
             
             print(f"🔍 Team {team.name}: Found {len(recipients)} email recipients (needs home: {team_data['home_series_needed']}, away: {team_data['away_series_needed']})")
             
             if recipients:
-                try:
-                    send_mail(
-                        subject=subject,
-                        message=message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=recipients,
-                        fail_silently=False
-                    )
-                    teams_notified += 1
-                    total_emails_sent += len(recipients)
-                    print(f"✅ Availability notification sent to {team.name}: {recipients}")
-                    
-                    # Log the email notification
-                    from users.models import DivisionLog
-                    DivisionLog.log_email_notification(
-                        age_group=age_group,
-                        tier=tier,
-                        season=season,
-                        association=association,
-                        notification_type='availability_reminder',
-                        recipients_count=len(recipients),
-                        user=request.user,
-                        team=team,
-                        details=f"Team needs {team_data['home_series_needed']} home, {team_data['away_series_needed']} away series"
-                    )
-                    
-                except Exception as e:
-                    print(f"❌ Failed to send availability notification to {team.name}: {e}")
+                emails.append({
+                    'team': team,
+                    'subject': subject,
+                    'message': message,
+                    'recipients': recipients,
+                    'details': f"Team needs {team_data['home_series_needed']} home, {team_data['away_series_needed']} away series",
+                })
             else:
                 print(f"⚠️ No email addresses found for team {team.name}")
         
-        return JsonResponse({
-            'success': True, 
-            'message': f'Availability notifications sent successfully',
-            'teams_notified': teams_notified,
-            'total_emails_sent': total_emails_sent
-        })
+        return _queue_notification_emails(
+            request, age_group, tier, season, association, 'availability_reminder', emails,
+            'Availability notifications queued'
+        )
         
     except Exception as e:
         print(f"❌ Error sending availability notifications: {e}")
@@ -1873,15 +1924,11 @@ def update_system_settings(request):
 @login_required
 def division_page(request, age_group, tier, season, association_id):
     """Display a division page with Teams, Calendar, and Logs options"""
-    association = get_object_or_404(Association, id=association_id)
+    division = _division_or_404(age_group, tier, season, association_id)
+    association = division.association
     
     # Get teams in this division
-    teams = Team.objects.filter(
-        age_group=age_group,
-        tier=tier,
-        season=season,
-        club__association=association
-    )
+    teams = Team.objects.filter(division=division)
     
     context = {
         'age_group': age_group,
@@ -1896,15 +1943,11 @@ def division_page(request, age_group, tier, season, association_id):
 @login_required
 def division_teams(request, age_group, tier, season, association_id):
     """Display all teams in a specific division"""
-    association = get_object_or_404(Association, id=association_id)
+    division = _division_or_404(age_group, tier, season, association_id)
+    association = division.association
     
     # Get teams in this division
-    teams = Team.objects.filter(
-        age_group=age_group,
-        tier=tier,
-        season=season,
-        club__association=association
-    ).select_related('club').prefetch_related('admins', 'members')
+    teams = Team.objects.filter(division=division).select_related('club').prefetch_related('admins', 'members')
     
     context = {
         'age_group': age_group,
@@ -2055,23 +2098,29 @@ def create_team(request):
         'tiers': tiers,
     })
 
+def _log_division_visit(request, division):
+    """Log a user's access to a division's logs at most once per session per day"""
+    today = timezone.localdate().isoformat()
+    visits = {key: day for key, day in request.session.get('division_log_visits', {}).items() if day == today}
+    if visits.get(str(division.id)) == today:
+        return
+    visits[str(division.id)] = today
+    request.session['division_log_visits'] = visits
+    age_group, tier, season, association_id = division.key
+    DivisionLog.log_user_login(age_group, tier, season, division.association, request.user)
+
 @login_required
 def division_logs(request, age_group, tier, season, association_id):
     """Display logs for a specific division"""
     from .models import DivisionLog
     
-    association = get_object_or_404(Association, id=association_id)
+    division = _division_or_404(age_group, tier, season, association_id)
+    association = division.association
     
     # Get teams in this division for readiness check
-    teams = Team.objects.filter(
-        age_group=age_group,
-        tier=tier,
-        season=season,
-        club__association=association
-    ).select_related('club').prefetch_related('dates')
+    teams = Team.objects.filter(division=division).select_related('club')
     
-    # Log user access to division logs
-    DivisionLog.log_user_login(age_group, tier, season, association, request.user)
+    _log_division_visit(request, division)
     
     # Weekend series counting function (same as division_schedule)
     def count_weekend_series(dates):
@@ -2098,9 +2147,10 @@ def division_logs(request, age_group, tier, season, association_id):
     
     # Perform team readiness check with weekend series logic
     teams_with_readiness = []
+    availability = division_availability(teams)
     for team in teams:
         # Get home and away dates  
-        team_dates = team.dates.all()
+        team_dates = availability[team.id]
         home_dates = [td.date for td in team_dates if td.is_home]
         away_dates = [td.date for td in team_dates if not td.is_home]
         
@@ -2126,13 +2176,8 @@ def division_logs(request, age_group, tier, season, association_id):
     
     perform_team_readiness_check(age_group, tier, season, association, teams, request.user)
     
-    # Get all logs for this division
-    logs = DivisionLog.objects.filter(
-        age_group=age_group,
-        tier=tier,
-        season=season,
-        association=association
-    ).select_related('user', 'team').order_by('-timestamp')[:100]  # Last 100 logs
+    # First page of logs; the page loads older entries from division_log_entries as you scroll
+    logs, next_cursor = division_log_feed.log_page(division)
     
     context = {
         'age_group': age_group,
@@ -2142,10 +2187,40 @@ def division_logs(request, age_group, tier, season, association_id):
         'teams': teams,
         'teams_with_readiness': teams_with_readiness,
         'logs': logs,
+        'next_cursor': next_cursor,
+        'log_types': DivisionLog.LOG_TYPES,
         'division_name': f"{age_group} {tier}",
     }
     return render(request, 'users/division_logs.html', context)
 
+
+@login_required
+@require_http_methods(["GET"])
+def division_log_entries(request, age_group, tier, season, association_id):
+    """
+    JSON page of a division's log entries, newest first.
+    Query: cursor (from the previous page), limit, log_type (repeatable), team, user, since, until.
+    """
+    division = _division_or_404(age_group, tier, season, association_id)
+    try:
+        logs, next_cursor = division_log_feed.log_page(
+            division,
+            cursor=request.GET.get('cursor'),
+            limit=request.GET.get('limit'),
+            log_types=request.GET.getlist('log_type'),
+            team_id=request.GET.get('team'),
+            user_id=request.GET.get('user'),
+            since=request.GET.get('since'),
+            until=request.GET.get('until'),
+        )
+    except division_log_feed.InvalidLogQuery as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({
+        'success': True,
+        'entries': [division_log_feed.serialize_entry(log) for log in logs],
+        'next_cursor': next_cursor,
+    })
+
 def perform_team_readiness_check(age_group, tier, season, association, teams, user):
     """Check and log team readiness for schedule generation using weekend series logic"""
     from .models import DivisionLog
@@ -2173,9 +2248,10 @@ def perform_team_readiness_check(age_group, tier, season, association, teams, us
     # Calculate required series (same logic as division_schedule)
     required_series = max(3, len(teams) - 1) if teams else 3
     
+    availability = division_availability(teams)
     for team in teams:
         # Get home and away dates
-        team_dates = team.dates.all()
+        team_dates = availability[team.id]
         home_dates = [td.date for td in team_dates if td.is_home]
         away_dates = [td.date for td in team_dates if not td.is_home]
         